@@ -1,6 +1,6 @@
 import yfinance as yf
 import pandas as pd
-from strategies.features import add_all_features
+from data.feature_store import FeatureStore
 from data.labeling import add_target
 from execution.paper_broker import PaperBroker
 from utils.logger import setup_logger
@@ -67,17 +67,17 @@ def run_yearly_analysis(mode):
     safe_df = fetch_and_prepare(safe_ticker, mode, start_date, end_date)
     if safe_df.empty: return
     
-    active_data = {}
+    raw_data = {}
     for t in tickers:
         df = fetch_and_prepare(t, mode, start_date, end_date)
         if not df.empty:
-            df = add_all_features(df).dropna()
-            active_data[t] = df
+            raw_data[t] = df
+    active_data = {t: df.dropna() for t, df in FeatureStore().add_all_features_many(raw_data).items()}
             
     # Brokers for each strategy
-    b_trend = PaperBroker(initial_balance=100000.0)
-    b_mr = PaperBroker(initial_balance=100000.0)
-    b_grid = PaperBroker(initial_balance=100000.0)
+    b_trend = PaperBroker(start_balance=100000.0)
+    b_mr = PaperBroker(start_balance=100000.0)
+    b_grid = PaperBroker(start_balance=100000.0)
     
     # Setup Grid Levels (Simple approach: Reset grid every year or static? Static for now 2022-2025)
     # Grid needs min/max. Hard to know future.
@@ -1,18 +1,11 @@
-import pandas as pd
-import yfinance as yf
+from utils.startup import report_startup # First: start the cold-start clock
 from datetime import datetime
 from colorama import Fore, Style, init
 
-# Strategies (Reusing the same classes!)
-from strategies.grid_strategy import GridStrategy
-from strategies.mean_reversion_strategy import MeanReversionStrategy
-from strategies.trend_strategy import TrendStrategy
-from strategies.dca_strategy import DCAStrategy
-from strategies.chip_strategy import ChipMemoryStrategy
-from strategies.advanced_strategies import BumTrendStrategy, MatrDipStrategy, GuaMomentumStrategy, MgbBandStrategy
+# Strategies (Reusing the same classes, resolved lazily by name)
+from strategies.registry import create_strategy
 
 # Utils
-from utils.market_scanner import MarketScanner # Scanner might need mocking for backtest speed
 from config.settings import MARKET_CONFIG
 
 init(autoreset=True)
@@ -30,17 +23,17 @@ class BacktestManager:
         bist_tickers = ["AKBNK.IS", "THYAO.IS", "BIMAS.IS"]
         
         # Standard
-        self.strategies.append(GridStrategy(name="GridBot_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MeanReversionStrategy(name="MeanRev_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(TrendStrategy(name="TrendHunter_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(DCAStrategy(name="SmartDCA_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(ChipMemoryStrategy(name="ChipHunter_BT", balance=1000.0))
+        self.strategies.append(create_strategy("GridBot", name="GridBot_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("MeanRev", name="MeanRev_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("TrendHunter", name="TrendHunter_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("SmartDCA", name="SmartDCA_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("ChipHunter", name="ChipHunter_BT", balance=1000.0))
         
         # Advanced (New)
-        self.strategies.append(BumTrendStrategy(name="BUM_Trend_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MatrDipStrategy(name="MATR_Dip_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(GuaMomentumStrategy(name="RUA_Mom_BT", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MgbBandStrategy(name="MGB_Band_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("BUM_Trend", name="BUM_Trend_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("MATR_Dip", name="MATR_Dip_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("RUA_Mom", name="RUA_Mom_BT", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("MGB_Band", name="MGB_Band_BT", balance=1000.0, tickers=bist_tickers))
         
         print(f"Initialized {len(self.strategies)} Strategies.")
 
@@ -54,6 +47,8 @@ class BacktestManager:
         all_tickers = list(set(all_tickers))
         
         # 2. Bulk Download
+        import pandas as pd
+        import yfinance as yf
         # We need Daily resolution for 2025.
         data = yf.download(all_tickers, start=self.start_date, end=self.end_date, interval="1d", progress=True)
         
@@ -135,4 +130,5 @@ class BacktestManager:
 if __name__ == "__main__":
     bt = BacktestManager()
     bt.setup()
+    report_startup("Startup (imports + setup)")
     bt.run_year()
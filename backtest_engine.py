@@ -1,34 +1,72 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from datetime import datetime
-from colorama import Fore, Style, init
-
-# Utils
-from config.settings import MARKET_CONFIG
-
-init(autoreset=True)
+from strategies.base_strategy import PriceVector
+from data.panel import FeaturePanel
+from data.fx import currency_of
 
 class BacktestEngine:
-    def __init__(self, start_date, end_date, strategies, preloaded_data=None):
+    def __init__(self, start_date, end_date, strategies, preloaded_data=None, fx=None, report_currency=None):
+        """
+        fx (data.fx.FXRates) + report_currency: also report every strategy's equity
+        curve and ROI in report_currency (converted at each bar's rate). Wallets
+        without a currency count as being in their first ticker's quote currency.
+        """
         self.start_date = start_date
         self.end_date = end_date
         self.strategies = strategies
         self.preloaded_data = preloaded_data
+        self.fx = fx
+        self.report_currency = report_currency if fx is not None else None
         self.data_cache = {}
+        self._report = {} # strategy name -> [report value of the start balance, last bar's factor]
+
+    def wallet_currency(self, strategy):
+        return strategy.broker.currency or currency_of(strategy.tickers[0] if strategy.tickers else "")
+
+    def _needed_tickers(self):
+        needed = []
+        for s in self.strategies: needed.extend(s.tickers)
+        return list(dict.fromkeys(needed)) # de-duplicated, stable column order
+
+    def _slice_preloaded(self, frame, needed):
+        """Date/ticker filter for one preloaded frame (or chunk)."""
+        mask = (frame.index >= self.start_date) & (frame.index <= self.end_date)
+        # Slice columns if possible (if preloaded has all tickers)
+        # If preloaded has more columns, just take what we need
+        cols = [t for t in needed if t in frame.columns]
+        return frame.loc[mask, cols]
+
+    def iter_price_frames(self):
+        """
+        Yields close-price frames (dates x tickers) to replay.
+        preloaded_data may be a single DataFrame, a data.panel.FeaturePanel or an iterable of DataFrame
+        chunks (e.g. data.synthetic.iter_panel_chunks) for universes that do
+        not fit in memory at once.
+        """
+        if self.preloaded_data is None:
+            prices = self.fetch_data()
+            if prices is not None and not prices.empty:
+                yield prices
+            return
+
+        needed = self._needed_tickers()
+        single = isinstance(self.preloaded_data, (pd.DataFrame, FeaturePanel))
+        frames = [self.preloaded_data] if single else self.preloaded_data
+        for frame in frames:
+            # Accept full OHLCV panels (yfinance / synthetic layout / FeaturePanel) as well as close-only frames
+            if isinstance(frame, FeaturePanel):
+                frame = frame.frame('Close' if 'Close' in frame else 'Adj Close')
+            elif isinstance(frame.columns, pd.MultiIndex):
+                frame = frame['Close'] if 'Close' in frame.columns.get_level_values(0) else frame['Adj Close']
+            chunk = self._slice_preloaded(frame, needed)
+            if not chunk.empty:
+                yield chunk
 
     def fetch_data(self):
         # 1. Use Preloaded if available
         if self.preloaded_data is not None:
-            # Filter by date
-            mask = (self.preloaded_data.index >= self.start_date) & (self.preloaded_data.index <= self.end_date)
-            # Filter by tickers
-            needed = []
-            for s in self.strategies: needed.extend(s.tickers)
-            needed = list(set(needed))
-            
-            # Slice columns if possible (if preloaded has all tickers)
-            # If preloaded has more columns, just take what we need
-            return self.preloaded_data.loc[mask, needed]
+            frames = list(self.iter_price_frames())
+            return pd.concat(frames) if frames else None
 
         # 2. Daily Fetch (Legacy)
         all_tickers = []
@@ -39,6 +77,7 @@ class BacktestEngine:
         
         print(f"   Fetching history for {len(all_tickers)} tickers ({self.start_date} to {self.end_date})...")
         try:
+            import yfinance as yf
             # interval 1d is standard for long backtests
             data = yf.download(all_tickers, start=self.start_date, end=self.end_date, interval="1d", progress=False)
             
@@ -49,47 +88,63 @@ class BacktestEngine:
             print(f"   Data Fetch Error: {e}")
             return None
 
-    def run(self):
-        prices_df = self.fetch_data()
-        if prices_df is None or prices_df.empty:
-            print("   No data.")
-            return {}
+    def _replay(self, prices_df, last_prices):
+        """
+        Replays one price frame through every strategy's run_batch.
+        Each tick is one row of a float array; no per-ticker dict is built
+        unless a strategy falls back to run_tick.
+        """
+        tickers = list(prices_df.columns)
+        values = prices_df.to_numpy(dtype=float)
+        # Last known price per column, seeded from earlier frames (chunked replays)
+        last = np.array([last_prices.get(t, np.nan) for t in tickers], dtype=float)
+        last_view = PriceVector(tickers, last)
 
-        # Replay
-        last_prices = {}
-        for timestamp, row in prices_df.iterrows():
-            market_data = {}
-            # row_dict = row.to_dict() # Might be Series or Dict depending on columns
-            
-            # Handle MultiIndex if necessary, but yfinance simple structure usually fits
-            # If 1 ticker, row is scalar/float? No, usually Series with Ticker index if multiple
-            
-            for ticker in row.index:
-                # If ticker is a column name (Multi-ticker)
-                val = row[ticker]
-                if pd.notna(val):
-                    market_data[ticker] = val
-                    last_prices[ticker] = val
-            
-            if not market_data: continue
+        # Per-bar conversion factors into the report currency, one array per strategy
+        factors = None
+        if self.report_currency is not None:
+            fx = self.fx.aligned(prices_df.index)
+            factors = [fx.factor(self.wallet_currency(s), self.report_currency).tolist() for s in self.strategies]
+
+        for i, (timestamp, row) in enumerate(zip(prices_df.index, values)):
+            quoted = ~np.isnan(row)
+            if not quoted.any(): continue
+            np.copyto(last, row, where=quoted)
 
             # Execute Strategies
-            for strategy in self.strategies:
+            for k, strategy in enumerate(self.strategies):
                 try:
-                    strategy.run_tick(market_data, timestamp)
+                    strategy.run_batch(tickers, row, timestamp)
                     
-                    # Track Daily Equity
-                    current_equity = strategy.broker.get_portfolio_value(last_prices)
+                    # Track Daily Equity (broker only looks up held tickers)
+                    current_equity = strategy.broker.get_portfolio_value(last_view)
                     if not hasattr(strategy, "equity_curve"): strategy.equity_curve = []
-                    strategy.equity_curve.append({
-                        "date": timestamp, 
-                        "equity": current_equity
-                    })
+                    point = {"date": timestamp, "equity": current_equity}
+                    if factors is not None:
+                        rate = factors[k][i]
+                        report = self._report.setdefault(strategy.name, [strategy.broker.initial_balance * rate, rate])
+                        report[1] = rate
+                        point["report_equity"] = current_equity * rate
+                    strategy.equity_curve.append(point)
                     
                 except Exception as e:
                     # print(f"Err {strategy.name}: {e}")
                     pass
-        
+
+        last_prices.update(last_view)
+
+    def run(self):
+        # Replay
+        last_prices = {}
+        replayed = False
+        for prices_df in self.iter_price_frames():
+            replayed = True
+            self._replay(prices_df, last_prices)
+
+        if not replayed:
+            print("   No data.")
+            return {}
+
         # Calculate Final Results
         results = {}
         for s in self.strategies:
@@ -99,8 +154,16 @@ class BacktestEngine:
                 "equity": equity,
                 "roi": roi,
                 "balance": s.broker.balance,
-                "trades": len(s.broker.trade_log),
+                "trades": s.broker.trade_count,
                 "history": getattr(s, "equity_curve", [])
             }
+            if s.name in self._report:
+                start, rate = self._report[s.name]
+                results[s.name].update({
+                    "currency": self.wallet_currency(s),
+                    "report_currency": self.report_currency,
+                    "report_equity": equity * rate,
+                    "report_roi": ((equity * rate - start) / start) * 100,
+                })
             
         return results
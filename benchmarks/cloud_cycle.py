@@ -0,0 +1,92 @@
+"""
+Round-trips and wall time of CloudBot cycles, offline.
+
+Runs run_cloud.CloudBot.run_all_markets against an in-memory state backend
+(execution/state_backend.py) with a simulated per-call latency, on random-walk
+prices for every market's tickers, and reports per cycle the backend
+round-trips, documents read / written and wall time. Each cycle is a fresh
+CloudBot over the same backend, like consecutive scheduled jobs.
+
+Two broker modes are compared:
+    batched    FirebaseBroker: unsynced trades + snapshot in one WriteBatch
+    per_write  the previous save: one write for the snapshot, then one per
+               trade for the last 5 trades, on every save
+
+Usage:
+    python -m benchmarks.cloud_cycle                  # 10 cycles, 20 ms latency
+    python -m benchmarks.cloud_cycle --cycles 30 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import numpy as np
+from execution.firebase_broker import FirebaseBroker
+
+class PerWriteBroker(FirebaseBroker):
+    """FirebaseBroker with the previous save_state: unbatched, no sync watermark."""
+    def save_state(self, filepath=None):
+        if self.backend is None: return
+        self.backend.set(self.doc_path, {
+            "balance": self.balance,
+            "positions": self.positions_state(),
+            "trade_log": self.trades_state(self.trade_log[-50:]),
+            "last_updated": datetime.now().isoformat(),
+        })
+        # Sync the last 5 trades to be safe (idempotency handles duplicates)
+        for trade in self.trades_state(self.trade_log[-5:]):
+            clean_time = str(trade['date']).replace(":", "-").replace(" ", "T")
+            trade["archived_at"] = datetime.now().isoformat()
+            self.backend.set(f"{self.doc_path}/trades/{clean_time}_{trade['ticker']}_{trade['action']}", trade)
+
+def run_cycles(mode, cycles, latency, seed=0):
+    """Stats dicts (round_trips, reads, writes, seconds) per cycle for one broker mode."""
+    import run_cloud
+    from config.settings import MARKET_CONFIG
+    from execution.state_backend import MemoryBackend
+
+    run_cloud.send_notification = lambda *a, **k: None # offline: no ntfy posts
+    backend = MemoryBackend(latency=latency)
+    rng = np.random.default_rng(seed)
+    tickers = {m: MARKET_CONFIG[m]["TICKERS"] for m in ["BIST", "GLOBAL", "CHIPS", "CRYPTO"]}
+    prices = {m: 100 * np.ones(len(t)) for m, t in tickers.items()}
+    broker_cls = PerWriteBroker if mode == "per_write" else None
+
+    per_cycle = []
+    for _ in range(cycles):
+        market_data = {}
+        for m, names in tickers.items():
+            prices[m] = prices[m] * np.exp(rng.normal(0, 0.03, len(names)))
+            market_data[m] = dict(zip(names, prices[m].tolist()))
+        backend.reset_stats()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # CloudBot's progress prints
+            run_cloud.CloudBot(backend=backend, broker_cls=broker_cls).run_all_markets(market_data)
+        per_cycle.append(dict(backend.stats, seconds=time.perf_counter() - start))
+    return per_cycle
+
+def main():
+    parser = argparse.ArgumentParser(description="CloudBot round-trips per cycle against an in-memory backend.")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per backend round-trip")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"{'MODE':<10} | {'ROUND-TRIPS':>11} | {'READS':>7} | {'WRITES':>7} | {'SEC/CYCLE':>9}")
+    print("-" * 56)
+    for mode in ("per_write", "batched"):
+        stats = run_cycles(mode, args.cycles, args.latency)
+        mean = {k: np.mean([s[k] for s in stats]) for k in stats[0]}
+        print(f"{mode:<10} | {mean['round_trips']:>11.1f} | {mean['reads']:>7.1f} | {mean['writes']:>7.1f} | {mean['seconds']:>9.3f}")
+
+if __name__ == "__main__":
+    main()
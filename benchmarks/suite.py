@@ -0,0 +1,411 @@
+"""
+Throughput benchmark suite on synthetic data.
+
+Drives BacktestEngine, PaperBroker, features.add_all_features and every strategy
+class over a GBM panel (data/synthetic.py) at fixed universe sizes, and reports
+bars/sec, trades/sec, peak RSS and peak Python allocations per case.
+
+Each case runs in its own child process so peak RSS belongs to that case only.
+Results are compared against benchmarks/baseline.json; any case that is slower
+or heavier than the baseline by more than --tolerance is marked FAIL and the
+suite exits with status 1. The baseline stores the interpreter, library
+versions, machine and data generator it was recorded with, and the report
+warns when the current run differs in any of them. Record it with the
+interpreter CI uses (requirements.txt pins, Python 3.9).
+
+Usage:
+    python -m benchmarks.suite                         # 10 / 100 tickers x 10 years
+    python -m benchmarks.suite --sizes 10,100,1000     # include the large universe
+    python -m benchmarks.suite --cases engine,broker   # subset
+    python -m benchmarks.suite --update-baseline       # record a new baseline
+
+    # Scale test: engine fed by the chunked generator (not part of the default set)
+    python -m benchmarks.suite --cases engine_stream --sizes 5000 --years 30 --no-alloc
+
+    # Strategy cases through the vectorized run_batch API (append _batch to any strategy case)
+    python -m benchmarks.suite --cases TrendStrategy,TrendStrategy_batch --sizes 1000
+
+    # Whole-panel feature kernel vs the per-frame features case
+    python -m benchmarks.suite --cases features,features_panel --sizes 1000
+
+    # Silent (columnar fill log) broker vs the logging broker
+    python -m benchmarks.suite --cases broker,broker_silent
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_SIZES = [10, 100]
+DEFAULT_YEARS = 10
+DEFAULT_TOLERANCE = 0.30
+
+# Strategy cases: case name -> (module, class)
+STRATEGY_CASES = {
+    "GridStrategy": ("strategies.grid_strategy", "GridStrategy"),
+    "MeanReversionStrategy": ("strategies.mean_reversion_strategy", "MeanReversionStrategy"),
+    "TrendStrategy": ("strategies.trend_strategy", "TrendStrategy"),
+    "DCAStrategy": ("strategies.dca_strategy", "DCAStrategy"),
+    "ChipMemoryStrategy": ("strategies.chip_strategy", "ChipMemoryStrategy"),
+    "BumTrendStrategy": ("strategies.advanced_strategies", "BumTrendStrategy"),
+    "MatrDipStrategy": ("strategies.advanced_strategies", "MatrDipStrategy"),
+    "GuaMomentumStrategy": ("strategies.advanced_strategies", "GuaMomentumStrategy"),
+    "MgbBandStrategy": ("strategies.advanced_strategies", "MgbBandStrategy"),
+}
+ALL_CASES = ["engine", "broker", "features"] + list(STRATEGY_CASES)
+# Opt-in scale cases that stream their own data instead of materializing the panel
+STREAMING_CASES = ["engine_stream"]
+# Opt-in: strategy cases driven through the vectorized run_batch API instead of run_tick
+BATCH_SUFFIX = "_batch"
+BATCH_CASES = [c + BATCH_SUFFIX for c in STRATEGY_CASES]
+
+# --- Workloads ---
+# Each workload takes (panel, tickers) and returns a callable that does the
+# timed work and returns (bars_processed, trades_executed).
+
+def _workload_engine(panel, tickers):
+    from backtest_engine import BacktestEngine
+    from strategies.trend_strategy import TrendStrategy
+
+    closes = panel['Close']
+    start, end = closes.index[0], closes.index[-1]
+
+    def run():
+        strat = TrendStrategy(name="Bench_Engine", balance=1000.0, tickers=list(tickers), load_state=False)
+        results = BacktestEngine(start, end, [strat], preloaded_data=closes).run()
+        return closes.size, results.get(strat.name, {}).get("trades", 0)
+    return run
+
+def _workload_engine_stream(spec, tickers):
+    """BacktestEngine fed chunk by chunk from the synthetic generator (scale test)."""
+    from backtest_engine import BacktestEngine
+    from strategies.trend_strategy import TrendStrategy
+    from data.synthetic import iter_panel_chunks
+
+    n_tickers, years, seed = spec
+
+    def run():
+        chunks = iter_panel_chunks(n_tickers, years, chunk_days=126, model="jump", seed=seed,
+                                   correlation=0.4, fields=['Close'], jump_intensity=6.0)
+        strat = TrendStrategy(name="Bench_EngineStream", balance=1000.0, tickers=list(tickers), load_state=False)
+        results = BacktestEngine("1900-01-01", "2200-01-01", [strat], preloaded_data=chunks).run()
+        bars = sum(1 for _ in results.get(strat.name, {}).get("history", [])) * n_tickers
+        return bars, results.get(strat.name, {}).get("trades", 0)
+    return run
+
+def _workload_broker(panel, tickers, silent=False):
+    from execution.paper_broker import PaperBroker
+
+    # One year is plenty to measure per-fill cost and keeps the trade log bounded.
+    closes = panel['Close'].iloc[:252]
+    prices = closes.to_numpy()
+    dates = list(closes.index)
+    # Trade on the sign of the daily move: ~half of all ticker-bars become fills.
+    ups = prices[1:] > prices[:-1]
+
+    def run():
+        broker = PaperBroker(start_balance=1e12, silent=silent)
+        for i in range(1, len(dates)):
+            date = dates[i]
+            row = prices[i]
+            up = ups[i - 1]
+            for j, ticker in enumerate(tickers):
+                if up[j]:
+                    if broker.get_position_amt(ticker) == 0:
+                        broker.buy(ticker, row[j], date, pct_portfolio=1e-9)
+                elif broker.get_position_amt(ticker) > 0:
+                    broker.sell(ticker, row[j], date)
+        return prices.size, broker.trade_count
+    return run
+
+def _workload_broker_silent(panel, tickers):
+    return _workload_broker(panel, tickers, silent=True)
+
+def _workload_features(panel, tickers):
+    from strategies.features import add_all_features
+
+    frames = [panel.xs(t, axis=1, level=1) for t in tickers]
+
+    def run():
+        bars = 0
+        for df in frames:
+            bars += len(add_all_features(df))
+        return bars, 0
+    return run
+
+def _workload_features_panel(panel, tickers):
+    from strategies.features import panel_features
+
+    def run():
+        return len(panel_features(panel)) * len(tickers), 0
+    return run
+
+def _workload_strategy(case, batch=False):
+    module_name, class_name = STRATEGY_CASES[case]
+
+    def factory(panel, tickers):
+        import importlib
+        cls = getattr(importlib.import_module(module_name), class_name)
+        closes = panel['Close']
+        prices = closes.to_numpy()
+        dates = list(closes.index)
+
+        def run():
+            strat = cls(name=f"Bench_{class_name}", balance=1000.0, tickers=list(tickers), load_state=False)
+            if batch:
+                for i, date in enumerate(dates):
+                    strat.run_batch(tickers, prices[i], date)
+            else:
+                for i, date in enumerate(dates):
+                    strat.run_tick(dict(zip(tickers, prices[i].tolist())), date)
+            return prices.size, len(strat.broker.trade_log)
+        return run
+    return factory
+
+def _get_workload(case):
+    if case == "engine": return _workload_engine
+    if case == "broker": return _workload_broker
+    if case == "broker_silent": return _workload_broker_silent
+    if case == "features": return _workload_features
+    if case == "engine_stream": return _workload_engine_stream
+    if case == "features_panel": return _workload_features_panel
+    if case in STRATEGY_CASES: return _workload_strategy(case)
+    if case in BATCH_CASES: return _workload_strategy(case[:-len(BATCH_SUFFIX)], batch=True)
+    raise ValueError(f"Unknown benchmark case: {case}")
+
+# --- Measurement (child process) ---
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError: # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def measure_case(case, n_tickers, years, seed=42, allocations=True):
+    """Runs one case in the current process and returns its metrics dict."""
+    from data.synthetic import generate_ohlcv, make_tickers
+
+    factory = _get_workload(case)
+    if case in STREAMING_CASES:
+        # Streaming workloads generate their own chunks inside the timed pass
+        panel = (n_tickers, years, seed)
+        tickers = make_tickers(n_tickers)
+    else:
+        panel = generate_ohlcv(n_tickers=n_tickers, years=years, seed=seed)
+        tickers = list(panel['Close'].columns)
+
+    # Keep console/file logging out of the measurement (message formatting still counts)
+    logging.disable(logging.ERROR)
+    try:
+        # 1. Timed pass
+        run = factory(panel, tickers)
+        t0 = time.perf_counter()
+        bars, trades = run()
+        elapsed = time.perf_counter() - t0
+        rss = _peak_rss_mb()
+
+        # 2. Allocation pass (tracemalloc slows things down, so it is never timed)
+        alloc_peak = None
+        if allocations:
+            run = factory(panel, tickers)
+            tracemalloc.start()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc_peak = peak / (1024 * 1024)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    return {
+        "case": case,
+        "tickers": n_tickers,
+        "years": years,
+        "bars": int(bars),
+        "trades": int(trades),
+        "seconds": elapsed,
+        "bars_per_sec": bars / elapsed if elapsed > 0 else 0.0,
+        "trades_per_sec": trades / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": rss,
+        "alloc_peak_mb": alloc_peak,
+    }
+
+def run_isolated(case, n_tickers, years, seed=42, allocations=True):
+    """Runs one case in a fresh interpreter and returns its metrics (or an error dict)."""
+    cmd = [sys.executable, "-m", "benchmarks.suite", "--child", case,
+           "--tickers", str(n_tickers), "--years", str(years), "--seed", str(seed)]
+    if not allocations:
+        cmd.append("--no-alloc")
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        err = proc.stderr.strip().splitlines()
+        return {"case": case, "tickers": n_tickers, "years": years,
+                "error": err[-1] if err else f"exit code {proc.returncode}"}
+    return json.loads(lines[-1])
+
+# --- Baseline comparison ---
+
+def case_key(result):
+    return f"{result['case']}/{result['tickers']}x{result['years']}"
+
+def environment():
+    """Interpreter, libraries, machine and data generator a run measures (stored with the baseline)."""
+    import hashlib
+    import platform
+    import numpy as np
+    import pandas as pd
+    with open(os.path.join(ROOT, "data", "synthetic.py"), 'rb') as f:
+        generator = hashlib.sha1(f.read()).hexdigest()[:12]
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "generator": generator, # hash of data/synthetic.py: same panels, same numbers
+    }
+
+# Environment fields that make throughput incomparable when they differ
+_COMPARABLE_KEYS = ("python", "implementation", "numpy", "pandas", "machine", "processor", "generator")
+
+def load_baseline(path=BASELINE_PATH):
+    """(results by case key, recorded environment or {})."""
+    if not os.path.exists(path):
+        return {}, {}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get("results", {}), data.get("environment", {})
+
+def save_baseline(results, path=BASELINE_PATH):
+    data = {
+        "environment": environment(),
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {case_key(r): r for r in results if "error" not in r},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def environment_mismatch(recorded, current):
+    """Messages for environment fields that differ from the baseline's (empty list = comparable)."""
+    if not recorded:
+        return ["baseline has no recorded environment"]
+    return [f"{key}: baseline {recorded.get(key)} != current {current.get(key)}"
+            for key in _COMPARABLE_KEYS if recorded.get(key) != current.get(key)]
+
+def compare(result, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Returns a list of regression messages for one result (empty list = OK).
+    Throughput may not drop, and memory may not grow, by more than `tolerance`.
+    """
+    if "error" in result:
+        return [f"error: {result['error']}"]
+    base = baseline.get(case_key(result))
+    if not base:
+        return []
+
+    problems = []
+    if base.get("bars_per_sec") and result["bars_per_sec"] < base["bars_per_sec"] * (1 - tolerance):
+        problems.append(f"bars/sec {result['bars_per_sec']:,.0f} < baseline {base['bars_per_sec']:,.0f}")
+    for key, label in (("peak_rss_mb", "peak RSS"), ("alloc_peak_mb", "alloc peak")):
+        cur, ref = result.get(key), base.get(key)
+        if cur is not None and ref and cur > ref * (1 + tolerance):
+            problems.append(f"{label} {cur:.1f}MB > baseline {ref:.1f}MB")
+    return problems
+
+def print_report(results, baseline, tolerance):
+    print(f"\n{'CASE':<28} | {'SIZE':<9} | {'BARS/S':>12} | {'TRADES/S':>10} | {'RSS MB':>8} | {'ALLOC MB':>8} | {'VS BASE':>8} | STATUS")
+    print("-" * 116)
+    failures = 0
+    for r in results:
+        size = f"{r['tickers']}x{r['years']}y"
+        problems = compare(r, baseline, tolerance)
+        if "error" in r:
+            print(f"{r['case']:<28} | {size:<9} | {'-':>12} | {'-':>10} | {'-':>8} | {'-':>8} | {'-':>8} | FAIL")
+        else:
+            base = baseline.get(case_key(r), {})
+            ratio = f"{r['bars_per_sec'] / base['bars_per_sec']:.2f}x" if base.get("bars_per_sec") else "new"
+            rss = f"{r['peak_rss_mb']:.1f}" if r.get('peak_rss_mb') is not None else "n/a"
+            alloc = f"{r['alloc_peak_mb']:.1f}" if r.get('alloc_peak_mb') is not None else "n/a"
+            status = "FAIL" if problems else "OK"
+            print(f"{r['case']:<28} | {size:<9} | {r['bars_per_sec']:>12,.0f} | {r['trades_per_sec']:>10,.0f} | {rss:>8} | {alloc:>8} | {ratio:>8} | {status}")
+        for p in problems:
+            print(f"    !! {p}")
+        failures += bool(problems)
+    print("-" * 116)
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI Trader throughput benchmarks (synthetic data)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma separated ticker counts (e.g. 10,100,1000)")
+    parser.add_argument("--years", type=int, default=DEFAULT_YEARS)
+    parser.add_argument("--cases", default=",".join(ALL_CASES), help="Comma separated case names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown / memory growth before failing")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", help="Also write raw results to this path")
+    # Internal: run a single case in this process and print its JSON
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--tickers", type=int, default=10, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = measure_case(args.child, args.tickers, args.years, args.seed, not args.no_alloc)
+        print(json.dumps(result))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cases = [c for c in args.cases.split(",") if c]
+    for c in cases:
+        _get_workload(c) # validate names early
+
+    results = []
+    for n in sizes:
+        for case in cases:
+            print(f"Running {case} ({n} tickers x {args.years}y)...", end="\r", flush=True)
+            results.append(run_isolated(case, n, args.years, args.seed, not args.no_alloc))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print_report(results, {}, args.tolerance)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    baseline, recorded = load_baseline(args.baseline)
+    failures = print_report(results, baseline, args.tolerance)
+    mismatch = environment_mismatch(recorded, environment()) if baseline else []
+    if mismatch:
+        print("Baseline was recorded in a different environment; throughput is not directly comparable:")
+        for m in mismatch:
+            print(f"    {m}")
+    if failures:
+        print(f"{failures} case(s) regressed beyond {args.tolerance:.0%} of baseline.")
+        return 1
+    print("All cases within tolerance of baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,16 @@
+from utils.startup import report_startup # First: start the cold-start clock
 import os
 import threading
 import subprocess
 import time
-from run_cloud import CloudBot
 
 def run_bot_loop():
     """Background Thread: Runs the Trading Bot continuously."""
     print("🚀 Background Bot Thread Started!")
+    # Imported here so the dashboard process starts without waiting for the bot's dependencies
+    from run_cloud import CloudBot
     bot = CloudBot()
+    report_startup("Bot ready")
     
     # Cloud Run Loop
     while True:
@@ -38,6 +41,8 @@ def run_streamlit():
     subprocess.run(cmd)
 
 if __name__ == "__main__":
+    report_startup("Cold start (imports)")
+
     # 1. Start Bot in Background Thread
     bot_thread = threading.Thread(target=run_bot_loop, daemon=True)
     bot_thread.start()
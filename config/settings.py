@@ -69,4 +69,5 @@ TRAINING_PERIOD = "2y"
 
 # Risk Management
 STOP_LOSS_PCT = 0.03   # 3% Loss -> Sell
+TRAILING_STOP_PCT = None # e.g. 0.10 = Sell 10% below the high since entry (None = off)
 KILL_SWITCH_PCT = 0.05 # 5% Portfolio Loss -> Stop Trading for Day
@@ -14,6 +14,7 @@ st.caption(f"Last Refreshed: {datetime.now().strftime('%H:%M:%S')}")
 # Side bar
 st.sidebar.header("Configuration")
 refresh_rate = st.sidebar.slider("Refresh Rate (s)", 5, 60, 10)
+report_currency = st.sidebar.selectbox("Report Currency", ["USD", "TRY"])
 
 # Check Mode (Cloud vs Local)
 # In Cloud Run, we should have GOOGLE_CLOUD_PROJECT or we implicitly know.
@@ -23,7 +24,50 @@ IS_CLOUD = os.getenv("K_SERVICE") is not None or os.getenv("CLOUD_MODE") == "Tru
 if IS_CLOUD:
     st.sidebar.success("☁️ Mode: Cloud (Firestore)")
 else:
-    st.sidebar.info("💻 Mode: Local (JSON)")
+    st.sidebar.info("💻 Mode: Local (SQLite / JSON)")
+
+def local_wallets():
+    """{name: state} from data/state.db (simulation_manager) plus any sim_*.json not in it."""
+    wallets = {}
+    if os.path.exists("data/state.db"):
+        from execution.state_store import SQLiteStateStore
+        store = SQLiteStateStore("data/state.db")
+        try:
+            for name in store.names():
+                wallets[name] = store.snapshot(name)
+        finally:
+            store.close()
+    for f in glob.glob("data/sim_*.json"):
+        name = os.path.basename(f).replace("sim_", "").replace(".json", "")
+        if name in wallets: continue
+        try:
+            with open(f, 'r') as file:
+                wallets[name] = json.load(file)
+        except: pass
+    return wallets
+
+def wallet_currency(data):
+    """Stored wallet currency, else the quote currency of its first position / trade, else the active market's."""
+    from data.fx import currency_of, normalize_currency
+    from config.settings import CURRENCY
+    if data.get("currency"):
+        return normalize_currency(data["currency"])
+    tickers = list(data.get("positions", {})) + [t.get("ticker") for t in data.get("trade_log", [])[:1]]
+    return currency_of(tickers[0]) if tickers and tickers[0] else normalize_currency(CURRENCY)
+
+@st.cache_data(ttl=3600)
+def load_fx(currencies):
+    """
+    Latest FX rates; None if they cannot be fetched. Re-run at most hourly; the quote
+    cache is extended whenever it ends before today (see FXRates.as_of for the quote date).
+    """
+    from data.fx import FXRates
+    try:
+        end = pd.Timestamp.today().normalize()
+        return FXRates.load(currencies, end - pd.Timedelta(days=14), end, max_stale_days=0)
+    except Exception as e:
+        st.sidebar.warning(f"FX unavailable, showing wallet currencies: {e}")
+        return None
 
 # Data Loading
 @st.cache_data(ttl=refresh_rate)
@@ -31,22 +75,12 @@ def load_data():
     strategies = []
     
     if IS_CLOUD:
-        # Load from Firestore
+        # Load from Firestore (or the STATE_BACKEND stand-in)
         try:
-            import firebase_admin
-            from firebase_admin import credentials, firestore
-            
-            if not firebase_admin._apps:
-                cred = credentials.ApplicationDefault()
-                firebase_admin.initialize_app(cred)
+            from execution.state_backend import STRATEGY_COLLECTION, get_backend
+            docs = get_backend().stream(STRATEGY_COLLECTION)
             
-            db = firestore.client()
-            docs = db.collection('trader_strategies').stream()
-            
-            for doc in docs:
-                data = doc.to_dict()
-                name = doc.id
-                
+            for name, data in docs:
                 balance = data.get("balance", 0)
                 positions = data.get("positions", {})
                 trade_log = data.get("trade_log", [])
@@ -56,37 +90,33 @@ def load_data():
                 
                 strategies.append({
                     "Name": name,
+                    "Currency": wallet_currency(data),
                     "Balance": balance,
                     "Equity (Est)": equity,
                     "Positions": len(positions),
-                    "Trades": len(trade_log)
+                    "Trades": data.get("synced_trades", len(trade_log))
                 })
         except Exception as e:
             st.error(f"Firestore Error: {e}")
             
     else:
-        # Load from Local JSON
-        files = glob.glob("data/sim_*.json")
-        for f in files:
+        # Load from Local SQLite / JSON
+        for name, data in local_wallets().items():
             try:
-                with open(f, 'r') as file:
-                    data = json.load(file)
-                    basename = os.path.basename(f)
-                    name = basename.replace("sim_", "").replace(".json", "")
-                    
-                    balance = data.get("balance", 0)
-                    positions = data.get("positions", {})
-                    trade_log = data.get("trade_log", [])
-                    
-                    equity = balance + sum([p['amount'] * p['entry_price'] for p in positions.values()])
-                    
-                    strategies.append({
-                        "Name": name,
-                        "Balance": balance,
-                        "Equity (Est)": equity,
-                        "Positions": len(positions),
-                        "Trades": len(trade_log)
-                    })
+                balance = data.get("balance", 0)
+                positions = data.get("positions", {})
+                trade_log = data.get("trade_log", [])
+                
+                equity = balance + sum([p['amount'] * p['entry_price'] for p in positions.values()])
+                
+                strategies.append({
+                    "Name": name,
+                    "Currency": wallet_currency(data),
+                    "Balance": balance,
+                    "Equity (Est)": equity,
+                    "Positions": len(positions),
+                    "Trades": len(trade_log)
+                })
             except: pass
             
     return pd.DataFrame(strategies)
@@ -94,19 +124,15 @@ def load_data():
 def load_trade_log(strategy_name):
     if IS_CLOUD:
         try:
-            import firebase_admin
-            from firebase_admin import firestore
-            if not firebase_admin._apps: firebase_admin.initialize_app()
-            db = firestore.client()
-            
-            doc = db.collection('trader_strategies').document(strategy_name).get()
-            if doc.exists:
-                return pd.DataFrame(doc.to_dict().get("trade_log", []))
+            from execution.state_backend import STRATEGY_COLLECTION, get_backend
+            data = get_backend().get(f"{STRATEGY_COLLECTION}/{strategy_name}")
+            if data is not None:
+                return pd.DataFrame(data.get("trade_log", []))
         except: pass
     else:
         try:
-            with open(f"data/sim_{strategy_name}.json", 'r') as file:
-                data = json.load(file)
+            data = local_wallets().get(strategy_name)
+            if data:
                 return pd.DataFrame(data.get("trade_log", []))
         except: pass
     return pd.DataFrame()
@@ -115,15 +141,29 @@ def load_trade_log(strategy_name):
 df = load_data()
 
 if not df.empty:
-    # ROI
+    # ROI (in each wallet's own currency; wallets start at 1000)
     df["ROI %"] = ((df["Equity (Est)"] - 1000) / 1000) * 100
+
+    # Mixed TRY / USD wallets: aggregate in the report currency at the latest rate
+    converted = sorted(set(df["Currency"]) | {report_currency})
+    fx = load_fx(tuple(converted))
+    if fx is not None:
+        rate = df["Currency"].map(lambda c: fx.rate(c, report_currency))
+        df["Balance"] = df["Balance"] * rate
+        df["Equity (Est)"] = df["Equity (Est)"] * rate
+        df["Currency"] = report_currency
     
     # Metrics
     total_equity = df["Equity (Est)"].sum()
     avg_roi = df["ROI %"].mean()
     
     c1, c2, c3 = st.columns(3)
-    c1.metric("Total AUM", f"{total_equity:.2f}")
+    c1.metric("Total AUM", f"{total_equity:.2f} {report_currency if fx is not None else ''}".strip())
+    if fx is not None:
+        # Oldest quote behind a conversion (weekends / failed refreshes carry the last one forward)
+        dates = [fx.as_of(c) for c in converted if fx.as_of(c) is not None]
+        if dates:
+            c1.caption(f"FX rate as of {min(dates):%Y-%m-%d}")
     c2.metric("Avg ROI", f"{avg_roi:.2f} %")
     c3.metric("Active Bots", len(df))
     
@@ -0,0 +1,170 @@
+"""
+Disk cache for add_all_features results.
+
+Entries are keyed by ticker, the first date of the range and a hash of the
+feature definitions (strategies/features.py source). An entry stores the raw
+inputs it was built from, the feature block and the EMA states at its last
+bar, so:
+- the same or a shorter range (same start) is a slice of the cache,
+- a range extended at the end only computes the new bars,
+- changed definitions or re-adjusted history are recomputed from scratch.
+"""
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import numpy as np
+import pandas as pd
+import strategies.features as features
+from strategies.features import FEATURE_COLUMNS, compute_features, add_all_features_many
+from strategies.live_features import EMA
+from utils.logger import setup_logger
+
+logger = setup_logger("Feature_Store")
+
+FEATURE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_cache")
+
+# Columns the features are computed from
+INPUT_COLUMNS = ['Adj Close', 'Close', 'High', 'Low']
+
+# Bars of history the windowed features need before the first new bar (SMA_200 + one previous bar)
+_LOOKBACK = 201
+
+def feature_definitions_hash():
+    """Short hash of the feature module source; any edit to a definition invalidates the cache."""
+    src = inspect.getsource(features) + ",".join(FEATURE_COLUMNS)
+    return hashlib.sha1(src.encode()).hexdigest()[:12]
+
+def _ema_state(values, span):
+    """EMA resumed at the end of `values` (last average and trailing missing count)."""
+    valid = np.flatnonzero(~np.isnan(values))
+    if not len(valid):
+        return EMA(span)
+    last = pd.Series(values).ewm(span=span, adjust=False).mean().iloc[-1]
+    return EMA(span, value=last, gap=len(values) - 1 - valid[-1])
+
+class FeatureStore:
+    """
+    Cached add_all_features / add_all_features_many.
+
+    Args:
+        root (str): Cache directory (created on first write).
+        version (str): Feature-definition key; defaults to feature_definitions_hash().
+    """
+    def __init__(self, root=FEATURE_CACHE_DIR, version=None):
+        self.root = root
+        self.version = version or feature_definitions_hash()
+        self.stats = {"hit": 0, "extend": 0, "miss": 0}
+
+    def _path(self, ticker, start):
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", str(ticker))
+        stamp = pd.Timestamp(start).strftime("%Y%m%d%H%M%S")
+        return os.path.join(self.root, safe, f"{stamp}_{self.version}.pkl")
+
+    def _load(self, path):
+        try:
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def _save(self, path, entry):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        # Entries for the same range under older definitions are dead weight
+        prefix = os.path.basename(path).split("_")[0]
+        for name in os.listdir(os.path.dirname(path)):
+            if name.startswith(prefix + "_") and name != os.path.basename(path) and name.endswith(".pkl"):
+                os.remove(os.path.join(os.path.dirname(path), name))
+
+    def _entry(self, index, raw, block):
+        """Cache entry for a freshly computed block (block: n x FEATURE_COLUMNS)."""
+        macd = block[:, FEATURE_COLUMNS.index('macd')]
+        return {
+            "index": index,
+            "raw": raw,
+            "features": block,
+            "ema": (_ema_state(raw[:, 0], 12), _ema_state(raw[:, 0], 26), _ema_state(macd, 9)),
+        }
+
+    def _extend(self, entry, index, raw):
+        """Appends the bars after the cached range; windowed features from a short lookback, EMAs resumed."""
+        m = len(entry["index"])
+        start = max(0, m - _LOOKBACK)
+        window = compute_features(*(raw[start:, [j]] for j in range(4)))[:, m - start:, 0].T.copy()
+
+        fast, slow, signal = entry["ema"] # freshly unpickled, safe to advance
+        cols = {c: i for i, c in enumerate(FEATURE_COLUMNS)}
+        for k, src in enumerate(raw[m:, 0].tolist()):
+            macd = fast.update(src) - slow.update(src)
+            sig = signal.update(macd)
+            window[k, cols['macd']] = macd
+            window[k, cols['macd_signal']] = sig
+            window[k, cols['macd_hist']] = macd - sig
+
+        return {
+            "index": index,
+            "raw": raw,
+            "features": np.vstack([entry["features"], window]),
+            "ema": (fast, slow, signal),
+        }
+
+    def _cached_block(self, ticker, df):
+        """Feature block for df from the cache (extending it if needed), or None on a miss."""
+        if df.empty:
+            return None
+        path = self._path(ticker, df.index[0])
+        entry = self._load(path)
+        if entry is None:
+            return None
+        raw = df[INPUT_COLUMNS].to_numpy(dtype=float)
+        m = min(len(entry["index"]), len(df))
+        # Reusable only if the overlapping bars are the same (e.g. no dividend re-adjustment)
+        if not (entry["index"][:m].equals(df.index[:m])
+                and np.array_equal(entry["raw"][:m], raw[:m], equal_nan=True)):
+            return None
+        if len(df) <= len(entry["index"]):
+            self.stats["hit"] += 1
+            return entry["features"][:len(df)]
+        entry = self._extend(entry, df.index, raw)
+        self._save(path, entry)
+        self.stats["extend"] += 1
+        return entry["features"]
+
+    def _store_block(self, ticker, df, block):
+        if not df.empty:
+            self._save(self._path(ticker, df.index[0]),
+                       self._entry(df.index, df[INPUT_COLUMNS].to_numpy(dtype=float), block))
+        self.stats["miss"] += 1
+
+    @staticmethod
+    def _attach(df, block):
+        feats = pd.DataFrame(block, index=df.index, columns=FEATURE_COLUMNS)
+        return pd.concat([df.drop(columns=[c for c in FEATURE_COLUMNS if c in df.columns]), feats], axis=1)
+
+    def add_all_features(self, ticker, df: pd.DataFrame) -> pd.DataFrame:
+        """features.add_all_features(df), served from / written to the cache."""
+        return self.add_all_features_many({ticker: df})[ticker]
+
+    def add_all_features_many(self, frames: dict) -> dict:
+        """features.add_all_features_many(frames); only cache misses are computed (in one batch)."""
+        result, missing = {}, {}
+        for ticker, df in frames.items():
+            block = self._cached_block(ticker, df)
+            if block is None:
+                missing[ticker] = df
+            else:
+                result[ticker] = self._attach(df, block)
+
+        if missing:
+            for ticker, out in add_all_features_many(missing).items():
+                self._store_block(ticker, missing[ticker], out[FEATURE_COLUMNS].to_numpy())
+                result[ticker] = out
+        return {t: result[t] for t in frames}
@@ -0,0 +1,171 @@
+"""
+FX rates for multi-currency reporting.
+
+FXRates holds Yahoo FX quotes (`TRY=X` = TRY per 1 USD, ...) as one
+dates x currencies float array with USD as the pivot. Aligned onto a backtest's
+calendar, a conversion is a precomputed per-bar factor array, so converting an
+equity curve costs one multiply per bar:
+
+    fx = FXRates.load(["TRY"], "2015-01-01", "2026-01-01").aligned(prices.index)
+    usd = fx.factor("TRY", "USD")       # USD per 1 TRY, one value per bar
+    equity_usd = equity_try * usd[i]
+
+Fetched quotes are cached per currency under data/fx_cache/ and only
+re-downloaded when a request runs past the cached range (by default a cache
+ending within 7 days of `end` still counts; live callers pass
+max_stale_days=0). FXRates.as_of() gives the date of the last real quote
+behind a rate. pandas is only
+imported by the loaders, so brokers can import the currency helpers cheaply.
+"""
+import os
+import pickle
+import numpy as np
+from utils.logger import setup_logger
+
+logger = setup_logger("FX_Rates")
+
+FX_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fx_cache")
+
+PIVOT = "USD"
+CURRENCY_ALIASES = {"TL": "TRY", "USDT": "USD"}
+
+def normalize_currency(code):
+    """Upper-case ISO code ('TL' -> 'TRY'); None stays None."""
+    if code is None:
+        return None
+    code = str(code).upper()
+    return CURRENCY_ALIASES.get(code, code)
+
+def currency_of(ticker):
+    """Quote currency of a Yahoo ticker: '.IS' -> TRY, 'XXX-EUR' -> EUR, 'USDTRY=X' -> TRY, else USD."""
+    ticker = str(ticker).upper()
+    if ticker.endswith(".IS"):
+        return "TRY"
+    if ticker.endswith("=X"):
+        return normalize_currency(ticker[:-2][-3:])
+    suffix = ticker.rsplit("-", 1)[1] if "-" in ticker else ""
+    if len(suffix) >= 3 and suffix.isalpha(): # 'BTC-USD', not 'BRK-B'
+        return normalize_currency(suffix)
+    return PIVOT
+
+class FXRates:
+    """
+    Args:
+        quotes (pd.DataFrame): Dates x currency codes, units of currency per 1 USD.
+            USD itself is implied (always 1). Gaps are forward-filled.
+    """
+    def __init__(self, quotes):
+        quotes = quotes.rename(columns=normalize_currency).sort_index()
+        quotes = quotes.loc[:, [c for c in quotes.columns if c != PIVOT]]
+        self.index = quotes.index
+        self.currencies = [PIVOT] + list(quotes.columns)
+        self.col = {c: j for j, c in enumerate(self.currencies)}
+        values = quotes.ffill().bfill().to_numpy(dtype=float)
+        self.values = np.hstack([np.ones((len(self.index), 1)), values])
+        self.last_quote = {c: quotes[c].last_valid_index() for c in quotes.columns}
+        self._factors = {}
+
+    def __contains__(self, currency):
+        return normalize_currency(currency) in self.col
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def load(cls, currencies, start, end, cache_dir=FX_CACHE_DIR, max_stale_days=7):
+        """
+        Quotes for `currencies` (vs USD) over [start, end], from the cache or Yahoo.
+        A cache ending more than `max_stale_days` before `end` is extended first.
+        """
+        import pandas as pd
+        series = {}
+        for code in dict.fromkeys(normalize_currency(c) for c in currencies):
+            if code != PIVOT:
+                series[code] = _cached_quotes(code, pd.Timestamp(start), pd.Timestamp(end), cache_dir,
+                                              max_stale_days)
+        quotes = pd.DataFrame(series)
+        if quotes.empty:
+            quotes = pd.DataFrame(index=pd.DatetimeIndex([pd.Timestamp(start)]))
+        return cls(quotes)
+
+    def aligned(self, index):
+        """These rates on another calendar: last known quote per date (the first quote before the first one)."""
+        import pandas as pd
+        index = pd.Index(index)
+        pos = self.index.searchsorted(index, side="right") - 1
+        aligned = FXRates.__new__(FXRates)
+        aligned.index = index
+        aligned.currencies = self.currencies
+        aligned.col = self.col
+        aligned.last_quote = self.last_quote
+        aligned.values = self.values[np.clip(pos, 0, len(self.index) - 1)]
+        aligned._factors = {}
+        return aligned
+
+    def as_of(self, currency):
+        """Date of the last actual quote of `currency` (None for USD / unknown); later rates are carried forward."""
+        return self.last_quote.get(normalize_currency(currency))
+
+    def factor(self, source, target):
+        """Units of `target` per 1 `source`, one value per date (cached)."""
+        source, target = normalize_currency(source), normalize_currency(target)
+        key = (source, target)
+        factor = self._factors.get(key)
+        if factor is None:
+            if source == target:
+                factor = np.ones(len(self.index))
+            else:
+                factor = self.values[:, self.col[target]] / self.values[:, self.col[source]]
+            self._factors[key] = factor
+        return factor
+
+    def rate(self, source, target, i=-1):
+        """Units of `target` per 1 `source` at row i (default: latest)."""
+        if normalize_currency(source) == normalize_currency(target):
+            return 1.0
+        return float(self.factor(source, target)[i])
+
+    def convert(self, amount, source, target, i=-1):
+        return amount * self.rate(source, target, i)
+
+def _cached_quotes(code, start, end, cache_dir, max_stale_days=7):
+    """Close quotes of `{code}=X`, extending data/fx_cache/{code}.pkl when the range runs past it."""
+    import pandas as pd
+    path = os.path.join(cache_dir, f"{code}.pkl")
+    cached = None
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable FX cache {path}: {e}")
+
+    if cached is not None and len(cached) and cached.index[0] <= start and cached.index[-1] >= end - pd.Timedelta(days=max_stale_days):
+        return cached
+
+    import yfinance as yf
+    lo = min(start, cached.index[0]) if cached is not None and len(cached) else start
+    try:
+        raw = yf.download(f"{code}=X", start=lo, end=end + pd.Timedelta(days=1), interval="1d", progress=False)
+    except Exception as e:
+        if cached is None:
+            raise
+        logger.warning(f"FX fetch for {code}=X failed ({e}); using the cached range.")
+        return cached
+    if hasattr(raw.columns, 'nlevels') and raw.columns.nlevels > 1: raw.columns = raw.columns.droplevel(1)
+    fetched = raw['Close'].dropna() if 'Close' in raw else pd.Series(dtype=float)
+    if fetched.empty:
+        if cached is None:
+            raise ValueError(f"No FX quotes for {code}=X")
+        logger.warning(f"FX fetch for {code}=X returned nothing; using the cached range.")
+        return cached
+    fetched.index = pd.DatetimeIndex(fetched.index).tz_localize(None)
+    quotes = fetched if cached is None else fetched.combine_first(cached)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(quotes, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return quotes
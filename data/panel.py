@@ -0,0 +1,157 @@
+"""
+Compact multi-ticker panel: one fields x dates x tickers float32 array.
+
+A FeaturePanel holds what would otherwise be one float64 DataFrame per ticker
+(e.g. the active_data / test_datasets dicts of the study scripts) in half the
+memory, and cross-ticker work becomes array slicing:
+
+    panel = FeaturePanel.from_pandas(generate_panel(500, 10)).with_features()
+    rsi = panel['RSI']                  # dates x tickers view, no copy
+    panel.frame('Close')                # pandas dates x tickers on demand
+    BacktestEngine(start, end, strategies, preloaded_data=panel)
+"""
+import numpy as np
+import pandas as pd
+
+class FeaturePanel:
+    """
+    Named fields x dates x tickers float32 array.
+
+    Args:
+        values (np.ndarray): Array shaped (len(fields), len(dates), len(tickers)).
+        fields (list): Field names (e.g. 'Close', 'RSI').
+        dates (pd.Index): Date index.
+        tickers (list): Ticker names.
+        dtype: Storage dtype (float32 by default).
+    """
+    def __init__(self, values, fields, dates, tickers, dtype=np.float32):
+        self.values = np.asarray(values, dtype=dtype)
+        self.fields = list(fields)
+        self.dates = pd.Index(dates)
+        self.tickers = list(tickers)
+        if self.values.shape != (len(self.fields), len(self.dates), len(self.tickers)):
+            raise ValueError(f"values shape {self.values.shape} does not match "
+                             f"({len(self.fields)}, {len(self.dates)}, {len(self.tickers)})")
+        self._field_idx = {f: i for i, f in enumerate(self.fields)}
+        self._ticker_idx = {t: i for i, t in enumerate(self.tickers)}
+
+    # --- Construction ---
+
+    @classmethod
+    def from_pandas(cls, panel: pd.DataFrame, fields=None, dtype=np.float32):
+        """From a (field, ticker) column panel (yfinance multi-ticker / data.synthetic layout)."""
+        available = list(dict.fromkeys(panel.columns.get_level_values(0)))
+        fields = available if fields is None else list(fields)
+        tickers = list(dict.fromkeys(panel.columns.get_level_values(1)))
+        values = np.empty((len(fields), len(panel), len(tickers)), dtype=dtype)
+        for i, f in enumerate(fields):
+            values[i] = panel[f].reindex(columns=tickers).to_numpy()
+        return cls(values, fields, panel.index, tickers, dtype=dtype)
+
+    @classmethod
+    def from_frames(cls, frames: dict, fields=None, dtype=np.float32):
+        """From {ticker: dates x fields DataFrame}; dates are the sorted union (NaN where a ticker has no bar)."""
+        tickers = list(frames)
+        if fields is None:
+            fields = list(dict.fromkeys(c for df in frames.values() for c in df.columns))
+        dates = pd.Index([])
+        for df in frames.values():
+            dates = dates.union(df.index)
+        values = np.full((len(fields), len(dates), len(tickers)), np.nan, dtype=dtype)
+        for j, t in enumerate(tickers):
+            df = frames[t].reindex(index=dates, columns=fields)
+            values[:, :, j] = df.to_numpy(dtype=dtype).T
+        return cls(values, fields, dates, tickers, dtype=dtype)
+
+    def with_features(self):
+        """
+        New panel with features.FEATURE_COLUMNS appended, computed by
+        compute_features straight into the float32 storage.
+        Uses 'Adj Close' as the price source when present, else 'Close'.
+        """
+        from strategies.features import FEATURE_COLUMNS, compute_features
+
+        new = [f for f in FEATURE_COLUMNS if f not in self._field_idx]
+        values = np.empty((len(self.fields) + len(new),) + self.values.shape[1:], dtype=self.values.dtype)
+        values[:len(self.fields)] = self.values
+        panel = FeaturePanel(values, self.fields + new, self.dates, self.tickers, dtype=self.values.dtype)
+
+        src = self['Adj Close'] if 'Adj Close' in self._field_idx else self['Close']
+        bars = (src, self['Close'], self['High'], self['Low'])
+        if new == FEATURE_COLUMNS:
+            compute_features(*bars, out=panel.values[len(self.fields):])
+        else:
+            for f, block in zip(FEATURE_COLUMNS, compute_features(*bars)):
+                panel.values[panel._field_idx[f]] = block
+        return panel
+
+    # --- Access ---
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def __contains__(self, field):
+        return field in self._field_idx
+
+    def __getitem__(self, field):
+        """dates x tickers array of one field (view)."""
+        return self.values[self._field_idx[field]]
+
+    def ticker(self, ticker):
+        """fields x dates array of one ticker (view)."""
+        return self.values[:, :, self._ticker_idx[ticker]]
+
+    def sel(self, fields=None, dates=None, tickers=None):
+        """
+        Sub-panel by field names, a date slice (label based, e.g. slice("2023", None))
+        or date labels, and ticker names. Slicing dates or a single field keeps views.
+        """
+        values, index = self.values, self.dates
+        out_fields, out_tickers = self.fields, self.tickers
+        if fields is not None:
+            out_fields = list(fields)
+            values = values[[self._field_idx[f] for f in out_fields]]
+        if dates is not None:
+            if isinstance(dates, slice):
+                rows = index.slice_indexer(dates.start, dates.stop, dates.step)
+            else:
+                rows = index.get_indexer(pd.Index(dates))
+                if (rows < 0).any():
+                    raise KeyError("dates not in panel")
+            values, index = values[:, rows], index[rows]
+        if tickers is not None:
+            out_tickers = list(tickers)
+            values = values[:, :, [self._ticker_idx[t] for t in out_tickers]]
+        return FeaturePanel(values, out_fields, index, out_tickers, dtype=self.values.dtype)
+
+    # --- pandas on demand ---
+
+    def frame(self, field, dtype=None):
+        """dates x tickers DataFrame of one field (zero-copy unless dtype differs)."""
+        data = self[field] if dtype is None else self[field].astype(dtype)
+        return pd.DataFrame(data, index=self.dates, columns=self.tickers, copy=False)
+
+    def ticker_frame(self, ticker, dtype=float):
+        """dates x fields DataFrame of one ticker, like the per-ticker feature frames."""
+        return pd.DataFrame(self.ticker(ticker).T.astype(dtype), index=self.dates, columns=self.fields)
+
+    def to_frames(self, dtype=float):
+        """{ticker: dates x fields DataFrame}."""
+        return {t: self.ticker_frame(t, dtype) for t in self.tickers}
+
+    def to_pandas(self, dtype=None):
+        """(field, ticker) column panel, the inverse of from_pandas."""
+        data = self.values.transpose(1, 0, 2).reshape(len(self.dates), -1)
+        if dtype is not None:
+            data = data.astype(dtype)
+        columns = pd.MultiIndex.from_product([self.fields, self.tickers])
+        return pd.DataFrame(data, index=self.dates, columns=columns)
+
+    def __repr__(self):
+        return (f"FeaturePanel({len(self.fields)} fields x {len(self.dates)} dates x "
+                f"{len(self.tickers)} tickers, {self.values.dtype}, {self.nbytes / 1e6:.1f} MB)")
@@ -0,0 +1,249 @@
+"""
+Synthetic market generator for stress and scale tests.
+
+Produces dates x tickers OHLCV panels from vectorized price models:
+    - "gbm":    Geometric Brownian Motion
+    - "jump":   Merton jump-diffusion (GBM + Poisson jumps)
+    - "regime": Markov regime switching (market-wide bull/bear/crisis states)
+
+Cross-sectional correlation is either a single scalar (one-factor model, cheap
+for very large universes) or a full correlation matrix (Cholesky).
+
+Output is shaped like a multi-ticker yfinance download (columns are a
+(field, ticker) MultiIndex), so panel['Close'] goes straight into
+BacktestEngine(preloaded_data=...). iter_panel_chunks() streams the same panel
+in date chunks for universes that do not fit in memory at once; every random
+component has its own seeded stream, so the concatenated chunks are identical
+to the one-shot panel for the same seed.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+MODELS = ("gbm", "jump", "regime")
+
+# Annualized parameter presets
+PRESETS = {
+    # Developed-market equities
+    "US_EQUITY": {"mu": 0.08, "sigma": 0.22, "correlation": 0.35},
+    # High-inflation TRY market: strong nominal drift, fat tails
+    "TRY_INFLATION": {
+        "mu": 0.45, "sigma": 0.38, "correlation": 0.45,
+        "jump_intensity": 6.0, "jump_mean": -0.02, "jump_std": 0.06,
+    },
+    # Crypto: high vol, frequent jumps
+    "CRYPTO": {
+        "mu": 0.30, "sigma": 0.75, "correlation": 0.6,
+        "jump_intensity": 12.0, "jump_mean": 0.0, "jump_std": 0.08,
+    },
+}
+
+# Default regimes for model="regime": (annual drift, annual vol)
+DEFAULT_REGIMES = [(0.15, 0.15), (-0.10, 0.30), (-0.60, 0.70)] # bull, bear, crisis
+DEFAULT_TRANSITIONS = [
+    [0.990, 0.009, 0.001],
+    [0.020, 0.975, 0.005],
+    [0.050, 0.100, 0.850],
+]
+
+# Independent random streams (order matters for reproducibility)
+_STREAMS = ("shock", "factor", "jump_count", "jump_size", "regime", "range", "volume")
+
+def make_tickers(n_tickers, prefix="SYN"):
+    """Deterministic synthetic ticker names: SYN0000, SYN0001, ..."""
+    return [f"{prefix}{i:04d}" for i in range(n_tickers)]
+
+class MarketGenerator:
+    """
+    Seeded, chunkable panel generator.
+
+    Args:
+        tickers (int | list): Universe size or explicit ticker names.
+        model (str): "gbm", "jump" or "regime".
+        mu, sigma (float | array): Annual drift / volatility (scalar or per ticker).
+        correlation (float | 2D array): Pairwise correlation (one-factor) or full matrix.
+        jump_intensity (float): Expected jumps per year ("jump" model).
+        jump_mean, jump_std (float): Log-size distribution of a single jump.
+        regimes (list): [(mu, sigma), ...] per regime ("regime" model).
+        transitions (2D array): Daily Markov transition matrix between regimes.
+        start_price (float | array): Initial price level.
+        start (str): First business day of the calendar.
+        fields (list): OHLCV fields to emit (e.g. ['Close'] for memory-light runs).
+        dtype: Output float dtype (np.float32 halves memory for huge panels).
+        seed (int): Master seed.
+    """
+    def __init__(self, tickers=10, model="gbm", mu=0.08, sigma=0.25, correlation=0.0,
+                 jump_intensity=0.0, jump_mean=0.0, jump_std=0.05,
+                 regimes=None, transitions=None, start_price=100.0,
+                 start="2000-01-03", fields=None, dtype=np.float64, seed=42):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model '{model}'. Choose from {MODELS}.")
+
+        self.tickers = make_tickers(tickers) if isinstance(tickers, int) else list(tickers)
+        n = len(self.tickers)
+        self.model = model
+        self.mu = np.broadcast_to(np.asarray(mu, dtype=float), (n,))
+        self.sigma = np.broadcast_to(np.asarray(sigma, dtype=float), (n,))
+        self.jump_intensity = float(jump_intensity)
+        self.jump_mean = float(jump_mean)
+        self.jump_std = float(jump_std)
+        self.start = start
+        self.fields = list(fields) if fields else list(OHLCV_FIELDS)
+        self.dtype = dtype
+        self.seed = seed
+
+        unknown = [f for f in self.fields if f not in OHLCV_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}")
+
+        # Correlation structure
+        self._chol = None
+        self._rho = 0.0
+        corr = np.asarray(correlation, dtype=float)
+        if corr.ndim == 0:
+            if not 0.0 <= corr < 1.0:
+                raise ValueError("Scalar correlation must be in [0, 1).")
+            self._rho = float(corr)
+        else:
+            if corr.shape != (n, n):
+                raise ValueError(f"Correlation matrix must be {n}x{n}.")
+            self._chol = np.linalg.cholesky(corr) # raises if not positive definite
+
+        # Regimes
+        if model == "regime":
+            regimes = regimes if regimes is not None else DEFAULT_REGIMES
+            transitions = transitions if transitions is not None else DEFAULT_TRANSITIONS
+            self.regime_mu = np.array([r[0] for r in regimes], dtype=float)
+            self.regime_sigma = np.array([r[1] for r in regimes], dtype=float)
+            self.transitions = np.asarray(transitions, dtype=float)
+            k = len(regimes)
+            if self.transitions.shape != (k, k) or not np.allclose(self.transitions.sum(axis=1), 1.0):
+                raise ValueError("Transition matrix must be square with rows summing to 1.")
+            self._cum_transitions = np.cumsum(self.transitions, axis=1)
+
+        self.start_price = np.broadcast_to(np.asarray(start_price, dtype=float), (n,)).copy()
+        self.reset()
+
+    @classmethod
+    def from_preset(cls, preset, tickers=10, model=None, **overrides):
+        """Builds a generator from PRESETS (e.g. "TRY_INFLATION")."""
+        params = dict(PRESETS[preset])
+        if model is None:
+            model = "jump" if params.get("jump_intensity") else "gbm"
+        params.update(overrides)
+        return cls(tickers=tickers, model=model, **params)
+
+    def reset(self):
+        """Rewinds all random streams and price state to the start."""
+        children = np.random.SeedSequence(self.seed).spawn(len(_STREAMS))
+        self._rng = {name: np.random.default_rng(s) for name, s in zip(_STREAMS, children)}
+        self._last_close = self.start_price.copy()
+        self._regime = 0
+        self._day = 0
+
+    # --- Model components ---
+
+    def _shocks(self, rows):
+        """Correlated standard normal shocks, shape (rows, n)."""
+        n = len(self.tickers)
+        eps = self._rng["shock"].standard_normal((rows, n))
+        if self._chol is not None:
+            return eps @ self._chol.T
+        if self._rho > 0:
+            market = self._rng["factor"].standard_normal((rows, 1))
+            return np.sqrt(self._rho) * market + np.sqrt(1.0 - self._rho) * eps
+        return eps
+
+    def _regime_path(self, rows):
+        """Market-wide regime index per day (Markov chain)."""
+        u = self._rng["regime"].random(rows)
+        path = np.empty(rows, dtype=np.int64)
+        state = self._regime
+        cum = self._cum_transitions
+        for i in range(rows):
+            state = int(np.searchsorted(cum[state], u[i], side="right"))
+            state = min(state, len(cum) - 1)
+            path[i] = state
+        self._regime = state
+        return path
+
+    def _log_returns(self, rows):
+        dt = 1.0 / TRADING_DAYS
+        z = self._shocks(rows)
+
+        if self.model == "regime":
+            path = self._regime_path(rows)
+            # Regime moves the whole market; per-ticker sigma scales around it
+            scale = self.sigma / self.sigma.mean() if self.sigma.mean() > 0 else 1.0
+            mu = self.regime_mu[path][:, None]
+            sigma = self.regime_sigma[path][:, None] * scale
+        else:
+            mu, sigma = self.mu, self.sigma
+
+        log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * z
+
+        if self.model == "jump" and self.jump_intensity > 0:
+            counts = self._rng["jump_count"].poisson(self.jump_intensity * dt, size=z.shape)
+            sizes = self._rng["jump_size"].standard_normal(z.shape)
+            # Sum of k normal jumps ~ N(k*mean, k*std^2)
+            log_ret += counts * self.jump_mean + np.sqrt(counts) * self.jump_std * sizes
+        return log_ret
+
+    # --- Panel generation ---
+
+    def _next_chunk(self, rows, dates):
+        n = len(self.tickers)
+        log_ret = self._log_returns(rows)
+        close = self._last_close * np.exp(np.cumsum(log_ret, axis=0))
+        prev_close = np.vstack([self._last_close[None, :], close[:-1]])
+        self._last_close = close[-1].copy()
+
+        # Range/volume streams are always drawn so chunking stays seed-stable
+        wiggle = np.abs(self._rng["range"].standard_normal((rows, n))) * (self.sigma / np.sqrt(TRADING_DAYS)) * 0.5
+        volume = np.exp(13.0 + 0.5 * self._rng["volume"].standard_normal((rows, n)))
+
+        data = {}
+        for f in self.fields:
+            if f == 'Open': data[f] = prev_close
+            elif f == 'High': data[f] = np.maximum(prev_close, close) * (1 + wiggle)
+            elif f == 'Low': data[f] = np.minimum(prev_close, close) * (1 - wiggle)
+            elif f in ('Close', 'Adj Close'): data[f] = close
+            elif f == 'Volume': data[f] = np.round(volume)
+
+        columns = pd.MultiIndex.from_product([self.fields, self.tickers], names=['Price', 'Ticker'])
+        values = np.hstack([data[f] for f in self.fields]).astype(self.dtype, copy=False)
+        return pd.DataFrame(values, index=dates, columns=columns)
+
+    def iter_chunks(self, n_days, chunk_days=252):
+        """
+        Streams the next n_days as DataFrames of at most chunk_days rows.
+        Peak memory is bounded by one chunk regardless of n_days.
+        """
+        calendar = pd.bdate_range(start=self.start, periods=self._day + n_days)[self._day:]
+        for i in range(0, n_days, chunk_days):
+            dates = calendar[i:i + chunk_days]
+            chunk = self._next_chunk(len(dates), dates)
+            self._day += len(dates)
+            yield chunk
+
+    def generate(self, n_days):
+        """Generates the next n_days as a single panel."""
+        chunks = list(self.iter_chunks(n_days, chunk_days=max(n_days, 1)))
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+
+def generate_panel(n_tickers=10, years=10, model="gbm", seed=42, **kwargs):
+    """One-shot panel for `years` of business days. kwargs go to MarketGenerator."""
+    gen = MarketGenerator(tickers=n_tickers, model=model, seed=seed, **kwargs)
+    return gen.generate(int(years * TRADING_DAYS))
+
+def iter_panel_chunks(n_tickers=10, years=10, chunk_days=252, model="gbm", seed=42, **kwargs):
+    """Streams a `years`-long panel in date chunks (same values as generate_panel)."""
+    gen = MarketGenerator(tickers=n_tickers, model=model, seed=seed, **kwargs)
+    return gen.iter_chunks(int(years * TRADING_DAYS), chunk_days=chunk_days)
+
+def generate_ohlcv(n_tickers=10, years=10, start="2015-01-01", mu=0.08, sigma=0.25,
+                   start_price=100.0, seed=42):
+    """Uncorrelated GBM OHLCV panel (kept for the benchmark suite)."""
+    return generate_panel(n_tickers, years, model="gbm", seed=seed, start=start,
+                          mu=mu, sigma=sigma, start_price=start_price)
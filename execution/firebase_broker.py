@@ -1,90 +1,98 @@
 from execution.paper_broker import PaperBroker
-import firebase_admin
-from firebase_admin import credentials, firestore
+from execution.state_backend import STRATEGY_COLLECTION, get_backend
 from datetime import datetime
 
 class FirebaseBroker(PaperBroker):
-    def __init__(self, start_balance=1000.0, commission=0.001, slippage=0.001, strategy_name="Unknown"):
+    def __init__(self, start_balance=1000.0, commission=0.001, slippage=0.001, strategy_name="Unknown", backend=None):
+        """
+        Args:
+            backend (StateBackend): Document store for the wallet; None = get_backend()
+                (Firestore unless STATE_BACKEND says otherwise).
+        """
         super().__init__(start_balance, commission, slippage)
         self.strategy_name = strategy_name
-        self.db = None
-        self.doc_ref = None
+        self.backend = backend
+        # Store in 'trader_strategies' collection
+        self.doc_path = f"{STRATEGY_COLLECTION}/{strategy_name}"
+        # Sync watermark: trades archived in total / of them in this trade_log, wallet at the last save
+        self._sync = {"synced": 0, "logged": 0, "fingerprint": None}
         self.connect_db()
         self.load_cloud_state()
 
     def connect_db(self):
+        if self.backend is not None: return
         try:
-            # Check if app is already initialized
-            if not firebase_admin._apps:
-                # Use default credentials (works on Google Cloud automatically)
-                # For local, user needs GOOGLE_APPLICATION_CREDENTIALS env var
-                cred = credentials.ApplicationDefault()
-                firebase_admin.initialize_app(cred)
-            
-            self.db = firestore.client()
-            # Store in 'trader_strategies' collection
-            self.doc_ref = self.db.collection('trader_strategies').document(self.strategy_name)
-            
+            self.backend = get_backend()
         except Exception as e:
             print(f"Firebase Connect Error: {e}")
 
+    def _trade_doc_id(self, trade, seq):
+        # Format: 2024-01-01T12-00-00_AAPL_BUY_000042 (seq keeps same-bar fills apart)
+        clean_time = str(trade['date']).replace(":", "-").replace(" ", "T")
+        return f"{clean_time}_{trade['ticker']}_{trade['action']}_{seq:06d}"
+
     def save_state(self, filepath=None):
-        """Override to save to Firestore instead of JSON."""
-        if not self.doc_ref: return
-        
-        # 1. Update Snapshot (Balance + Positions)
+        """
+        Override to save to Firestore (the state backend) instead of JSON.
+
+        Only trades after the sync watermark are archived, and they go out with the
+        snapshot in one WriteBatch commit (chunked at the backend's batch limit).
+        Nothing is written when the wallet did not change since the last save. The watermark (total archived trades) is stored
+        in the snapshot, so a restarted bot does not re-archive.
+        """
+        if self.backend is None: return
+        log = self.trade_log
+        sync = self._sync # shared with PersistenceWorker snapshots (shallow copies)
+        fingerprint = (self.balance, len(log))
+        if fingerprint == sync["fingerprint"]:
+            return
+
+        # 1. Snapshot (Balance + Positions)
         # We KEEP the last 50 limit for the 'snapshot' document to keep the dashboard fast/light.
+        new_trades = list(log[sync["logged"]:])
+        synced = sync["synced"] + len(new_trades)
         state = {
             "balance": self.balance,
-            "positions": self.positions,
-            "trade_log": self.trade_log[-50:], 
+            "positions": self.positions_state(),
+            "trade_log": self.trades_state(log[-50:]),
+            "synced_trades": synced,
             "last_updated": datetime.now().isoformat()
         }
+        if self.currency is not None:
+            state["currency"] = self.currency
+
+        # 2. ARCHIVE TRADES (For AI Training): the unsynced ones only
+        archived_at = datetime.now().isoformat()
+        batch = self.backend.batch()
+        for k, trade in enumerate(self.trades_state(new_trades)):
+            seq = sync["synced"] + k + 1
+            trade.update(seq=seq, archived_at=archived_at)
+            batch.set(f"{self.doc_path}/trades/{self._trade_doc_id(trade, seq)}", trade)
+        batch.set(self.doc_path, state) # last: the watermark only moves once its trades are in
+
         try:
-            self.doc_ref.set(state)
-            
-            # 2. ARCHIVE TRADES (For AI Training)
-            # Check for unsaved trades. 
-            # Ideally, we should track which trades are already synced.
-            # Simple Hack: Use timestamp as ID. Firestore overwriting same ID is fine (idempotent).
-            
-            # Let's archive the NEWEST trades from the log.
-            # To be efficient, we only sync the last few if run frequently.
-            # Since 'run_cloud.py' runs once and exits, 'trade_log' might only have 1-2 new items.
-            # But 'PaperBroker' keeps growing trade_log in memory if process stays alive.
-            # In Cloud Run Context: The process dies, so we load state, append new trade, save state.
-            
-            trades_ref = self.doc_ref.collection('trades')
-            
-            # Sync the last 5 trades to be safe (idempotency handles duplicates)
-            for trade in self.trade_log[-5:]:
-                # Create a unique ID based on timestamp and ticker
-                # Format: 2024-01-01T12:00:00_AAPL_BUY
-                clean_time = trade['timestamp'].replace(":", "-").replace(" ", "T")
-                doc_id = f"{clean_time}_{trade['ticker']}_{trade['action']}"
-                
-                # Add extra metadata for AI Training if not present
-                if "training_data" not in trade:
-                    trade["archived_at"] = datetime.now().isoformat()
-                    
-                trades_ref.document(doc_id).set(trade)
-                
+            batch.commit()
         except Exception as e:
             print(f"Firestore Save Error: {e}")
+            return
+        sync.update(fingerprint=fingerprint, logged=len(log), synced=synced)
 
     def load_cloud_state(self):
-        """Load from Firestore."""
-        if not self.doc_ref: return
+        """Load from Firestore (the state backend)."""
+        if self.backend is None: return
         
         try:
-            doc = self.doc_ref.get()
-            if doc.exists:
-                data = doc.to_dict()
+            data = self.backend.get(self.doc_path)
+            if data is not None:
                 self.balance = data.get("balance", self.balance)
-                self.positions = data.get("positions", {})
+                self.positions = self._restore_positions(data.get("positions", {}))
                 
                 # We load the snapshot log (last 50) for display purposes
                 self.trade_log = data.get("trade_log", [])
+                self.currency = data.get("currency", self.currency)
+                # Everything loaded is archived already (older snapshots: assume the loaded tail)
+                self._sync.update(synced=data.get("synced_trades", len(self.trade_log)),
+                                  logged=len(self.trade_log), fingerprint=(self.balance, len(self.trade_log)))
                 print(f"Loaded {self.strategy_name} from Cloud. Balance: {self.balance:.2f}")
             else:
                 print(f"No cloud state for {self.strategy_name}, starting fresh.")
@@ -0,0 +1,149 @@
+"""
+Resting limit and stop orders for PaperBroker.
+
+Every ticker keeps two heaps keyed by trigger price, so a bar only touches
+the orders it actually fills (O(log n) per fill, O(1) to see nothing fills):
+
+    falling: buy limits and sell stops, reached as the price falls (highest first)
+    rising:  sell limits and buy stops, reached as the price rises (lowest first)
+
+A bar is walked as open -> nearer extreme -> other extreme (open -> low ->
+high for an up bar, open -> high -> low for a down bar; low first when
+open/close are unknown). Orders already marketable at the open fill at the
+open (a gap fills limits better and stops worse); the rest fill at their own
+price in the order the path reaches them. Cancelled orders are dropped lazily
+when they reach the top of a heap, and a ticker's heaps are compacted once
+cancelled entries outnumber live ones, so cancel/re-place cycles (grid
+recenters) keep them O(open orders).
+"""
+import heapq
+import itertools
+
+class Order:
+    """A resting order. `tag` is free for the caller (e.g. a grid level index)."""
+    __slots__ = ('id', 'ticker', 'side', 'kind', 'qty', 'price', 'status', 'tag',
+                 'context', 'fill_price', 'fill_qty')
+
+    def __init__(self, order_id, ticker, side, kind, qty, price, tag=None, context=None):
+        self.id = order_id
+        self.ticker = ticker
+        self.side = side        # 'buy' / 'sell'
+        self.kind = kind        # 'limit' / 'stop'
+        self.qty = qty
+        self.price = price
+        self.status = 'open'    # open / filled / cancelled / rejected
+        self.tag = tag
+        self.context = context
+        self.fill_price = None
+        self.fill_qty = 0
+
+    def __repr__(self):
+        return (f"Order({self.id}, {self.side} {self.kind} {self.ticker} {self.qty} @ {self.price:.4f}, "
+                f"{self.status})")
+
+class _TickerBook:
+    __slots__ = ('falling', 'rising', 'stale')
+
+    def __init__(self):
+        # Heap entries: (key, seq, order). Falling-price heaps use -price as key.
+        self.falling = [] # buy limits + sell stops, highest price first
+        self.rising = []  # sell limits + buy stops, lowest price first
+        self.stale = 0    # cancelled entries still in either heap
+
+    def compact(self):
+        """Drops cancelled entries once they outnumber the live ones (in place: a bar walk may hold a heap)."""
+        if self.stale * 2 <= len(self.falling) + len(self.rising):
+            return
+        for heap in (self.falling, self.rising):
+            heap[:] = [entry for entry in heap if entry[2].status == 'open']
+            heapq.heapify(heap)
+        self.stale = 0
+
+class OrderBook:
+    """Resting orders of one broker, indexed per ticker by trigger price."""
+    def __init__(self):
+        self.books = {}   # ticker -> _TickerBook
+        self.orders = {}  # order id -> open Order
+        self._ids = itertools.count(1)
+
+    def add(self, ticker, side, qty, price, kind='limit', tag=None, context=None):
+        side, kind = side.lower(), kind.lower()
+        if side not in ('buy', 'sell') or kind not in ('limit', 'stop'):
+            raise ValueError(f"Unsupported order: {side} {kind}")
+        order = Order(next(self._ids), ticker, side, kind, qty, float(price), tag, context)
+        book = self.books.get(ticker)
+        if book is None:
+            book = self.books[ticker] = _TickerBook()
+        # buy limit / sell stop wait for a falling price; sell limit / buy stop for a rising one
+        if (side == 'buy') == (kind == 'limit'):
+            heapq.heappush(book.falling, (-order.price, order.id, order))
+        else:
+            heapq.heappush(book.rising, (order.price, order.id, order))
+        self.orders[order.id] = order
+        return order
+
+    def cancel(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            return False
+        order.status = 'cancelled'
+        book = self.books.get(order.ticker)
+        if book is not None:
+            book.stale += 1
+            book.compact()
+        return True
+
+    def cancel_all(self, ticker=None):
+        for order in [o for o in self.orders.values() if ticker is None or o.ticker == ticker]:
+            self.cancel(order.id)
+        if ticker is None:
+            self.books.clear()
+        else:
+            self.books.pop(ticker, None)
+
+    def open_orders(self, ticker=None):
+        return [o for o in self.orders.values() if ticker is None or o.ticker == ticker]
+
+    def __len__(self):
+        return len(self.orders)
+
+    @staticmethod
+    def _top(book, heap):
+        while heap and heap[0][2].status != 'open':
+            heapq.heappop(heap)
+            book.stale -= 1
+        return heap[0][2] if heap else None
+
+    def _leg(self, book, heap, reached, fill_at):
+        """Pops orders in heap order while reached(order); fill price is fill_at or the order's own."""
+        while True:
+            order = self._top(book, heap)
+            if order is None or not reached(order):
+                return
+            heapq.heappop(heap)
+            del self.orders[order.id]
+            yield order, (order.price if fill_at is None else fill_at)
+
+    def triggered(self, ticker, high, low, open=None, close=None):
+        """
+        Yields (order, fill price) in bar-path order. Each yielded order is already
+        out of the book; the caller books (or rejects) it before pulling the next.
+        """
+        book = self.books.get(ticker)
+        if book is None:
+            return
+        def fall(level, fill_at=None):
+            return self._leg(book, book.falling, lambda o: o.price >= level, fill_at)
+        def rise(level, fill_at=None):
+            return self._leg(book, book.rising, lambda o: o.price <= level, fill_at)
+
+        if open is not None:
+            # Already marketable at the open (gap): fill at the open
+            yield from fall(open, open)
+            yield from rise(open, open)
+        if open is not None and close is not None and close < open:
+            yield from rise(high)
+            yield from fall(low)
+        else:
+            yield from fall(low)
+            yield from rise(high)
@@ -1,32 +1,93 @@
+import numpy as np
 from utils.logger import setup_logger
 from execution.risk_manager import RiskManager
-import pandas as pd
+from execution.order_book import OrderBook
+from execution.stop_engine import StopEngine
+from data.fx import normalize_currency
+from execution.position_book import FillBuffer, PositionBook, PositionDict, TradeRecord
 
 logger = setup_logger("Paper_Broker")
 
 class PaperBroker:
-    def __init__(self, start_balance=1000.0, commission=0.001, slippage=0.001):
+    def __init__(self, start_balance=1000.0, commission=0.001, slippage=0.001, position_book=False, silent=False,
+                 currency=None):
+        """
+        Args:
+            position_book (bool): Keep positions in an array-backed PositionBook
+                instead of a dict (same mapping interface and JSON format).
+            silent (bool): Backtest mode. Fills go to a columnar FillBuffer with no
+                per-fill logging and no trade context; trade_log / get_report()
+                are built from it on first access.
+            currency (str): Currency of the cash and of the prices this broker trades at
+                ('TRY', 'USD', ...; None = unspecified). Used for reporting in other currencies.
+        """
         self.balance = start_balance
         self.initial_balance = start_balance
         self.commission = commission
         self.slippage = slippage
-        self.positions = {} # {ticker: {amount, entry_price}}
+        self.positions = PositionBook() if position_book else PositionDict() # {ticker: {amount, entry_price}}
         self.risk_manager = RiskManager()
+        self.orders = OrderBook() # resting limit / stop orders (not persisted)
+        self.stops = None # StopEngine, created by the first stop check
+        self._stops_positions = None
+        self.silent = silent
+        self.currency = normalize_currency(currency)
         self.trade_log = []
         self.logger = logger
 
-    def log_trade(self, date, action, ticker, price, amount, cost):
-        self.trade_log.append({
-            'date': date,
-            'action': action,
-            'ticker': ticker,
-            'price': price,
-            'amount': amount,
-            'cost': cost,
-            'balance': self.balance
-        })
-
-    def buy(self, ticker, price, date, pct_portfolio=None):
+    @property
+    def trade_log(self):
+        """Trade history (list of TradeRecords). Silent brokers materialize pending fills here."""
+        fills = self._fills
+        if fills is not None and self._materialized < fills.n:
+            self._trade_log.extend(fills.records(self._materialized))
+            self._materialized = fills.n
+        return self._trade_log
+
+    @trade_log.setter
+    def trade_log(self, trades):
+        self._trade_log = trades
+        self._fills = FillBuffer() if self.silent else None
+        self._materialized = 0
+
+    @property
+    def trade_count(self):
+        """len(trade_log) without materializing silent fills."""
+        pending = self._fills.n - self._materialized if self._fills is not None else 0
+        return len(self._trade_log) + pending
+
+    def log_trade(self, date, action, ticker, price, amount, cost, context=None):
+        if self._fills is not None:
+            self._fills.append(date, action, ticker, price, amount, cost, self.balance)
+        else:
+            self._trade_log.append(TradeRecord(date, action, ticker, price, amount, cost, self.balance, context))
+
+    def _add_position(self, ticker, amount, price):
+        """Adds units at price to a position (weighted average entry). Returns the new entry price."""
+        pos = self.positions.get(ticker)
+        old_amount, old_entry = (pos['amount'], pos['entry_price']) if pos is not None else (0, 0.0)
+        new_amount = old_amount + amount
+        if new_amount > 0:
+            avg_price = ((old_amount * old_entry) + (amount * price)) / new_amount
+        else:
+            avg_price = price
+        self.positions[ticker] = {'amount': new_amount, 'entry_price': avg_price}
+        self._position_changed(ticker)
+        return avg_price
+
+    def _reduce_position(self, ticker, amount):
+        """Removes sold units from a held position (closed below dust)."""
+        pos = self.positions[ticker]
+        pos['amount'] -= amount
+        if pos['amount'] < 1e-6: # Dust cleanup
+            del self.positions[ticker]
+        self._position_changed(ticker)
+
+    def _position_changed(self, ticker):
+        if self.stops is not None:
+            self.stops.update(ticker, self.positions.get(ticker))
+
+    def buy(self, ticker, price, date, pct_portfolio=None, context=None):
         """
         Buy shares. 
         If pct_portfolio is None, it divides balance by remaining slots?
@@ -74,36 +135,12 @@ class PaperBroker:
         
         self.balance -= total_deduction
         
-        # Positions: {ticker: {'amount': 100, 'entry_price': 10.50}}
-        current_pos = self.positions.get(ticker, {'amount': 0, 'entry_price': 0.0})
-        old_amount = current_pos['amount']
-        old_entry = current_pos['entry_price']
-        
-        # Calculate Weighted Average Price
-        new_amount = old_amount + max_amount
-        if new_amount > 0:
-            avg_price = ((old_amount * old_entry) + (max_amount * exec_price)) / new_amount
-        else:
-            avg_price = exec_price
-            
-        self.positions[ticker] = {'amount': new_amount, 'entry_price': avg_price}
+        # Positions: {ticker: {'amount': 100, 'entry_price': 10.50}}, weighted average entry
+        avg_price = self._add_position(ticker, max_amount, exec_price)
         
-        self.log_trade(date, 'BUY', ticker, exec_price, max_amount, cost)
-        logger.info(f"BUY {ticker}: {max_amount} units @ {exec_price:.2f} (Entry: {avg_price:.2f})")
-        # Update Position
-        if ticker in self.positions:
-            pos = self.positions[ticker]
-            # Weighted Average Price
-            total_qty = pos['amount'] + quantity
-            avg_entry = ((pos['amount'] * pos['entry_price']) + (quantity * exec_price)) / total_qty
-            pos['amount'] = total_qty
-            pos['entry_price'] = avg_entry
-        else:
-            self.positions[ticker] = {'amount': quantity, 'entry_price': exec_price}
-            
-        # Log
-        self.log_trade(timestamp, 'BUY', ticker, exec_price, quantity, commission_fee, context)
-        self.logger.info(f"BUY {ticker}: {quantity:.4f} units @ {exec_price:.2f} | Context: {context}")
+        self.log_trade(date, 'BUY', ticker, exec_price, max_amount, cost, context)
+        if not self.silent:
+            logger.info(f"BUY {ticker}: {max_amount} units @ {exec_price:.2f} (Entry: {avg_price:.2f})")
         return True
 
     def sell(self, ticker, price, timestamp, amount=None, pct_portfolio=1.0, context=None):
@@ -114,6 +151,7 @@ class PaperBroker:
         
         pos = self.positions[ticker]
         available_qty = pos['amount']
+        entry_price = pos['entry_price']
         
         if amount:
             quantity = min(amount, available_qty)
@@ -132,41 +170,250 @@ class PaperBroker:
         self.balance += net_income
         
         # Update Position
-        pos['amount'] -= quantity
-        if pos['amount'] < 1e-6: # Dust cleanup
-            del self.positions[ticker]
+        self._reduce_position(ticker, quantity)
             
         # Log
-        realized_pnl = (exec_price - pos['entry_price']) * quantity if ticker in self.positions else (exec_price - pos['entry_price']) * quantity # If position is closed, entry price is from the closed position
         self.log_trade(timestamp, 'SELL', ticker, exec_price, quantity, commission_fee, context)
-        self.logger.info(f"SELL {ticker}: {quantity:.4f} units @ {exec_price:.2f} (PnL: {realized_pnl:.2f}) | Context: {context}")
+        if not self.silent:
+            realized_pnl = (exec_price - entry_price) * quantity
+            self.logger.info(f"SELL {ticker}: {quantity:.4f} units @ {exec_price:.2f} (PnL: {realized_pnl:.2f}) | Context: {context}")
+        return True
+
+    # --- Batch Orders ---
+    def submit_orders(self, tickers, sides, sizes, prices, date, size_type='pct', contexts=None):
+        """
+        Executes a batch of orders with buy()/sell() semantics, vectorized.
+
+        Orders fill in array order (their priority): a buy sees the cash left
+        after every earlier order, including earlier sells' proceeds. Fills,
+        costs and balances are computed with array ops; only once cash binds
+        are the remaining buys sized one by one. Trades are appended in bulk.
+
+        Args:
+            tickers (list): Ticker per order (each ticker at most once).
+            sides (array): +1 / 'buy' or -1 / 'sell' per order.
+            sizes (array): Per order, by size_type:
+                'pct'   - buy: fraction of initial balance (NaN = all cash, like
+                          pct_portfolio=None); sell: fraction of the position.
+                'units' - quantity (buys are floored to whole units).
+                'value' - cash amount (buys without the 100 minimum, like the vault).
+            prices (array): Quoted prices (slippage is applied here).
+            date: Trade timestamp.
+            contexts (list): Optional per-order context dicts.
+
+        Returns:
+            np.ndarray: Filled quantity per order (0 = not executed).
+        """
+        n = len(tickers)
+        if len(set(tickers)) != n:
+            raise ValueError("submit_orders: each ticker may appear at most once per batch")
+        if size_type not in ('pct', 'units', 'value'):
+            raise ValueError(f"Unknown size_type '{size_type}'")
+        sides = np.asarray(sides)
+        if sides.dtype.kind in 'US':
+            sides = np.where(np.char.lower(sides.astype(str)) == 'buy', 1, -1)
+        is_buy = sides > 0
+        sizes = np.asarray(sizes, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        qty = np.zeros(n)
+        if n == 0:
+            return qty
+
+        rm = self.risk_manager
+        exec_price = np.where(is_buy, prices * (1 + rm.slippage_rate), prices * (1 - rm.slippage_rate))
+        unit_cost = exec_price * (1 + rm.commission_rate)
+
+        # Sells: quantity from the current position
+        held = np.array([self.positions.amount_of(t) for t in tickers], dtype=float)
+        if size_type == 'pct':
+            sell_qty = held * sizes
+        elif size_type == 'units':
+            sell_qty = np.minimum(sizes, held)
+        else:
+            sell_qty = np.minimum(sizes / exec_price, held)
+        qty = np.where(~is_buy & (held > 0), sell_qty, 0.0)
+
+        # Buys: budget before the cash cap (inf = all available cash)
+        if size_type == 'pct':
+            budget = np.where(np.isnan(sizes), np.inf, self.initial_balance * sizes)
+        elif size_type == 'units':
+            budget = np.floor(sizes) * unit_cost
+        else:
+            budget = sizes
+        finite = is_buy & np.isfinite(budget)
+        if size_type == 'units':
+            buy_qty = np.floor(sizes)
+        else:
+            buy_qty = np.floor(np.where(finite, budget, 0.0) / unit_cost)
+            if size_type == 'pct':
+                buy_qty[budget < 100] = 0.0 # Minimum trade check (100 TL)
+        qty = np.where(finite, buy_qty, qty)
+
+        # Cash flows in order, as if cash never binds
+        gross = qty * exec_price
+        flow = np.where(is_buy, -(gross + gross * rm.commission_rate), gross - gross * self.commission)
+        balances = np.cumsum(np.concatenate(([self.balance], flow))) # same rounding as sequential +=
+
+        binding = np.flatnonzero(is_buy & (budget > balances[:-1]))
+        if len(binding):
+            # From the first buy that cash caps on, size the rest one by one
+            cash = float(balances[binding[0]])
+            for i in range(binding[0], n):
+                if is_buy[i]:
+                    if size_type == 'units':
+                        q = min(float(np.floor(sizes[i])), float(np.floor(cash / unit_cost[i])))
+                    else:
+                        capped = min(float(budget[i]), cash)
+                        q = 0.0 if size_type == 'pct' and capped < 100 else float(np.floor(capped / unit_cost[i]))
+                    qty[i] = max(q, 0.0)
+                    g = qty[i] * exec_price[i]
+                    flow[i] = -(g + g * rm.commission_rate)
+                cash += flow[i]
+                balances[i + 1] = cash
+
+        filled = np.flatnonzero(qty > 0)
+        if not len(filled):
+            return qty
+        self.balance = float(balances[-1])
+        gross = qty * exec_price
+        costs = np.where(is_buy, gross * rm.commission_rate, gross * self.commission)
+
+        # Positions and trade log for the fills only
+        px, q, c, bal = exec_price.tolist(), qty.tolist(), costs.tolist(), balances[1:].tolist()
+        for i in filled.tolist():
+            ticker = tickers[i]
+            if is_buy[i]:
+                self._add_position(ticker, int(q[i]), px[i])
+            else:
+                self._reduce_position(ticker, q[i])
+
+        if self._fills is not None:
+            self._fills.extend(date, is_buy[filled], [tickers[i] for i in filled], exec_price[filled],
+                               qty[filled], costs[filled], balances[1:][filled])
+            return qty
+        self._trade_log.extend(
+            TradeRecord(date, 'BUY' if is_buy[i] else 'SELL', tickers[i], px[i],
+                        int(q[i]) if is_buy[i] else q[i], c[i], bal[i],
+                        contexts[i] if contexts is not None else None)
+            for i in filled.tolist())
+        buys = int(is_buy[filled].sum())
+        logger.info(f"BATCH: {buys} buys, {len(filled) - buys} sells | Balance: {self.balance:.2f}")
+        return qty
+
+    def rebalance(self, target_weights, current_price_map, date, threshold=0.0):
+        """
+        Moves each ticker in target_weights to weight * total equity in one submit_orders call:
+        sells free cash before buys, larger orders first. Tickers not in target_weights are untouched.
+        Orders smaller than threshold * equity are skipped.
+        """
+        tickers = [t for t in target_weights if current_price_map.get(t)]
+        if not tickers:
+            return np.zeros(0)
+        prices = np.array([current_price_map[t] for t in tickers], dtype=float)
+        weights = np.array([target_weights[t] for t in tickers], dtype=float)
+        held = np.array([self.positions.amount_of(t) for t in tickers], dtype=float)
+        equity = self.get_portfolio_value(current_price_map)
+        diff = weights * equity - held * prices
+        trade = np.abs(diff) > max(threshold * equity, 0.0)
+        order = np.argsort(-np.abs(diff), kind='stable')
+        order = np.concatenate([order[trade[order] & (diff[order] < 0)], order[trade[order] & (diff[order] > 0)]])
+        return self.submit_orders([tickers[i] for i in order], np.sign(diff[order]),
+                                  np.abs(diff[order]), prices[order], date, size_type='value')
+
+    # --- Resting Orders ---
+    def place_order(self, ticker, side, qty, price, kind='limit', tag=None, context=None):
+        """Rests a 'limit' or 'stop' order for `qty` units until match_orders fills it. Returns the Order."""
+        return self.orders.add(ticker, side, qty, price, kind, tag, context)
+
+    def cancel_order(self, order_id):
+        return self.orders.cancel(order_id)
+
+    def match_orders(self, ticker, high, low, date, open=None, close=None, on_fill=None, on_reject=None):
+        """
+        Fills the ticker's resting orders that this bar's low-high range reaches.
+
+        Limits fill at their price (at the open if the bar gaps through them), without
+        slippage; triggered stops fill like market orders (slippage on the trigger price).
+        Buys need cash for the units plus commission and sells are capped at the
+        position, otherwise the order is rejected. on_fill(order) runs after each fill
+        and may place new orders, which this bar can still reach; on_reject(order)
+        runs after each rejection. Returns the filled orders.
+        """
+        filled = []
+        for order, price in self.orders.triggered(ticker, high, low, open, close):
+            if order.kind == 'stop':
+                price = self.risk_manager.apply_slippage(price, order.side)
+            if self._fill_order(order, price, date):
+                filled.append(order)
+                if on_fill is not None:
+                    on_fill(order)
+            elif on_reject is not None:
+                on_reject(order)
+        return filled
+
+    def _fill_order(self, order, price, date):
+        ticker = order.ticker
+        if order.side == 'buy':
+            qty = order.qty
+            cost = self.risk_manager.calculate_cost(qty, price)
+            if (qty * price) + cost > self.balance:
+                order.status = 'rejected'
+                return False
+            self.balance -= (qty * price) + cost
+            self._add_position(ticker, qty, price)
+        else:
+            qty = min(order.qty, self.positions.amount_of(ticker))
+            if qty <= 0:
+                order.status = 'rejected'
+                return False
+            gross = qty * price
+            cost = gross * self.commission
+            self.balance += gross - cost
+            self._reduce_position(ticker, qty)
+        order.status, order.fill_price, order.fill_qty = 'filled', price, qty
+        self.log_trade(date, order.side.upper(), ticker, price, qty, cost, order.context)
+        if not self.silent:
+            logger.info(f"{order.kind.upper()} {order.side.upper()} {ticker}: {qty} units @ {price:.2f}")
         return True
 
-    def get_portfolio_value(self, current_price_map):
+    def get_portfolio_value(self, current_price_map, currency=None, fx=None, at=-1):
         """
         Calculates Total Equity = Cash + Stock Value
         current_price_map: {ticker: price}
+        currency: Report in this currency instead of the broker's, converted with
+            fx (data.fx.FXRates) at row `at` (default: its latest rate).
         """
-        equity = self.balance
-        for ticker, pos_data in self.positions.items():
-            # Handle new structure vs old
-            if isinstance(pos_data, dict):
-                amount = pos_data['amount']
-            else:
-                amount = pos_data
-                
-            if amount > 0:
-                price = current_price_map.get(ticker, 0)
-                equity += amount * price
-        return equity
+        equity = self.positions.value(current_price_map, self.balance)
+        if currency is None or normalize_currency(currency) == self.currency:
+            return equity
+        if self.currency is None:
+            raise ValueError("get_portfolio_value: broker currency is not set, cannot convert")
+        return equity * fx.rate(self.currency, currency, at)
 
     def get_position_amt(self, ticker):
         """Helper to safely get amount for a ticker."""
-        data = self.positions.get(ticker, {'amount': 0})
-        return data['amount'] if isinstance(data, dict) else data
+        return self.positions.amount_of(ticker)
     
     def get_report(self):
-        return pd.DataFrame(self.trade_log)
+        import pandas as pd
+        if self._fills is None:
+            return pd.DataFrame([dict(t) for t in self.trade_log])
+        # Silent: loaded trades + fills straight from the columnar buffer
+        loaded = self._trade_log[:len(self._trade_log) - self._materialized]
+        fills = self._fills.to_frame()
+        return pd.concat([pd.DataFrame([dict(t) for t in loaded]), fills], ignore_index=True) if loaded else fills
+
+    def _restore_positions(self, positions):
+        """Loaded {ticker: position} -> this broker's position container (bare legacy amounts normalized)."""
+        return type(self.positions).from_dict(positions or {})
+
+    def positions_state(self):
+        """Positions in the JSON / dashboard format."""
+        return self.positions.to_dict()
+
+    def trades_state(self, trades=None):
+        """Trade-log entries as plain dicts for JSON / Firestore."""
+        return [dict(t) for t in (self.trade_log if trades is None else trades)]
 
     # --- Persistence Logic ---
     def save_state(self, filepath="data/wallet.json"):
@@ -174,9 +421,11 @@ class PaperBroker:
         import json
         state = {
             "balance": self.balance,
-            "positions": self.positions,
-            "trade_log": self.trade_log
+            "positions": self.positions_state(),
+            "trade_log": self.trades_state()
         }
+        if self.currency is not None:
+            state["currency"] = self.currency
         try:
             with open(filepath, 'w') as f:
                 json.dump(state, f, default=str) # default=str for dates
@@ -197,33 +446,43 @@ class PaperBroker:
                 state = json.load(f)
             
             self.balance = state.get("balance", self.balance)
-            self.positions = state.get("positions", {})
+            self.positions = self._restore_positions(state.get("positions", {}))
             self.trade_log = state.get("trade_log", [])
+            self.currency = normalize_currency(state.get("currency", self.currency))
             logger.info(f"Wallet loaded. Balance: {self.balance:.2f}")
         except Exception as e:
             logger.error(f"Failed to load state: {e}")
 
     # --- Safety Logic ---
-    def check_portfolio_safety(self, current_price_map, stop_loss_pct=0.03):
+    def stop_engine(self, stop_loss_pct, trailing_stop_pct=None):
+        """
+        The broker's StopEngine, set to these percentages. Order methods keep it armed;
+        positions replaced or edited from outside (load_state, a state store, tests)
+        are re-synced here.
+        """
+        if self.stops is None:
+            self.stops = StopEngine(stop_loss_pct, trailing_stop_pct)
+        else:
+            self.stops.configure(stop_loss_pct, trailing_stop_pct)
+        if self._stops_positions is not self.positions or len(self.stops) != len(self.positions):
+            self.stops.sync(self.positions)
+            self._stops_positions = self.positions
+        return self.stops
+
+    def check_stops(self, current_price_map, stop_loss_pct, trailing_stop_pct=None):
+        """StopHits (ticker, price, kind, level) of held positions at these prices."""
+        return self.stop_engine(stop_loss_pct, trailing_stop_pct).check(current_price_map)
+
+    def check_portfolio_safety(self, current_price_map, stop_loss_pct=0.03, trailing_stop_pct=None):
         """
-        Checks all positions against Stop-Loss threshold.
+        Checks all positions against Stop-Loss threshold (and the trailing stop, if set).
         Returns list of tickers to SELL immediately.
         """
-        sell_list = []
-        for ticker, pos_data in self.positions.items():
-            if isinstance(pos_data, dict):
-                amount = pos_data['amount']
-                entry = pos_data['entry_price']
-            else:
-                # Legacy or error
-                continue
-                
-            if amount > 0 and entry > 0:
-                cur_price = current_price_map.get(ticker)
-                if cur_price and self.risk_manager.check_stop_loss(cur_price, entry, stop_loss_pct):
-                    logger.warning(f"STOP LOSS TRIPPED: {ticker} (Entry: {entry:.2f}, Current: {cur_price:.2f})")
-                    sell_list.append(ticker)
-        return sell_list
+        hits = self.check_stops(current_price_map, stop_loss_pct, trailing_stop_pct)
+        for hit in hits:
+            label = "Entry" if hit.kind == 'stop' else "High"
+            logger.warning(f"STOP LOSS TRIPPED: {hit.ticker} ({label}: {hit.level:.2f}, Current: {hit.price:.2f})")
+        return [hit.ticker for hit in hits]
 
     # --- Core-Satellite Logic ---
     def rebalance_vault(self, current_price_map, safe_ticker, target_pct=0.50):
@@ -239,8 +498,7 @@ class PaperBroker:
         total_equity = self.get_portfolio_value(current_price_map)
         
         # Current Holdings
-        pos_data = self.positions.get(safe_ticker, {'amount': 0})
-        current_amount = pos_data['amount'] if isinstance(pos_data, dict) else pos_data
+        current_amount = self.get_position_amt(safe_ticker)
         current_val = current_amount * safe_price
         
         target_val = total_equity * target_pct
@@ -287,17 +545,8 @@ class PaperBroker:
              self.balance -= ((max_amount * exec_price) + cost)
              
              # Position Update
-             curr = self.positions.get(ticker, {'amount': 0, 'entry_price': 0.0})
-             old_amt = curr['amount']
-             old_ent = curr['entry_price']
-             new_amt = old_amt + max_amount
-             
-             if new_amt > 0:
-                 avg = ((old_amt * old_ent) + (max_amount * exec_price)) / new_amt
-             else:
-                 avg = exec_price
-                 
-             self.positions[ticker] = {'amount': new_amt, 'entry_price': avg}
-             logger.info(f"VAULT BUY: {ticker} +{max_amount} units @ {exec_price:.2f}")
+             self._add_position(ticker, max_amount, exec_price)
+             if not self.silent:
+                 logger.info(f"VAULT BUY: {ticker} +{max_amount} units @ {exec_price:.2f}")
 
 
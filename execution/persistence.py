@@ -0,0 +1,167 @@
+"""
+Write-behind persistence for live runners.
+
+The trading loop calls worker.mark_dirty(strategy) after each tick. That only
+takes a cheap snapshot of the wallet - and nothing at all when the wallet did
+not change (same trade count and balance) - so the loop never waits on disk
+or Firestore. A daemon thread writes the latest snapshot of every dirty
+strategy every `flush_interval` seconds. Several ticks between flushes
+coalesce into one write, and wallets sharing a SQLiteStateStore go out in one
+transaction.
+
+Durability:
+- A change is persisted at most flush_interval seconds (plus the write
+  itself) after the tick that made it. A hard kill (SIGKILL, power loss) can
+  lose that window. A restart then resumes from the last completed flush.
+- close() (also run at exit and on SIGTERM/SIGINT once
+  install_signal_handlers() is called) flushes everything before returning.
+- A failed write keeps the strategy dirty and is retried on the next flush.
+"""
+import atexit
+import copy
+import signal
+import threading
+from collections.abc import Sequence
+from utils.logger import setup_logger
+
+logger = setup_logger("Persistence")
+
+class _LogPrefix(Sequence):
+    """The first n entries of a live, append-only trade log (no copy)."""
+    def __init__(self, log, n):
+        self._log = log
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._log[k] for k in range(self._n)[i]]
+        return self._log[range(self._n)[i]]
+
+def snapshot_broker(broker):
+    """
+    Copy of a broker's persisted state, safe to write from another thread:
+    positions are copied (O(held)), the trade log is a frozen-length view.
+    Connections (state files, Firestore refs) are shared with the original.
+    """
+    snap = copy.copy(broker)
+    snap.positions = broker._restore_positions(broker.positions_state())
+    snap.trade_log = _LogPrefix(broker.trade_log, len(broker.trade_log))
+    return snap
+
+class PersistenceWorker:
+    """
+    Args:
+        flush_interval (float): Seconds between background flushes.
+    """
+    def __init__(self, flush_interval=5.0):
+        self.flush_interval = flush_interval
+        self._dirty = {}        # name -> (strategy, broker snapshot), latest wins
+        self._persisted = {}    # name -> wallet fingerprint at the last snapshot
+        self._lock = threading.Lock()
+        self._flush_lock = threading.RLock() # re-entered by a signal during close()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._atexit = False
+
+    def start(self):
+        """Starts the background flusher; after close() it starts a fresh one (no-op while running)."""
+        if self._thread is None or self._stop.is_set():
+            if self._thread is not None and self._thread is not threading.current_thread():
+                self._thread.join() # a close() that timed out: let the old loop finish first
+            self._stop.clear()
+            self._wake.clear()
+            self._thread = threading.Thread(target=self._run, name="persistence", daemon=True)
+            self._thread.start()
+            if not self._atexit:
+                atexit.register(self.close)
+                self._atexit = True
+        return self
+
+    @staticmethod
+    def _fingerprint(broker):
+        # Balance and positions only change together with a logged trade
+        return id(broker.trade_log), len(broker.trade_log), broker.balance
+
+    def mark_dirty(self, strategy, force=False):
+        """Queues the strategy's current wallet if it changed since the last call (O(held))."""
+        broker = strategy.broker
+        fp = self._fingerprint(broker)
+        if not force and self._persisted.get(strategy.name) == fp:
+            return False
+        snap = snapshot_broker(broker)
+        with self._lock:
+            self._dirty[strategy.name] = (strategy, snap)
+        self._persisted[strategy.name] = fp
+        return True
+
+    def request_flush(self):
+        """Wakes the worker to flush now (non-blocking)."""
+        self._wake.set()
+
+    def flush(self):
+        """Writes every queued wallet on the calling thread. Returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._dirty = self._dirty, {}
+            if not pending:
+                return 0
+
+            # Wallets sharing a state store: one transaction per store
+            by_store, failed = {}, {}
+            for name, (strategy, snap) in pending.items():
+                store = getattr(strategy, "state_store", None)
+                if store is not None:
+                    by_store.setdefault(id(store), (store, []))[1].append(name)
+                    continue
+                try:
+                    strategy.save(broker=snap)
+                except Exception as e:
+                    logger.error(f"Persist failed for {name}: {e}")
+                    failed[name] = pending[name]
+            for store, names in by_store.values():
+                try:
+                    store.save_many((name, pending[name][1]) for name in names)
+                except Exception as e:
+                    logger.error(f"Persist failed for {', '.join(names)}: {e}")
+                    failed.update((name, pending[name]) for name in names)
+
+            if failed:
+                with self._lock:
+                    for name, item in failed.items():
+                        self._dirty.setdefault(name, item) # a newer snapshot supersedes
+            return len(pending) - len(failed)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Persistence flush error: {e}")
+
+    def close(self, timeout=30.0):
+        """Stops the worker and flushes everything still queued."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self.flush()
+
+    def install_signal_handlers(self, signals=(signal.SIGTERM, signal.SIGINT)):
+        """Flushes on the given signals, then defers to the previous handler (main thread only)."""
+        for sig in signals:
+            previous = signal.getsignal(sig)
+
+            def handler(signum, frame, previous=previous):
+                self.flush()
+                if callable(previous):
+                    previous(signum, frame)
+                elif previous == signal.SIG_DFL:
+                    raise SystemExit(128 + signum)
+
+            signal.signal(sig, handler)
@@ -0,0 +1,355 @@
+"""
+Compact position and trade records for PaperBroker.
+
+PositionDict is the default {ticker: {'amount', 'entry_price'}} positions dict.
+PositionBook is its array-backed drop-in replacement: every ticker gets a fixed
+slot in NumPy arrays (amount, entry price), so whole-book queries are array
+operations: valuation against a PriceVector is a gather of the price column
+through a cached slot -> column map plus one dot product, and a batch
+strategy's held mask is one scatter of the held slots. It still behaves like
+the dict it replaces: positions[t]['amount'], positions[t] = {...},
+del positions[t], iteration over held tickers in opening order, and JSON export
+in the same format.
+
+Both expose the same whole-book helpers (amount_of, value, to_dict),
+so PaperBroker never branches on the container or on the position format.
+
+TradeRecord is a __slots__ trade-log entry that reads like the old trade dict.
+FillBuffer is the columnar fill log of silent (backtest) brokers.
+"""
+from collections.abc import Mapping, MutableMapping
+import numpy as np
+
+def _normalize(position):
+    """Position mapping or a bare legacy amount -> (amount, entry_price)."""
+    if isinstance(position, Mapping):
+        return position['amount'], position.get('entry_price', 0.0)
+    return position, 0.0
+
+class PositionDict(dict):
+    """{ticker: {'amount', 'entry_price'}} with the PositionBook helpers."""
+
+    def amount_of(self, ticker):
+        pos = self.get(ticker)
+        return pos['amount'] if pos is not None else 0
+
+    def value(self, price_map, start=0.0):
+        """start + sum of amount * price over held tickers (missing prices count as 0)."""
+        total = start
+        for ticker, pos in self.items():
+            amount = pos['amount']
+            if amount > 0:
+                total += amount * price_map.get(ticker, 0)
+        return total
+
+    def to_dict(self):
+        return {t: dict(p) for t, p in self.items()}
+
+    @classmethod
+    def from_dict(cls, positions):
+        book = cls()
+        for ticker, pos in positions.items():
+            amount, entry = _normalize(pos)
+            book[ticker] = {'amount': amount, 'entry_price': entry}
+        return book
+
+class Position(Mapping):
+    """Live view of one slot of a PositionBook; reads and writes go to the arrays."""
+    __slots__ = ('_book', '_slot')
+    _KEYS = ('amount', 'entry_price')
+
+    def __init__(self, book, slot):
+        self._book = book
+        self._slot = slot
+
+    def __getitem__(self, key):
+        return float(self._book._column(key)[self._slot])
+
+    def __setitem__(self, key, value):
+        self._book._column(key)[self._slot] = value
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+class PositionBook(MutableMapping):
+    """
+    ticker -> position mapping backed by ticker-id-indexed arrays.
+
+    Slots are assigned on a ticker's first position and kept when it is closed,
+    so a ticker's id never changes. Only held tickers appear in the mapping.
+
+    Args:
+        capacity (int): Initial number of slots (grows by doubling).
+    """
+    def __init__(self, capacity=16):
+        capacity = max(int(capacity), 1)
+        self.ids = {}       # ticker -> slot
+        self.tickers = []   # slot -> ticker
+        self.amount = np.zeros(capacity)
+        self.entry_price = np.zeros(capacity)
+        self._held = {}     # held ticker -> slot, in opening order
+        self._cols_index = None # {ticker: column} the cached slot -> column map is for
+        self._cols = None
+
+    def _column(self, key):
+        if key == 'amount': return self.amount
+        if key == 'entry_price': return self.entry_price
+        raise KeyError(key)
+
+    def _slot(self, ticker):
+        slot = self.ids.get(ticker)
+        if slot is None:
+            slot = len(self.tickers)
+            if slot == len(self.amount):
+                grow = len(self.amount)
+                self.amount = np.concatenate([self.amount, np.zeros(grow)])
+                self.entry_price = np.concatenate([self.entry_price, np.zeros(grow)])
+            self.ids[ticker] = slot
+            self.tickers.append(ticker)
+        return slot
+
+    # --- Mapping interface (dict-compatible) ---
+
+    def __getitem__(self, ticker):
+        return Position(self, self._held[ticker])
+
+    def get(self, ticker, default=None):
+        slot = self._held.get(ticker)
+        return default if slot is None else Position(self, slot)
+
+    def __setitem__(self, ticker, position):
+        """Accepts a {'amount', 'entry_price'} mapping or, like old wallets, a bare amount."""
+        amount, entry = _normalize(position)
+        slot = self._slot(ticker)
+        if ticker not in self._held:
+            self._held[ticker] = slot
+        self.amount[slot] = amount
+        self.entry_price[slot] = entry
+
+    def __delitem__(self, ticker):
+        slot = self._held.pop(ticker)
+        self.amount[slot] = 0.0
+
+    def __contains__(self, ticker):
+        return ticker in self._held
+
+    def __iter__(self):
+        return iter(self._held)
+
+    def __len__(self):
+        return len(self._held)
+
+    def __repr__(self):
+        return f"PositionBook({self.to_dict()})"
+
+    # --- Fast paths ---
+
+    def amount_of(self, ticker):
+        slot = self._held.get(ticker)
+        return 0 if slot is None else float(self.amount[slot])
+
+    def held_slots(self):
+        """Slots of open positions (amount > 0), in opening order."""
+        slots = np.fromiter(self._held.values(), dtype=np.intp, count=len(self._held))
+        return slots[self.amount[slots] > 0]
+
+    def columns(self, index):
+        """Slot -> column in `index` ({ticker: column}, e.g. a batch universe), -1 if absent. Cached per index."""
+        if index is not self._cols_index or len(self._cols) < len(self.tickers):
+            self._cols = np.fromiter((index.get(t, -1) for t in self.tickers), dtype=np.intp,
+                                     count=len(self.tickers))
+            self._cols_index = index
+        return self._cols
+
+    def value(self, price_map, start=0.0):
+        """
+        start + sum of amount * price over held tickers (missing prices count as 0).
+        A PriceVector (prices array + {ticker: column}) is gathered without per-ticker lookups.
+        """
+        slots = self.held_slots()
+        if not len(slots):
+            return start
+        prices, index = getattr(price_map, 'prices', None), getattr(price_map, 'index', None)
+        if isinstance(prices, np.ndarray) and isinstance(index, dict):
+            cols = self.columns(index)[slots]
+            px = np.where(cols >= 0, prices[cols], 0.0)
+            px[px != px] = 0.0 # NaN = no quote
+        else:
+            tickers = self.tickers
+            px = np.fromiter((price_map.get(tickers[s], 0) for s in slots.tolist()), dtype=float,
+                             count=len(slots))
+        return start + float(self.amount[slots] @ px)
+
+    # --- Persistence ---
+
+    def to_dict(self):
+        """JSON / dashboard format: {ticker: {'amount': ..., 'entry_price': ...}}."""
+        return {t: {'amount': float(self.amount[s]), 'entry_price': float(self.entry_price[s])}
+                for t, s in self._held.items()}
+
+    @classmethod
+    def from_dict(cls, positions):
+        book = cls(capacity=max(len(positions), 16))
+        for ticker, pos in positions.items():
+            book[ticker] = pos
+        return book
+
+class TradeRecord(Mapping):
+    """
+    One trade-log entry. Reads like the old trade dict (trade['price'], dict(trade),
+    'context' only present when set); keys outside the fixed fields go to a side dict.
+    """
+    __slots__ = ('date', 'action', 'ticker', 'price', 'amount', 'cost', 'balance', 'context', '_extra')
+    _FIELDS = ('date', 'action', 'ticker', 'price', 'amount', 'cost', 'balance')
+
+    def __init__(self, date, action, ticker, price, amount, cost, balance, context=None):
+        self.date = date
+        self.action = action
+        self.ticker = ticker
+        self.price = price
+        self.amount = amount
+        self.cost = cost
+        self.balance = balance
+        self.context = context
+        self._extra = None
+
+    def __getitem__(self, key):
+        if key in self._FIELDS:
+            return getattr(self, key)
+        if key == 'context' and self.context is not None:
+            return self.context
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDS or key == 'context':
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __iter__(self):
+        yield from self._FIELDS
+        if self.context is not None:
+            yield 'context'
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self._FIELDS) + (self.context is not None) + len(self._extra or ())
+
+    def __repr__(self):
+        return f"TradeRecord({dict(self)})"
+
+class FillBuffer:
+    """
+    Columnar fill log for silent (backtest) brokers: one preallocated array per
+    field, grown by doubling. Tickers and dates are stored as ids (ticker id,
+    bar index into `dates`), so recording a fill allocates nothing per trade.
+    TradeRecords / DataFrames are built only when asked for.
+
+    Args:
+        capacity (int): Initial number of rows.
+    """
+    SIDES = ('BUY', 'SELL')
+
+    def __init__(self, capacity=1024):
+        capacity = max(int(capacity), 1)
+        self.n = 0
+        self.ticker_id = np.empty(capacity, dtype=np.int32)
+        self.side = np.empty(capacity, dtype=np.int8)   # 0 = BUY, 1 = SELL
+        self.qty = np.empty(capacity)
+        self.price = np.empty(capacity)
+        self.cost = np.empty(capacity)
+        self.balance = np.empty(capacity)
+        self.bar = np.empty(capacity, dtype=np.int64)
+        self.ids = {}       # ticker -> id
+        self.tickers = []   # id -> ticker
+        self.dates = []     # bar index -> date
+        self._last_date = object()
+
+    def _ticker_id(self, ticker):
+        tid = self.ids.get(ticker)
+        if tid is None:
+            tid = self.ids[ticker] = len(self.tickers)
+            self.tickers.append(ticker)
+        return tid
+
+    def _bar(self, date):
+        if date is not self._last_date and date != self._last_date:
+            self.dates.append(date)
+            self._last_date = date
+        return len(self.dates) - 1
+
+    def _reserve(self, extra):
+        need = self.n + extra
+        if need <= len(self.qty):
+            return
+        size = max(need, 2 * len(self.qty))
+        for name in ('ticker_id', 'side', 'qty', 'price', 'cost', 'balance', 'bar'):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:self.n] = old[:self.n]
+            setattr(self, name, new)
+
+    def append(self, date, action, ticker, price, amount, cost, balance):
+        self._reserve(1)
+        i = self.n
+        self.ticker_id[i] = self._ticker_id(ticker)
+        self.side[i] = action != 'BUY'
+        self.qty[i] = amount
+        self.price[i] = price
+        self.cost[i] = cost
+        self.balance[i] = balance
+        self.bar[i] = self._bar(date)
+        self.n = i + 1
+
+    def extend(self, date, is_buy, tickers, price, amount, cost, balance):
+        """Bulk append of one bar's fills (arrays aligned with `tickers`)."""
+        k = len(tickers)
+        self._reserve(k)
+        s = slice(self.n, self.n + k)
+        self.ticker_id[s] = [self._ticker_id(t) for t in tickers]
+        self.side[s] = ~np.asarray(is_buy, dtype=bool)
+        self.qty[s] = amount
+        self.price[s] = price
+        self.cost[s] = cost
+        self.balance[s] = balance
+        self.bar[s] = self._bar(date)
+        self.n += k
+
+    def __len__(self):
+        return self.n
+
+    def records(self, start=0):
+        """TradeRecords for rows start: (same fields as PaperBroker.log_trade, no context)."""
+        stop = self.n
+        tickers, dates, sides = self.tickers, self.dates, self.SIDES
+        rows = zip(self.bar[start:stop].tolist(), self.side[start:stop].tolist(),
+                   self.ticker_id[start:stop].tolist(), self.price[start:stop].tolist(),
+                   self.qty[start:stop].tolist(), self.cost[start:stop].tolist(),
+                   self.balance[start:stop].tolist())
+        return [TradeRecord(dates[b], sides[s], tickers[t], p, int(q) if s == 0 else q, c, bal)
+                for b, s, t, p, q, c, bal in rows]
+
+    def to_frame(self):
+        """get_report() columns straight from the buffers."""
+        import pandas as pd
+        n = self.n
+        return pd.DataFrame({
+            'date': np.asarray(self.dates, dtype=object)[self.bar[:n]] if n else [],
+            'action': np.asarray(self.SIDES, dtype=object)[self.side[:n]],
+            'ticker': np.asarray(self.tickers, dtype=object)[self.ticker_id[:n]] if n else [],
+            'price': self.price[:n],
+            'amount': self.qty[:n],
+            'cost': self.cost[:n],
+            'balance': self.balance[:n],
+        })
@@ -47,3 +47,12 @@ class RealBroker(PaperBroker):
         
         # 2. If success, log internally
         return super().sell(ticker, price, timestamp, amount, pct_portfolio, context)
+
+    def submit_orders(self, tickers, sides, sizes, prices, date, size_type='pct', contexts=None):
+        # 1. Size the batch locally, 2. Place one Real Order per fill
+        start = len(self.trade_log)
+        filled = super().submit_orders(tickers, sides, sizes, prices, date, size_type, contexts)
+        for trade in self.trade_log[start:]:
+            print(f"🔊 REAL ORDER: {trade['action']} {trade['ticker']} x{trade['amount']} (Simulated for Safety)")
+            # exchange.create_market_order(trade['ticker'], trade['amount'], trade['action'])
+        return filled
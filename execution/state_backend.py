@@ -0,0 +1,215 @@
+"""
+Document stores for cloud wallet state.
+
+FirebaseBroker, CloudBot and the dashboard only need a small slice of
+Firestore: read a document, list a collection, and write a batch of
+documents. StateBackend is that slice, addressed by slash paths
+('trader_strategies/SmartDCA_BIST_Cloud', '.../trades/<id>'):
+
+    FirestoreBackend  firebase_admin client (production)
+    SQLiteBackend     one local file, a batch is one transaction
+    MemoryBackend     in-process dict with an injectable per-call latency, for
+                      offline tests and benchmarks of the cloud code paths
+
+Every backend counts its round-trips (one per get / stream / committed batch
+chunk) and the documents read and written, so a cloud cycle's cost can be
+measured without a live project. STATE_BACKEND=firestore|sqlite|memory
+selects the backend get_backend() returns (default: firestore).
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+STRATEGY_COLLECTION = "trader_strategies"
+
+def _parent(path):
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+class WriteBatch:
+    """Writes collected client-side and sent by commit() (one round-trip per backend chunk)."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.writes = []
+
+    def set(self, path, data):
+        self.writes.append((path, data))
+
+    def __len__(self):
+        return len(self.writes)
+
+    def commit(self):
+        if self.writes:
+            self.backend.commit(self.writes)
+        self.writes = []
+
+class StateBackend(ABC):
+    """
+    Args:
+        latency (float): Seconds added to every round-trip (simulated network).
+    """
+    # Max writes per committed chunk (None = unlimited)
+    batch_limit = None
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.stats = {"round_trips": 0, "reads": 0, "writes": 0}
+        self._stats_lock = threading.Lock()
+
+    def _round_trip(self, reads=0, writes=0):
+        with self._stats_lock:
+            self.stats["round_trips"] += 1
+            self.stats["reads"] += reads
+            self.stats["writes"] += writes
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {k: 0 for k in self.stats}
+
+    def get(self, path):
+        """Document at path as a dict, or None."""
+        data = self._get(path)
+        self._round_trip(reads=1)
+        return data
+
+    def stream(self, collection):
+        """[(doc id, dict)] of the documents directly in a collection."""
+        docs = self._stream(collection)
+        self._round_trip(reads=max(len(docs), 1))
+        return docs
+
+    def batch(self):
+        return WriteBatch(self)
+
+    def set(self, path, data):
+        """A single-document write (its own round-trip)."""
+        self.commit([(path, data)])
+
+    def commit(self, writes):
+        """Applies [(path, data)] in order, in chunks of batch_limit."""
+        size = self.batch_limit or len(writes)
+        for start in range(0, len(writes), size):
+            chunk = writes[start:start + size]
+            self._commit(chunk)
+            self._round_trip(writes=len(chunk))
+
+    @abstractmethod
+    def _get(self, path): pass
+
+    @abstractmethod
+    def _stream(self, collection): pass
+
+    @abstractmethod
+    def _commit(self, writes): pass
+
+    def close(self):
+        pass
+
+class MemoryBackend(StateBackend):
+    """In-process Firestore stand-in. Documents are deep-copied in and out, like a serializing client."""
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.docs = {}
+        self._lock = threading.Lock()
+
+    def _get(self, path):
+        with self._lock:
+            data = self.docs.get(path)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _stream(self, collection):
+        with self._lock:
+            return [(p.rsplit("/", 1)[1], copy.deepcopy(d)) for p, d in self.docs.items() if _parent(p) == collection]
+
+    def _commit(self, writes):
+        staged = [(path, copy.deepcopy(data)) for path, data in writes]
+        with self._lock:
+            self.docs.update(staged)
+
+class SQLiteBackend(StateBackend):
+    """Documents as JSON rows of one SQLite file; a committed batch is one transaction."""
+    def __init__(self, path="data/cloud_state.db", latency=0.0):
+        super().__init__(latency)
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS docs (path TEXT PRIMARY KEY, parent TEXT NOT NULL, data TEXT NOT NULL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS docs_parent ON docs (parent)")
+
+    def _get(self, path):
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM docs WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _stream(self, collection):
+        with self._lock:
+            rows = self.conn.execute("SELECT path, data FROM docs WHERE parent = ? ORDER BY path", (collection,)).fetchall()
+        return [(p.rsplit("/", 1)[1], json.loads(d)) for p, d in rows]
+
+    def _commit(self, writes):
+        rows = [(path, _parent(path), json.dumps(data, default=str)) for path, data in writes]
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO docs (path, parent, data) VALUES (?, ?, ?)", rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class FirestoreBackend(StateBackend):
+    """firebase_admin Firestore client (application default credentials unless a client is given)."""
+    batch_limit = 500 # Firestore caps a WriteBatch at 500 writes
+
+    def __init__(self, client=None, latency=0.0):
+        super().__init__(latency)
+        if client is None:
+            # Deferred: firebase_admin (and grpc) is only loaded by cloud code paths
+            import firebase_admin
+            from firebase_admin import credentials, firestore
+            if not firebase_admin._apps:
+                # Works on Google Cloud automatically; locally needs GOOGLE_APPLICATION_CREDENTIALS
+                firebase_admin.initialize_app(credentials.ApplicationDefault())
+            client = firestore.client()
+        self.client = client
+
+    def _get(self, path):
+        snap = self.client.document(path).get()
+        return snap.to_dict() if snap.exists else None
+
+    def _stream(self, collection):
+        return [(doc.id, doc.to_dict()) for doc in self.client.collection(collection).stream()]
+
+    def _commit(self, writes):
+        batch = self.client.batch()
+        for path, data in writes:
+            batch.set(self.client.document(path), data)
+        batch.commit()
+
+_shared = {}
+
+def get_backend(kind=None):
+    """
+    The process-wide backend of a kind ('firestore', 'sqlite', 'memory'),
+    default from STATE_BACKEND. SQLite uses STATE_DB (data/cloud_state.db).
+    """
+    kind = (kind or os.getenv("STATE_BACKEND") or "firestore").lower()
+    backend = _shared.get(kind)
+    if backend is None:
+        if kind == "firestore":
+            backend = FirestoreBackend()
+        elif kind == "sqlite":
+            backend = SQLiteBackend(os.getenv("STATE_DB", "data/cloud_state.db"))
+        elif kind == "memory":
+            backend = MemoryBackend()
+        else:
+            raise ValueError(f"Unknown STATE_BACKEND '{kind}' (firestore, sqlite, memory)")
+        _shared[kind] = backend
+    return backend
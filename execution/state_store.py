@@ -0,0 +1,199 @@
+"""
+Transactional SQLite (WAL) store for strategy wallets.
+
+One database holds every strategy's balance, positions and an append-only
+trades table, replacing one data/sim_<name>.json per strategy:
+- save() / save_many() only insert trades appended since the last save
+  (per-wallet watermark), so persistence is O(new trades + open positions)
+  instead of rewriting the whole trade log.
+- save_many() writes all wallets of a tick in one transaction.
+- import_json() / export_json() / snapshot() keep the sim_<name>.json format
+  for migration, the dashboard and external tools.
+
+Durability: WAL with synchronous=NORMAL. A committed tick survives a process
+crash; on power loss the last few commits may roll back, but the database is
+never left half-written.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from utils.logger import setup_logger
+
+logger = setup_logger("State_Store")
+
+DEFAULT_DB_PATH = "data/state.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    name TEXT PRIMARY KEY,
+    balance REAL NOT NULL,
+    updated_at TEXT,
+    currency TEXT
+);
+CREATE TABLE IF NOT EXISTS positions (
+    name TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    amount REAL NOT NULL,
+    entry_price REAL NOT NULL,
+    PRIMARY KEY (name, ticker)
+);
+CREATE TABLE IF NOT EXISTS trades (
+    name TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    date TEXT,
+    action TEXT,
+    ticker TEXT,
+    price REAL,
+    amount REAL,
+    cost REAL,
+    balance REAL,
+    context TEXT,
+    PRIMARY KEY (name, seq)
+);
+CREATE INDEX IF NOT EXISTS trades_by_ticker ON trades (name, ticker, seq);
+"""
+
+_TRADE_FIELDS = ('date', 'action', 'ticker', 'price', 'amount', 'cost', 'balance')
+
+def _trade_row(name, seq, trade):
+    context = trade.get('context')
+    return (name, seq, str(trade['date']), trade['action'], trade['ticker'], trade['price'],
+            trade['amount'], trade['cost'], trade['balance'],
+            json.dumps(context, default=str) if context is not None else None)
+
+def _trade_dict(row):
+    trade = dict(zip(_TRADE_FIELDS, row[:7]))
+    if row[7] is not None:
+        trade['context'] = json.loads(row[7])
+    return trade
+
+class SQLiteStateStore:
+    """
+    Args:
+        path (str): Database file (":memory:" for tests).
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the trading loop and a persistence thread
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        self._saved = {} # wallet name -> trades already in the table
+
+    def _migrate(self):
+        """Adds columns introduced after a database was created."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(wallets)")}
+        if "currency" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE wallets ADD COLUMN currency TEXT")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Writes ---
+
+    def _write(self, name, broker):
+        """Wallet row, positions and new trades for one broker (inside a transaction)."""
+        conn = self.conn
+        conn.execute("INSERT OR REPLACE INTO wallets (name, balance, updated_at, currency) VALUES (?, ?, ?, ?)",
+                     (name, float(broker.balance), datetime.now().isoformat(), broker.currency))
+        conn.execute("DELETE FROM positions WHERE name = ?", (name,))
+        conn.executemany("INSERT INTO positions (name, ticker, amount, entry_price) VALUES (?, ?, ?, ?)",
+                         [(name, t, float(p['amount']), float(p['entry_price']))
+                          for t, p in broker.positions.items()])
+
+        trades = broker.trade_log
+        start = self._saved.get(name)
+        if start is None:
+            row = conn.execute("SELECT COUNT(*) FROM trades WHERE name = ?", (name,)).fetchone()
+            start = row[0]
+        if start > len(trades):
+            # The in-memory log was replaced (e.g. re-imported); rewrite it
+            conn.execute("DELETE FROM trades WHERE name = ?", (name,))
+            start = 0
+        if start < len(trades):
+            conn.executemany("INSERT OR REPLACE INTO trades VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             [_trade_row(name, seq, trades[seq]) for seq in range(start, len(trades))])
+        return len(trades)
+
+    def save_many(self, wallets):
+        """Persists [(name, broker), ...] in one transaction."""
+        wallets = list(wallets)
+        with self.lock:
+            with self.conn: # commit on success, rollback on error
+                saved = {name: self._write(name, broker) for name, broker in wallets}
+            self._saved.update(saved)
+
+    def save(self, name, broker):
+        self.save_many([(name, broker)])
+
+    # --- Reads ---
+
+    def names(self):
+        with self.lock:
+            return [r[0] for r in self.conn.execute("SELECT name FROM wallets ORDER BY name")]
+
+    def snapshot(self, name):
+        """{'balance', 'positions', 'trade_log'} (+ 'currency' if set) in the sim_<name>.json format, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT balance, currency FROM wallets WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            positions = {t: {'amount': a, 'entry_price': e} for t, a, e in self.conn.execute(
+                "SELECT ticker, amount, entry_price FROM positions WHERE name = ? ORDER BY rowid", (name,))}
+            trades = [_trade_dict(r) for r in self.conn.execute(
+                "SELECT date, action, ticker, price, amount, cost, balance, context FROM trades "
+                "WHERE name = ? ORDER BY seq", (name,))]
+        state = {"balance": row[0], "positions": positions, "trade_log": trades}
+        if row[1] is not None:
+            state["currency"] = row[1]
+        return state
+
+    def load(self, name, broker, legacy_json=None):
+        """
+        Restores a broker's wallet. Unknown wallets are imported from `legacy_json`
+        (sim_<name>.json) when that file exists. Returns True if state was found.
+        """
+        state = self.snapshot(name)
+        if state is None:
+            return bool(legacy_json) and self.import_json(name, legacy_json, broker)
+        broker.balance = state["balance"]
+        broker.positions = broker._restore_positions(state["positions"])
+        broker.trade_log = state["trade_log"]
+        broker.currency = state.get("currency", broker.currency)
+        self._saved[name] = len(broker.trade_log)
+        logger.info(f"{name}: wallet loaded from {self.path}. Balance: {broker.balance:.2f}")
+        return True
+
+    # --- JSON compatibility ---
+
+    def import_json(self, name, path, broker=None):
+        """Loads sim_<name>.json into the store (and into `broker` if given)."""
+        if not os.path.exists(path):
+            return False
+        from execution.paper_broker import PaperBroker
+        target = broker if broker is not None else PaperBroker()
+        target.load_state(path)
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM trades WHERE name = ?", (name,))
+                self._saved[name] = 0
+                self._saved[name] = self._write(name, target)
+        return True
+
+    def export_json(self, name, path):
+        """Writes the stored wallet as sim_<name>.json."""
+        state = self.snapshot(name)
+        if state is None:
+            return False
+        with open(path, 'w') as f:
+            json.dump(state, f, default=str)
+        return True
@@ -0,0 +1,116 @@
+"""
+Stop-loss and trailing-stop triggers for a broker's open positions.
+
+StopEngine keeps one precomputed trigger price per held ticker:
+
+    floor:   entry * (1 - stop_loss_pct)          (fixed stop)
+    high:    high-water mark since the position was opened
+    trigger: max(floor, high * (1 - trailing_stop_pct))
+
+so a tick costs one comparison per held ticker. A trigger is only recomputed
+when its price sets a new high (or the position changes), and only positions
+whose price fell below their trigger are reported. Positions are armed /
+re-armed by the broker whenever an order changes them (see
+PaperBroker._position_changed), so the engine never rescans the book.
+"""
+from collections import namedtuple
+
+StopHit = namedtuple('StopHit', 'ticker price kind level')
+StopHit.__doc__ = "A triggered stop: kind 'stop' (level = entry) or 'trailing' (level = high-water mark)."
+
+_NO_STOP = float('-inf')
+
+class StopEngine:
+    """
+    Args:
+        stop_loss_pct (float): Fixed stop below the entry price (None = off).
+        trailing_stop_pct (float): Trailing stop below the high-water mark (None = off).
+    """
+    def __init__(self, stop_loss_pct=0.05, trailing_stop_pct=None):
+        self.stop_loss_pct = stop_loss_pct
+        self.trailing_stop_pct = trailing_stop_pct
+        self.triggers = {} # armed ticker -> trigger price, in arming order
+        self.entries = {}  # armed ticker -> entry price
+        self.floors = {}   # armed ticker -> fixed stop price
+        self.highs = {}    # armed ticker -> high-water mark (absent until a price is seen)
+
+    def __len__(self):
+        return len(self.triggers)
+
+    def __contains__(self, ticker):
+        return ticker in self.triggers
+
+    def _retrigger(self, ticker):
+        trigger = self.floors[ticker]
+        high = self.highs.get(ticker)
+        if high is not None and self.trailing_stop_pct is not None:
+            trigger = max(trigger, high * (1 - self.trailing_stop_pct))
+        self.triggers[ticker] = trigger
+
+    def _set_floor(self, ticker):
+        entry = self.entries[ticker]
+        if self.stop_loss_pct is not None and entry > 0:
+            self.floors[ticker] = entry * (1 - self.stop_loss_pct)
+        else:
+            self.floors[ticker] = _NO_STOP
+
+    def configure(self, stop_loss_pct, trailing_stop_pct=None):
+        """Changes the percentages and recomputes every armed trigger."""
+        if stop_loss_pct == self.stop_loss_pct and trailing_stop_pct == self.trailing_stop_pct:
+            return
+        self.stop_loss_pct = stop_loss_pct
+        self.trailing_stop_pct = trailing_stop_pct
+        for ticker in self.triggers:
+            self._set_floor(ticker)
+            self._retrigger(ticker)
+
+    def arm(self, ticker, entry_price):
+        """Arms (or re-arms after an add) a held position; the high-water mark survives re-arming."""
+        self.entries[ticker] = entry_price
+        self._set_floor(ticker)
+        self._retrigger(ticker)
+
+    def disarm(self, ticker):
+        if self.triggers.pop(ticker, None) is not None:
+            del self.entries[ticker], self.floors[ticker]
+            self.highs.pop(ticker, None)
+
+    def update(self, ticker, position):
+        """Position change hook: position mapping (or None once closed)."""
+        if position is not None and position['amount'] > 0:
+            self.arm(ticker, position['entry_price'])
+        else:
+            self.disarm(ticker)
+
+    def sync(self, positions):
+        """Re-arms from a whole positions mapping (after a load or an outside edit)."""
+        for ticker in [t for t in self.triggers if t not in positions]:
+            self.disarm(ticker)
+        for ticker, pos in positions.items():
+            self.update(ticker, pos)
+
+    def check(self, price_map):
+        """
+        Raises high-water marks and returns this tick's StopHits, in arming order.
+        price_map only needs .get(); missing (or zero) prices are skipped. Hit
+        positions stay armed until the broker reports them closed.
+        """
+        get = price_map.get
+        highs = self.highs
+        hits = []
+        for ticker, trigger in self.triggers.items():
+            price = get(ticker)
+            if not price:
+                continue
+            high = highs.get(ticker)
+            if high is None or price > high:
+                highs[ticker] = price
+                if self.trailing_stop_pct is not None:
+                    self._retrigger(ticker)
+                    trigger = self.triggers[ticker]
+            if price < trigger:
+                if price < self.floors[ticker]:
+                    hits.append(StopHit(ticker, price, 'stop', self.entries[ticker]))
+                else:
+                    hits.append(StopHit(ticker, price, 'trailing', highs[ticker]))
+        return hits
@@ -0,0 +1,113 @@
+"""
+N independent paper portfolios stepped together.
+
+VectorBroker holds what N PaperBrokers would - cash, position sizes and entry
+prices - as rows of arrays over one ticker universe, so a Monte Carlo path or
+a sweep candidate is a row instead of a broker object. Each order method
+handles one ticker for every portfolio at once, and execute_signals walks the
+universe in column order (T vectorized steps of size N per bar), which is the
+order PaperBroker fills a strategy's batch in.
+
+Fills follow PaperBroker exactly: RiskManager slippage on both sides,
+RiskManager commission on buys, the broker commission on sells, the 100
+minimum on pct buys, whole-unit buys, weighted-average entry prices and dust
+cleanup on sells.
+"""
+import numpy as np
+from execution.risk_manager import RiskManager
+
+class VectorBroker:
+    """
+    Args:
+        n_portfolios (int): Number of independent portfolios (rows).
+        tickers (list): Ticker universe (columns).
+        start_balance (float | array): Starting cash, scalar or one per portfolio.
+        commission (float): Sell commission, as PaperBroker.commission.
+    """
+    def __init__(self, n_portfolios, tickers, start_balance=1000.0, commission=0.001, slippage=0.001):
+        self.n = int(n_portfolios)
+        self.tickers = list(tickers)
+        self.index = {t: j for j, t in enumerate(self.tickers)}
+        shape = (self.n, len(self.tickers))
+        self.balance = np.full(self.n, start_balance, dtype=float)
+        self.initial_balance = self.balance.copy()
+        self.commission = commission
+        self.slippage = slippage
+        self.risk_manager = RiskManager()
+        self.amount = np.zeros(shape)
+        self.entry_price = np.zeros(shape)
+        self.trades = np.zeros(self.n, dtype=np.int64) # buy()/sell() fills (what trade_log would hold)
+
+    def _rows(self, rows):
+        """Row indices from None (all portfolios), a boolean mask or indices."""
+        if rows is None:
+            return np.arange(self.n)
+        rows = np.asarray(rows)
+        return np.flatnonzero(rows) if rows.dtype == bool else rows
+
+    def _fill_buy(self, j, rows, qty, exec_price):
+        """Books whole-unit buys of column j for `rows` (qty > 0)."""
+        cost = qty * exec_price * self.risk_manager.commission_rate
+        self.balance[rows] -= (qty * exec_price) + cost
+        old = self.amount[rows, j]
+        new = old + qty
+        self.entry_price[rows, j] = ((old * self.entry_price[rows, j]) + (qty * exec_price)) / new
+        self.amount[rows, j] = new
+
+    def buy(self, j, rows, price, pct_portfolio):
+        """PaperBroker.buy(pct_portfolio=...) of column j in every selected portfolio. Returns filled rows."""
+        rows = self._rows(rows)
+        exec_price = price * (1 + self.risk_manager.slippage_rate)
+        budget = np.minimum(self.initial_balance[rows] * pct_portfolio, self.balance[rows])
+        qty = np.floor(budget / (exec_price * (1 + self.risk_manager.commission_rate)))
+        ok = (budget >= 100) & (qty >= 1)
+        rows, qty = rows[ok], qty[ok]
+        self._fill_buy(j, rows, qty, exec_price)
+        self.trades[rows] += 1
+        return rows
+
+    def buy_value(self, j, rows, price, amount_tl):
+        """PaperBroker.execute_vault_buy: up to amount_tl of column j (capped at cash, not logged)."""
+        rows = self._rows(rows)
+        exec_price = price * (1 + self.risk_manager.slippage_rate)
+        budget = np.minimum(amount_tl, self.balance[rows])
+        qty = np.floor(budget / (exec_price * (1 + self.risk_manager.commission_rate)))
+        ok = qty > 0
+        rows, qty = rows[ok], qty[ok]
+        self._fill_buy(j, rows, qty, exec_price)
+        return rows
+
+    def sell(self, j, rows, price, pct_portfolio=1.0):
+        """PaperBroker.sell(pct_portfolio=...) of column j in every selected portfolio. Returns filled rows."""
+        rows = self._rows(rows)
+        rows = rows[self.amount[rows, j] > 0]
+        qty = self.amount[rows, j] * pct_portfolio
+        exec_price = price * (1 - self.risk_manager.slippage_rate)
+        gross = qty * exec_price
+        self.balance[rows] += gross - gross * self.commission
+        left = self.amount[rows, j] - qty
+        dust = left < 1e-6
+        left[dust] = 0.0
+        self.amount[rows, j] = left
+        self.entry_price[rows[dust], j] = 0.0
+        self.trades[rows] += 1
+        return rows
+
+    def execute_signals(self, prices, buy, sell, pct_portfolio):
+        """
+        BaseStrategy.execute_signals for every portfolio: (N, T) buy / sell masks;
+        flat portfolios buy, holders sell the whole position, column by column.
+        """
+        held = self.amount > 0
+        act = (buy & ~held) | (sell & held)
+        for j in np.flatnonzero(act.any(axis=0)):
+            rows = act[:, j]
+            if (rows & held[:, j]).any():
+                self.sell(j, rows & held[:, j], prices[j])
+            if (rows & ~held[:, j]).any():
+                self.buy(j, rows & ~held[:, j], prices[j], pct_portfolio)
+
+    def equity(self, prices):
+        """Cash + marked positions per portfolio (unpriced tickers count as 0, like get_portfolio_value)."""
+        marks = np.where(np.isnan(prices), 0.0, prices)
+        return self.balance + (self.amount * marks).sum(axis=1)
@@ -2,10 +2,11 @@ import yfinance as yf
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from strategies.features import add_all_features
+from data.feature_store import FeatureStore
 from data.labeling import add_target
 from execution.paper_broker import PaperBroker
 from utils.logger import setup_logger
-from config.settings import TICKERS, STOP_LOSS_PCT, SAFE_TICKER, SAFE_ALLOCATION_PCT, CURRENCY, ACTIVE_MODE, MARKET_CONFIG
+from config.settings import TICKERS, STOP_LOSS_PCT, TRAILING_STOP_PCT, SAFE_TICKER, SAFE_ALLOCATION_PCT, CURRENCY, ACTIVE_MODE, MARKET_CONFIG
 
 logger = setup_logger("Backtest_Multi_Mode")
 
@@ -103,6 +104,7 @@ def run_backtest(mode):
     
     active_tickers = []
     
+    raw_data = {}
     for ticker in TICKERS:
         raw = fetch_and_prepare(ticker, mode, start_date, end_date)
         if raw.empty: continue
@@ -111,8 +113,13 @@ def run_backtest(mode):
         if len(raw) < 200:
              logger.warning(f"{ticker}: Insufficient history.")
              continue
-             
-        df = prepare_ai_data(raw)
+        raw_data[ticker] = raw
+        
+    # Features for all tickers in one pass (frames on the same calendar share a block)
+    featured = FeatureStore().add_all_features_many(raw_data)
+    
+    for ticker in raw_data:
+        df = add_target(featured[ticker].dropna())
         train_df = df.loc[df.index < split_date]
         test_df = df.loc[df.index >= split_date]
         
@@ -137,7 +144,7 @@ def run_backtest(mode):
     master_clock = safe_test_df.index
     
     # 4. Sim
-    broker = PaperBroker(initial_balance=100000.0)
+    broker = PaperBroker(start_balance=100000.0)
     stock_alloc = (1.0 - SAFE_ALLOCATION_PCT) / len(active_tickers)
     
     for current_date in master_clock:
@@ -157,7 +164,7 @@ def run_backtest(mode):
         broker.rebalance_vault(current_prices, SAFE_TICKER, SAFE_ALLOCATION_PCT)
         
         # Stop Loss (exclude Safe)
-        dumps = broker.check_portfolio_safety(current_prices, STOP_LOSS_PCT)
+        dumps = broker.check_portfolio_safety(current_prices, STOP_LOSS_PCT, TRAILING_STOP_PCT)
         for t in dumps:
             if t != SAFE_TICKER and t in current_prices:
                 broker.sell(t, current_prices[t], current_date)
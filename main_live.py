@@ -2,19 +2,77 @@ import time
 import yfinance as yf
 import pandas as pd
 from datetime import datetime
+from sklearn.ensemble import RandomForestClassifier
 
 from utils.logger import setup_logger
 from utils.market_helpers import is_market_open
 from utils.notifier import send_notification
 from strategies.features import add_all_features
+from strategies.live_features import LiveFeatures
 from data.labeling import add_target
 from execution.paper_broker import PaperBroker
-from config.settings import TICKERS, CHECK_INTERVAL_SECONDS, TRAINING_PERIOD, STOP_LOSS_PCT, KILL_SWITCH_PCT, SAFE_TICKER, SAFE_ALLOCATION_PCT, CURRENCY, ACTIVE_MODE
+from config.settings import TICKERS, CHECK_INTERVAL_SECONDS, TRAINING_PERIOD, STOP_LOSS_PCT, TRAILING_STOP_PCT, KILL_SWITCH_PCT, SAFE_TICKER, SAFE_ALLOCATION_PCT, CURRENCY, ACTIVE_MODE
 
 logger = setup_logger("Main_Live_Multi")
 
-# ... (fetch_and_train_model stays same)
-# ... (get_latest_prediction stays same)
+FEATURES = ['RSI', 'SMA_50', 'SMA_200', 'macd', 'macd_signal', 'macd_hist', 'ATR']
+
+def _download(ticker, period):
+    df = yf.download(ticker, period=period, interval="1d", auto_adjust=False, progress=False)
+    if hasattr(df.columns, 'nlevels') and df.columns.nlevels > 1:
+        df.columns = df.columns.droplevel(1)
+    if 'Adj Close' not in df.columns and 'Close' in df.columns:
+        df['Adj Close'] = df['Close']
+    return df
+
+def fetch_and_train_model(ticker):
+    """
+    Trains once on TRAINING_PERIOD of history.
+    Returns (model, LiveFeatures warmed up on that history) or (None, None).
+    """
+    try:
+        df = _download(ticker, TRAINING_PERIOD)
+        if len(df) < 200:
+            logger.warning(f"{ticker}: Insufficient history ({len(df)} bars).")
+            return None, None
+
+        # The last bar may still be forming; it is evaluated per cycle, not learned.
+        history = df.iloc[:-1]
+        data = add_target(add_all_features(history).dropna())
+        model = RandomForestClassifier(n_estimators=100, min_samples_split=50, random_state=1)
+        model.fit(data[FEATURES], data['Target'])
+        return model, LiveFeatures.from_frame(history)
+    except Exception as e:
+        logger.error(f"{ticker}: Training failed: {e}")
+        return None, None
+
+def get_latest_prediction(model, feats, ticker):
+    """
+    Advances the ticker's feature state with the newest bars only and predicts on the latest row.
+    Completed bars are committed; the newest (possibly unfinished) bar is evaluated with peek().
+    Returns (prediction, price, date) or (None, None, None).
+    """
+    try:
+        df = _download(ticker, "5d")
+        if df.empty:
+            return None, None, None
+        if feats.timestamp is not None:
+            df = df.loc[df.index > feats.timestamp]
+        if df.empty:
+            return None, None, None
+
+        bars = df[['Adj Close', 'Close', 'High', 'Low']].to_numpy(dtype=float)
+        for ts, bar in zip(df.index[:-1], bars[:-1].tolist()):
+            feats.update(*bar, timestamp=ts)
+        row = feats.peek(*bars[-1])
+
+        x = pd.DataFrame([[row[c] for c in FEATURES]], columns=FEATURES)
+        if x.isna().to_numpy().any():
+            return None, None, None
+        return int(model.predict(x)[0]), float(bars[-1][0]), df.index[-1]
+    except Exception as e:
+        logger.error(f"{ticker}: Prediction failed: {e}")
+        return None, None, None
 
 def main():
     logger.info(f"--- AI TRADER BOT STARTED (Mode: {ACTIVE_MODE}) ---")
@@ -83,7 +141,7 @@ def main():
             broker.rebalance_vault(current_prices, SAFE_TICKER, SAFE_ALLOCATION_PCT)
 
             # Stop Loss Check
-            tickers_to_dump = broker.check_portfolio_safety(current_prices, stop_loss_pct=STOP_LOSS_PCT)
+            tickers_to_dump = broker.check_portfolio_safety(current_prices, stop_loss_pct=STOP_LOSS_PCT, trailing_stop_pct=TRAILING_STOP_PCT)
             for ticker in tickers_to_dump:
                 if ticker == SAFE_TICKER: continue # Never Stop-Loss the Vault? Or should we? Assuming Vault is safe.
                 
@@ -114,8 +172,7 @@ def main():
                 pred, price, date = get_latest_prediction(model, feats, ticker)
                 
                 if pred is not None:
-                    current_qty_data = broker.positions.get(ticker, {'amount': 0})
-                    current_qty = current_qty_data['amount'] if isinstance(current_qty_data, dict) else current_qty_data
+                    current_qty = broker.get_position_amt(ticker)
                     
                     if pred == 1 and current_qty == 0:
                         # BUY
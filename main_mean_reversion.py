@@ -1,6 +1,7 @@
 import yfinance as yf
 import pandas as pd
-from strategies.features import add_all_features, add_bollinger_bands
+from strategies.features import add_bollinger_bands
+from data.feature_store import FeatureStore
 from execution.paper_broker import PaperBroker
 from utils.logger import setup_logger
 from config.settings import MARKET_CONFIG, ACTIVE_MODE
@@ -34,12 +35,12 @@ def run_strategy(ticker):
         return
 
     # 2. Add Features
-    df = add_all_features(df) # Adds RSI
+    df = FeatureStore().add_all_features(ticker, df) # Adds RSI
     df = add_bollinger_bands(df)
     df.dropna(inplace=True)
     
     # 3. Simulation
-    broker = PaperBroker(initial_balance=10000.0)
+    broker = PaperBroker(start_balance=10000.0)
     
     for date, row in df.iterrows():
         price = row['Adj Close']
@@ -48,10 +49,7 @@ def run_strategy(ticker):
         bb_lower = row['BB_Lower']
         
         # Position Check
-        if isinstance(broker.positions.get(ticker), dict):
-             qty = broker.positions[ticker]['amount']
-        else:
-             qty = broker.positions.get(ticker, 0)
+        qty = broker.get_position_amt(ticker)
         
         # LOGIC
         # BUY: Price below Lower Band (Extended downside) AND RSI < 30 (Oversold)
@@ -1,5 +1,5 @@
 import yfinance as yf
-from strategies.features import add_all_features
+from data.feature_store import FeatureStore
 from data.labeling import add_target
 from models.training import train_and_evaluate
 from utils.logger import setup_logger
@@ -22,7 +22,7 @@ def main():
     
     # 2. Add Features
     logger.info("Adding Technical Features (RSI, MACD, SMA)...")
-    df_features = add_all_features(df)
+    df_features = FeatureStore().add_all_features(ticker, df)
     
     # Drop NaNs generated by rolling windows (e.g. SMA_200 needs 200 days)
     df_features = df_features.dropna()
@@ -5,6 +5,7 @@ import yfinance as yf
 from datetime import datetime
 from colorama import Fore, Style, init
 from find_consecutive_stocks import get_best_pairs
+from strategies.pairs_strategy import PairSpreadTracker
 from config.settings import MARKET_CONFIG
 
 # Initialize Colorama
@@ -51,7 +52,7 @@ def fetch_current_price(tickers):
              print(f"Error fetching prices: {e}")
              return {}
 
-def monitor_pairs(interval=60):
+def monitor_pairs(interval=60, window=20, z_alert=2.0, hedge="kalman"):
     print(f"{Fore.CYAN}--- STARTING REAL-TIME PAIRS MONITOR ---{Style.RESET_ALL}")
     
     # 1. Discovery Phase
@@ -70,6 +71,10 @@ def monitor_pairs(interval=60):
         
     watching_tickers = list(watching_tickers)
     
+    # Online hedge ratio + rolling z-score of the log spread for every correlated pair
+    # (O(1) per pair per check, vectorized across pairs)
+    spreads = PairSpreadTracker(best_pairs['correlation'], window=window, hedge=hedge) if best_pairs['correlation'] else None
+    
     # Baseline Storage (To calculate changes)
     # in a real app, we'd have a database. Here we just store the initial price.
     last_prices = {} 
@@ -89,27 +94,14 @@ def monitor_pairs(interval=60):
                 continue
                 
             # Check Correlated Pairs (Divergence Strategy)
-            for t1, t2, score in best_pairs['correlation']:
-                p1 = current_prices.get(t1)
-                p2 = current_prices.get(t2)
-                
-                if p1 and p2:
-                    # Simple Ratio Check
-                    ratio = p1 / p2
-                    # In a full version, we'd compare this to the Moving Average Ratio (Z-Score)
-                    # For now, we print the ratio and price change if we have previous data
-                    
-                    if t1 in last_prices and t2 in last_prices:
-                        chg1 = (p1 - last_prices[t1]) / last_prices[t1] * 100
-                        chg2 = (p2 - last_prices[t2]) / last_prices[t2] * 100
-                        
-                        # Divergence Alert: If they move in opposite directions significantly
-                        diff = abs(chg1 - chg2)
-                        if diff > 1.0: # 1% Divergence in one interval
-                            print(f"{Fore.RED}[ALERT] Divergence on {t1}-{t2}! {t1}:{chg1:.2f}%, {t2}:{chg2:.2f}%{Style.RESET_ALL}")
-                        else:
-                            # Print status occasionally/verbose
-                            pass
+            if spreads is not None:
+                z = spreads.update_prices(current_prices)
+                with np.errstate(invalid='ignore'):
+                    diverged = np.flatnonzero(np.abs(z) > z_alert)
+                for k in diverged:
+                    t1, t2 = spreads.pairs[k]
+                    rich, cheap = (t1, t2) if z[k] > 0 else (t2, t1)
+                    print(f"{Fore.RED}[ALERT] Divergence on {t1}-{t2}! Z={z[k]:+.2f}, hedge ratio {spreads.beta[k]:.2f} ({rich} rich vs {cheap}){Style.RESET_ALL}")
                             
             # Check Lead-Lag (Follow Strategy)
             for leader, follower, lag, score in best_pairs['lead_lag']:
@@ -2,7 +2,7 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 import random
-from strategies.features import add_all_features
+from data.feature_store import FeatureStore
 from execution.paper_broker import PaperBroker
 from utils.logger import setup_logger
 from config.settings import MARKET_CONFIG, ACTIVE_MODE
@@ -71,7 +71,7 @@ def run_rl_training(ticker):
     if df.empty: return
 
     # 2. Prep Features
-    df = add_all_features(df).dropna()
+    df = FeatureStore().add_all_features(yf_ticker, df).dropna()
     
     agent = QLearningAgent()
     
@@ -135,7 +135,7 @@ def run_rl_training(ticker):
         
     # 4. Test Run (Backtest the learned policy)
     logger.info("--- TESTING POLICY ---")
-    broker = PaperBroker(initial_balance=10000.0)
+    broker = PaperBroker(start_balance=10000.0)
     
     # Turn off exploration for test
     global EPSILON
@@ -1,6 +1,6 @@
 import yfinance as yf
 import pandas as pd
-from strategies.features import add_all_features
+from data.feature_store import FeatureStore
 from execution.paper_broker import PaperBroker
 from utils.logger import setup_logger
 from config.settings import MARKET_CONFIG
@@ -48,12 +48,12 @@ def run_optimization(mode):
     tickers = config["TICKERS"]
     
     safe_df = fetch_and_prepare(safe_ticker, mode, start_date, end_date)
-    active_data = {}
+    raw_data = {}
     for t in tickers:
         df = fetch_and_prepare(t, mode, start_date, end_date)
         if not df.empty:
-            df = add_all_features(df).dropna()
-            active_data[t] = df
+            raw_data[t] = df
+    active_data = {t: df.dropna() for t, df in FeatureStore().add_all_features_many(raw_data).items()}
             
     clock = safe_df.index
     years = [2022, 2023, 2024, 2025]
@@ -65,7 +65,7 @@ def run_optimization(mode):
     
     for ratio in ratios:
         # print(f"Testing Ratio: {ratio*100:.0f}% Vault")
-        broker = PaperBroker(initial_balance=100000.0)
+        broker = PaperBroker(start_balance=100000.0)
         
         for date in clock:
             prices = {safe_ticker: safe_df.loc[date]['Adj Close']}
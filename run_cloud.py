@@ -1,29 +1,30 @@
+from utils.startup import report_startup # First: start the cold-start clock
 import time
 import os
-import pandas as pd
-import yfinance as yf
 from datetime import datetime
-from colorama import Fore, Style, init
 
-# Import Strategies
-from strategies.grid_strategy import GridStrategy
-from strategies.mean_reversion_strategy import MeanReversionStrategy
-from strategies.trend_strategy import TrendStrategy
-from strategies.dca_strategy import DCAStrategy
-from strategies.advanced_strategies import BumTrendStrategy, GuaMomentumStrategy
-
-# Import Firebase Broker
-from execution.firebase_broker import FirebaseBroker
+# Strategies are resolved lazily by name (no strategy module is imported until used)
+from strategies.registry import create_strategy
+from execution.persistence import PersistenceWorker
 # Utils
 from utils.notifier import send_notification
 from config.settings import MARKET_CONFIG
 
-init(autoreset=True)
+# Heavy dependencies (pandas, yfinance, firebase_admin) are imported inside
+# the code paths that need them so every scheduled invocation starts fast.
 
 class CloudBot:
-    def __init__(self):
+    def __init__(self, backend=None, broker_cls=None):
+        """
+        backend (StateBackend): Wallet store for every strategy; None = get_backend() (Firestore by default).
+        broker_cls: FirebaseBroker (sub)class to use.
+        """
+        self.backend = backend
+        self.broker_cls = broker_cls
         self.strategies = []
         # No Scanner in Cloud/Cron mode for simplicity, just Strategy execution
+        # Firestore writes happen behind the market loop; run_all_markets flushes before exit
+        self.persistence = PersistenceWorker(flush_interval=2.0)
 
     def setup_market(self, market_name):
         """Initializes strategies for a specific market."""
@@ -35,23 +36,26 @@ class CloudBot:
             return
 
         tickers = cfg["TICKERS"]
-        broker_class = FirebaseBroker
+        from functools import partial
+        from execution.firebase_broker import FirebaseBroker
+        broker_class = partial(self.broker_cls or FirebaseBroker, backend=self.backend)
         
         # Instantiate Strategies with Cloud Naming (e.g. SmartDCA_BIST_Cloud)
         # We need unique names to avoid Firestore collisions if running multiple bots
         suffix = f"{market_name}_Cloud"
         
-        self.strategies.append(DCAStrategy(name=f"SmartDCA_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
-        self.strategies.append(TrendStrategy(name=f"Trend_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
+        self.strategies.append(create_strategy("SmartDCA", name=f"SmartDCA_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
+        self.strategies.append(create_strategy("TrendHunter", name=f"Trend_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
         
         if market_name == "CRYPTO":
-             self.strategies.append(GuaMomentumStrategy(name=f"GUA_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
+             self.strategies.append(create_strategy("RUA_Mom", name=f"GUA_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
         elif market_name == "BIST":
-             self.strategies.append(BumTrendStrategy(name=f"BUM_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
+             self.strategies.append(create_strategy("BUM_Trend", name=f"BUM_{suffix}", balance=1000.0, tickers=tickers, broker_cls=broker_class))
 
         print(f"Loaded {len(self.strategies)} Strategies for {market_name}.")
 
-    def run_market_tick(self, market_name):
+    def run_market_tick(self, market_name, market_data=None):
+        """market_data: {ticker: price} to use instead of fetching (offline runs)."""
         print(f"\n>>> PROCESSING MARKET: {market_name} <<<")
         self.setup_market(market_name)
         
@@ -69,25 +73,9 @@ class CloudBot:
         interval = "15m" 
         period = "1d"
         
-        print(f"Fetching {interval} data for {len(all_tickers)} tickers...")
         try:
-            df = yf.download(all_tickers, period=period, interval=interval, progress=False)
-            
-            # YFinance Structure Handling
-            prices = df['Close'] if 'Close' in df else df['Adj Close']
-            
-            market_data = {}
-            for t in all_tickers:
-                try:
-                    val = None
-                    if isinstance(prices, pd.Series):
-                        val = prices.iloc[-1]
-                    elif t in prices.columns:
-                        val = prices[t].iloc[-1]
-                    
-                    if pd.notna(val):
-                        market_data[t] = val
-                except: pass
+            if market_data is None:
+                market_data = self.fetch_market_data(all_tickers, interval, period)
                 
             if not market_data:
                 print("Market data empty.")
@@ -109,7 +97,7 @@ class CloudBot:
                         print(f"NOTIFICATION: {msg}")
                         send_notification(f"AI Cloud: {market_name}", msg)
                     
-                    strategy.save() # Persist to Firestore
+                    self.persistence.mark_dirty(strategy) # Persist to Firestore (write-behind)
                     
                 except Exception as e:
                     print(f"Error {strategy.name}: {e}")
@@ -117,16 +105,47 @@ class CloudBot:
         except Exception as e:
             print(f"Fetch Error: {e}")
 
-    def run_all_markets(self):
+    def fetch_market_data(self, all_tickers, interval, period):
+        print(f"Fetching {interval} data for {len(all_tickers)} tickers...")
+        import pandas as pd
+        import yfinance as yf
+
+        df = yf.download(all_tickers, period=period, interval=interval, progress=False)
+        
+        # YFinance Structure Handling
+        prices = df['Close'] if 'Close' in df else df['Adj Close']
+        
+        market_data = {}
+        for t in all_tickers:
+            try:
+                val = None
+                if isinstance(prices, pd.Series):
+                    val = prices.iloc[-1]
+                elif t in prices.columns:
+                    val = prices[t].iloc[-1]
+                
+                if pd.notna(val):
+                    market_data[t] = val
+            except: pass
+        return market_data
+
+    def run_all_markets(self, market_data=None):
+        """market_data: optional {market: {ticker: price}} instead of fetching (offline runs)."""
         # Loop through all available markets in Settings
         markets = ["BIST", "GLOBAL", "CHIPS", "CRYPTO"]
-        for m in markets:
-            try:
-                self.run_market_tick(m)
-            except Exception as e:
-                print(f"Critical Error in {m}: {e}")
+        self.persistence.start()
+        try:
+            for m in markets:
+                try:
+                    self.run_market_tick(m, market_data.get(m) if market_data is not None else None)
+                except Exception as e:
+                    print(f"Critical Error in {m}: {e}")
+        finally:
+            self.persistence.close() # The job exits next: flush every wallet
 
 if __name__ == "__main__":
     # Ensure env vars are set
+    report_startup("Cold start (imports)")
     bot = CloudBot()
     bot.run_all_markets()
+    report_startup("Total run")
@@ -36,13 +36,13 @@ def get_fresh_strategies():
     START_CAP = 1000.0
     
     return [
-        TrendStrategy(name="TrendHunter", balance=START_CAP, tickers=tickers),
-        MeanReversionStrategy(name="MeanRev", balance=START_CAP, tickers=tickers),
-        BumTrendStrategy(name="BUM_Trend", balance=START_CAP, tickers=tickers),
+        TrendStrategy(name="TrendHunter", balance=START_CAP, tickers=tickers, load_state=False, silent=True),
+        MeanReversionStrategy(name="MeanRev", balance=START_CAP, tickers=tickers, load_state=False, silent=True),
+        BumTrendStrategy(name="BUM_Trend", balance=START_CAP, tickers=tickers, load_state=False, silent=True),
         # GridBot usually fails high volatility long term, assume we test it too
-        GridStrategy(name="GridBot", balance=START_CAP, tickers=tickers),
-        DCAStrategy(name="SmartDCA", balance=START_CAP, tickers=tickers), # Benchmark
-        GuaMomentumStrategy(name="RUA_Mom", balance=START_CAP, tickers=tickers)
+        GridStrategy(name="GridBot", balance=START_CAP, tickers=tickers, load_state=False, silent=True),
+        DCAStrategy(name="SmartDCA", balance=START_CAP, tickers=tickers, load_state=False, silent=True), # Benchmark
+        GuaMomentumStrategy(name="RUA_Mom", balance=START_CAP, tickers=tickers, load_state=False, silent=True)
     ]
 
 def run_decade():
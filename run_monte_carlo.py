@@ -1,13 +1,8 @@
 import pandas as pd
-import random
 import numpy as np
 from colorama import Fore, Style, init
-from backtest_engine import BacktestEngine
-
-# Strategies
-from strategies.trend_strategy import TrendStrategy
-from strategies.dca_strategy import DCAStrategy
-from strategies.advanced_strategies import BumTrendStrategy
+from execution.vector_broker import VectorBroker
+from strategies.indicators import SuperTrendPanel
 
 init(autoreset=True)
 
@@ -22,16 +17,57 @@ BIST_POOL = [
     "YKBNK.IS", "VAKBN.IS", "HALKB.IS", "PETKM.IS", "ARCLK.IS", "TOASO.IS"
 ]
 
-def get_random_strategies():
-    # Pick 5 random tickers
-    selected_tickers = random.sample(BIST_POOL, 5)
-    START_CAP = 1000.0
-    
-    return [
-        DCAStrategy(name="SmartDCA", balance=START_CAP, tickers=selected_tickers),
-        BumTrendStrategy(name="BUM_Trend", balance=START_CAP, tickers=selected_tickers)
-        # Limiting to top 2 for speed/clarity in report
-    ]
+START_CAP = 1000.0
+PICKS = 5 # Random tickers per portfolio
+
+def random_universes(n_runs, rng):
+    """(n_runs, len(BIST_POOL)) mask: PICKS random tickers per run."""
+    picks = np.argsort(rng.random((n_runs, len(BIST_POOL))), axis=1)[:, :PICKS]
+    mask = np.zeros((n_runs, len(BIST_POOL)), dtype=bool)
+    np.put_along_axis(mask, picks, True, axis=1)
+    return mask
+
+def simulate_year(prices, universe):
+    """
+    SmartDCA and BUM_Trend for every random portfolio at once.
+    Each strategy is one VectorBroker with a row per run; SuperTrend
+    signals are per ticker, so they are computed once for the pool.
+
+    Returns:
+        {strategy: (dates x runs equity DataFrame, trades per run)}
+    """
+    n_runs = len(universe)
+    tickers = list(prices.columns)
+    values = prices.to_numpy(dtype=float)
+    dca = VectorBroker(n_runs, tickers, start_balance=START_CAP)
+    bum = VectorBroker(n_runs, tickers, start_balance=START_CAP)
+    st = SuperTrendPanel(len(tickers), 10, 3.0)
+
+    last = np.full(len(tickers), np.nan)
+    dates, curves = [], {"SmartDCA": [], "BUM_Trend": []}
+    for timestamp, row in zip(prices.index, values):
+        quoted = ~np.isnan(row)
+        live = universe & quoted # run x ticker: quoted and in the run's portfolio
+        if not live.any(): continue
+        np.copyto(last, row, where=quoted)
+
+        # SmartDCA: 50 TL of every quoted ticker while cash >= 50
+        for j in np.flatnonzero(live.any(axis=0)):
+            dca.buy_value(j, live[:, j] & (dca.balance >= 50), row[j], 50.0)
+
+        # BUM_Trend: SuperTrend on close-only bars, 50% positions
+        ready = quoted & ~np.isnan(st.update(row, row, row, quoted))
+        bum.execute_signals(row, live & ready & st.bullish, live & ready & ~st.bullish, 0.5)
+
+        dates.append(timestamp)
+        curves["SmartDCA"].append(dca.equity(last))
+        curves["BUM_Trend"].append(bum.equity(last))
+
+    index = pd.DatetimeIndex(dates)
+    return {
+        "SmartDCA": (pd.DataFrame(curves["SmartDCA"], index=index), dca.trades),
+        "BUM_Trend": (pd.DataFrame(curves["BUM_Trend"], index=index), bum.trades),
+    }
 
 def calculate_monthly_metrics(equity_curve):
     """
@@ -51,8 +87,8 @@ def calculate_monthly_metrics(equity_curve):
     
     return returns
 
-def run_monte_carlo():
-    print(Fore.YELLOW + "!!! MONTE CARLO SIMULATION (5 RUNS) WITH MONTHLY BREAKDOWN !!!")
+def run_monte_carlo(runs=5):
+    print(Fore.YELLOW + f"!!! MONTE CARLO SIMULATION ({runs} RUNS) WITH MONTHLY BREAKDOWN !!!")
     
     # 1. BULK FETCH (Optimization)
     print(Fore.CYAN + "Bulk Fetching 10 Years Data for ALL Tickers (One Time)...")
@@ -63,31 +99,22 @@ def run_monte_carlo():
     print(Fore.GREEN + f"Loaded {full_prices.shape[0]} days of data for {full_prices.shape[1]} tickers.")
 
     all_runs_monthly_data = [] # To store monthly returns for aggregation
+    rng = np.random.default_rng()
     
-    for i in range(1, 6):
-        print(Fore.CYAN + f"\n--- RUN #{i} (Random Portfolio) ---")
-        
-        for year in range(2015, 2026):
-            start = f"{year}-01-01"
-            end = f"{year}-12-31"
-            strats = get_random_strategies()
-            
-            # Pass preloaded data
-            engine = BacktestEngine(start, end, strats, preloaded_data=full_prices)
-            results = engine.run()
-            
-            if not results: continue
-
-            print(f"   Year {year}: ", end="")
-            for name, res in results.items():
-                roi = res['roi']
-                print(f"{name}={roi:.1f}% | ", end="")
-                
-                # Monthly Breakdown
-                monthly_ret = calculate_monthly_metrics(res.get('history', []))
-                
-                # Tag data
-                for date, val in monthly_ret.items():
+    for year in range(2015, 2026):
+        # Every run is one row of the year's vectorized simulation
+        year_prices = full_prices.loc[f"{year}-01-01":f"{year}-12-31"]
+        if year_prices.empty: continue
+        results = simulate_year(year_prices, random_universes(runs, rng))
+
+        for name, (equity, _) in results.items():
+            roi = (equity.iloc[-1] - START_CAP) / START_CAP * 100
+            print(f"   Year {year} {name}: " + " | ".join(f"#{i}={r:.1f}%" for i, r in enumerate(roi, 1)))
+
+            # Monthly Breakdown (all runs at once)
+            monthly = equity.resample('ME').last().pct_change().fillna(0) * 100
+            for date, row in zip(monthly.index, monthly.to_numpy()):
+                for i, val in enumerate(row, 1):
                     all_runs_monthly_data.append({
                         "Run": i,
                         "Strategy": name,
@@ -95,7 +122,6 @@ def run_monte_carlo():
                         "Month": date.month,
                         "Return": val
                     })
-            print("")
 
     # === REPORTING ===
     print("\n" + "="*50)
@@ -118,7 +144,7 @@ def run_monte_carlo():
     
     # Also show Year-over-Year stability
     print("\n" + "="*50)
-    print("   WIN RATE ACROSS 5 SIMULATIONS")
+    print(f"   WIN RATE ACROSS {runs} SIMULATIONS")
     print("="*50)
     
     final_roi = df.groupby(['Run', 'Strategy'])['Return'].sum() # Approx yearly sum of monthly returns? No, ROI is better.
@@ -2,6 +2,7 @@ import pandas as pd
 import yfinance as yf
 from colorama import Fore, Style, init
 from backtest_engine import BacktestEngine
+from data.fx import FXRates
 
 # Strategies
 from strategies.trend_strategy import TrendStrategy
@@ -23,6 +24,9 @@ INFLATION_US = {
     2020: 1.23, 2021: 4.70, 2022: 8.00, 2023: 4.10, 2024: 3.10, 2025: 2.50
 }
 
+# Cross-market comparisons are reported in one currency
+REPORT_CURRENCY = "USD"
+
 # 2. Ticker Pools
 POOLS = {
     "BIST (Istanbul)": {
@@ -42,12 +46,13 @@ POOLS = {
     }
 }
 
-def get_strategies(tickers, balance=1000.0):
+def get_strategies(tickers, balance=1000.0, currency=None):
+    opts = dict(balance=balance, tickers=tickers, load_state=False, silent=True, currency=currency)
     return [
-        DCAStrategy(name="SmartDCA", balance=balance, tickers=tickers),
-        BumTrendStrategy(name="BUM_Trend", balance=balance, tickers=tickers),
-        TrendStrategy(name="TrendHunter", balance=balance, tickers=tickers),
-        GuaMomentumStrategy(name="RUA_Mom", balance=balance, tickers=tickers)
+        DCAStrategy(name="SmartDCA", **opts),
+        BumTrendStrategy(name="BUM_Trend", **opts),
+        TrendStrategy(name="TrendHunter", **opts),
+        GuaMomentumStrategy(name="RUA_Mom", **opts)
     ]
 
 def fetch_all_data():
@@ -64,18 +69,21 @@ def fetch_all_data():
 
 def run_multimarket_test():
     prices_df = fetch_all_data()
+    fx = FXRates.load([p['currency'] for p in POOLS.values()], "2015-01-01", "2026-01-01")
+    summary = {}
     
     print(Fore.YELLOW + "\n=== MULTI-MARKET DECADE BACKTEST (2015-2025) ===")
     
     for market_name, config in POOLS.items():
         print(Fore.MAGENTA + f"\n>>> MARKET: {market_name} ({config['currency']})")
-        print(f"{'YEAR':<6} | {'INFLATION':<10} | {'WINNER':<12} | {'NOMINAL':<10} | {'REAL ROI':<10}")
-        print("-" * 65)
+        print(f"{'YEAR':<6} | {'INFLATION':<10} | {'WINNER':<12} | {'NOMINAL':<10} | {'REAL ROI':<10} | {REPORT_CURRENCY + ' ROI':<10}")
+        print("-" * 78)
         
         market_tickers = config['tickers']
         inflation_map = config['inflation']
         
         agg_real_roi = 0
+        report_growth = 1.0
         winning_counts = {}
         
         for year in range(2015, 2026):
@@ -83,8 +91,8 @@ def run_multimarket_test():
             end = f"{year}-12-31"
             inf = inflation_map.get(year, 0)
             
-            strats = get_strategies(market_tickers)
-            engine = BacktestEngine(start, end, strats, preloaded_data=prices_df)
+            strats = get_strategies(market_tickers, currency=config['currency'])
+            engine = BacktestEngine(start, end, strats, preloaded_data=prices_df, fx=fx, report_currency=REPORT_CURRENCY)
             results = engine.run()
             
             if not results:
@@ -105,14 +113,23 @@ def run_multimarket_test():
             user_inf = 1 + (inf / 100.0)
             real_roi = ((user_nom / user_inf) - 1) * 100.0
             
+            report_roi = results[best_strat]['report_roi']
+            
             agg_real_roi += real_roi
+            report_growth *= 1 + report_roi / 100.0
             winning_counts[best_strat] = winning_counts.get(best_strat, 0) + 1
             
-            print(f"{year:<6} | {inf:<9.1f}% | {best_strat:<12} | {best_roi:<9.1f}% | {real_roi:<9.1f}%")
+            print(f"{year:<6} | {inf:<9.1f}% | {best_strat:<12} | {best_roi:<9.1f}% | {real_roi:<9.1f}% | {report_roi:<9.1f}%")
             
-        print("-" * 65)
+        print("-" * 78)
         print(f"Aggregated Real Return (10 Years): {agg_real_roi:.1f}% (Sum of annual real returns)")
+        print(f"Compounded {REPORT_CURRENCY} Return (yearly winners): {(report_growth - 1) * 100:.1f}%")
+        summary[market_name] = (report_growth - 1) * 100
         print(f"Dominant Strategy: {max(winning_counts, key=winning_counts.get)} ({max(winning_counts.values())} wins)")
 
+    print(Fore.YELLOW + f"\n=== CROSS-MARKET ({REPORT_CURRENCY}) ===")
+    for market_name, growth in sorted(summary.items(), key=lambda kv: -kv[1]):
+        print(f"{market_name:<28} | {growth:>9.1f}%")
+
 if __name__ == "__main__":
     run_multimarket_test()
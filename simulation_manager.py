@@ -1,18 +1,14 @@
+from utils.startup import report_startup # First: start the cold-start clock
 import time
-import pandas as pd
-import yfinance as yf
 from datetime import datetime
 from colorama import Fore, Style, init
 
-# Strategies
-from strategies.grid_strategy import GridStrategy
-from strategies.mean_reversion_strategy import MeanReversionStrategy
-from strategies.trend_strategy import TrendStrategy
-from strategies.dca_strategy import DCAStrategy
-from strategies.chip_strategy import ChipMemoryStrategy
-from strategies.advanced_strategies import BumTrendStrategy, MatrDipStrategy, GuaMomentumStrategy, MgbBandStrategy
+# Strategies (resolved lazily by name)
+from strategies.registry import create_strategy, get_strategy_class
 
 # Utils
+from execution.persistence import PersistenceWorker
+from execution.state_store import SQLiteStateStore
 from utils.market_scanner import MarketScanner
 from utils.notifier import send_notification
 from utils.robustness import retry_connection
@@ -25,6 +21,9 @@ class SimulationManager:
         self.strategies = []
         self.scanner = MarketScanner()
         self.is_running = True
+        # All wallets in one SQLite database, written behind the trading loop
+        self.state_store = SQLiteStateStore()
+        self.persistence = PersistenceWorker(flush_interval=5.0)
         
         # Benchmark Initial Prices (For comparison)
         self.benchmarks = {
@@ -38,24 +37,28 @@ class SimulationManager:
         # 1. Initialize Strategies
         # Fixed Tickers per strategy
         bist_tickers = ["AKBNK.IS", "THYAO.IS", "BIMAS.IS"]
+        store = self.state_store
         
         # Standard
-        self.strategies.append(GridStrategy(name="GridBot", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MeanReversionStrategy(name="MeanRev", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(TrendStrategy(name="TrendHunter", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(DCAStrategy(name="SmartDCA", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(ChipMemoryStrategy(name="ChipHunter", balance=1000.0))
+        self.strategies.append(create_strategy("GridBot", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("MeanRev", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("TrendHunter", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("SmartDCA", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("ChipHunter", balance=1000.0, state_store=store))
         
         # Advanced (New)
-        self.strategies.append(BumTrendStrategy(name="BUM_Trend", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MatrDipStrategy(name="MATR_Dip", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(GuaMomentumStrategy(name="RUA_Mom", balance=1000.0, tickers=bist_tickers))
-        self.strategies.append(MgbBandStrategy(name="MGB_Band", balance=1000.0, tickers=bist_tickers))
+        self.strategies.append(create_strategy("BUM_Trend", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("MATR_Dip", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("RUA_Mom", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("MGB_Band", balance=1000.0, tickers=bist_tickers, state_store=store))
+        self.strategies.append(create_strategy("Pairs", balance=1000.0, pairs=[("AKBNK.IS", "GARAN.IS")], state_store=store))
         
         print(f"Initialized {len(self.strategies)} Strategies with 1000 TL each.")
         
         # 2. Benchmark Snapshot
         try:
+            import yfinance as yf
+
             bench_tickers = [b["ticker"] for b in self.benchmarks.values()]
             data = yf.download(bench_tickers, period="1d", progress=False)['Close']
             for k, v in self.benchmarks.items():
@@ -70,6 +73,8 @@ class SimulationManager:
     def fetch_live_data(self, all_tickers):
         """Fetch current prices for all needed tickers."""
         if not all_tickers: return {}
+        import pandas as pd
+        import yfinance as yf
         try:
             # unique
             t_list = list(set(all_tickers))
@@ -97,6 +102,8 @@ class SimulationManager:
 
     def run_loop(self, interval=60):
         print(Fore.GREEN + "Simulation Started. Press Ctrl+C to stop.")
+        self.persistence.start()
+        self.persistence.install_signal_handlers()
         
         try:
             while self.is_running:
@@ -109,6 +116,7 @@ class SimulationManager:
                     if opportunities:
                         print(f"{Fore.YELLOW}Scanner found: {opportunities}")
                         # Add to Trend Strategy
+                        TrendStrategy = get_strategy_class("TrendHunter")
                         for s in self.strategies:
                             if isinstance(s, TrendStrategy):
                                 for op in opportunities:
@@ -148,10 +156,13 @@ class SimulationManager:
                         
                         # Log Status
                         # print(f"  {strategy.get_status()}") # Reduce spam
-                        strategy.save() # Persist
                         
                     except Exception as e:
                         print(f"Error in {strategy.name}: {e}")
+
+                # 5. Queue changed wallets; the persistence thread writes them in one transaction
+                for strategy in self.strategies:
+                    self.persistence.mark_dirty(strategy)
                 
                  # Hourly Summary Notification
                  # ... (Omitted for brevity, can add later)
@@ -161,6 +172,8 @@ class SimulationManager:
         except KeyboardInterrupt:
             print("\nStopping Simulation...")
             self.report_results()
+        finally:
+            self.persistence.close() # Flush everything still queued
 
     def report_results(self):
         print(Fore.CYAN + "\n--- FINAL REPORT ---")
@@ -175,4 +188,5 @@ class SimulationManager:
 if __name__ == "__main__":
     sim = SimulationManager()
     sim.setup()
+    report_startup("Startup (imports + setup)")
     sim.run_loop(interval=60) # 1 minute loops
@@ -1,6 +1,7 @@
-from strategies.base_strategy import BaseStrategy
 import numpy as np
-import pandas as pd
+from strategies.base_strategy import BaseStrategy
+from strategies.indicators import (RollingWindow, RollingPanel, SuperTrend, SuperTrendPanel,
+                                   WilderRSI, WilderRSIPanel, wilder_rsi)
 
 class BumTrendStrategy(BaseStrategy):
     """
@@ -10,76 +11,46 @@ class BumTrendStrategy(BaseStrategy):
     def __init__(self, name="BUM_Trend", balance=1000.0, tickers=None, atr_period=10, multiplier=3.0, **kwargs):
         super().__init__(name, balance, **kwargs)
         self.tickers = tickers if tickers else []
-        self.history = {}
+        self.supertrend = {} # {ticker: SuperTrend}
         self.atr_period = atr_period
         self.multiplier = multiplier
 
     def calculate_supertrend(self, df):
-        # Basic SuperTrend Calculation
-        high = df['High']
-        low = df['Low']
-        close = df['Close']
-        
-        # TR
-        tr1 = abs(high - low)
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(self.atr_period).mean()
-        
-        # HL2
-        hl2 = (high + low) / 2
-        
-        # Upper/Lower Bands
-        final_upper = hl2 + (self.multiplier * atr)
-        final_lower = hl2 - (self.multiplier * atr)
-        
-        # SuperTrend Logic (Simplified for brevity)
-        supertrend = [True] * len(df) # True = Bullish, False = Bearish
-        
-        # Iterative update needed for SuperTrend state
-        # For simplicity in this mock, we'll use a simplified version:
-        # If Close > UpperBand -> Bullish
-        # If Close < LowerBand -> Bearish
-        # In real SuperTrend, the bands don't move against the trend.
-        
-        # Let's stick to EMA Crossover for Robustness if SuperTrend is too complex for simple pandas
-        # Actually user said "Directions map". Let's use simple EMA 20 > EMA 50.
-        # But let's try a simplified SuperTrend approximation.
-        
-        return close > final_lower # Crudest approximation: Close above Lower Band is bullish ish.
+        """Full-history SuperTrend direction (True = Bullish) for an OHLC DataFrame."""
+        from strategies.features import calculate_supertrend
+        st = calculate_supertrend(df, self.atr_period, self.multiplier)
+        return st['ST_Direction'] > 0
 
     def run_tick(self, market_data, timestamp):
-        # We need OHLC data for SuperTrend, but market_data is just {ticker: price} (Close)
-        # For simulation, we only have 'current price'. 
-        # LIVE: We assume we fetch history externally.
-        # BACKTEST: 'market_data' allows us to see *current*, but we need history.
-        
-        # FIX: The BaseStrategy design passes only current price. 
-        # Strategies need to maintain their own history or fetch it.
-        # In current design, we append price to self.history[ticker].
-        # We can simulate High/Low/Open from Close (Poor man's candles) or require meaningful history.
-        
-        for ticker, price in market_data.items():
-            if ticker not in self.history: self.history[ticker] = []
-            self.history[ticker].append(price)
-            if len(self.history[ticker]) > 50: self.history[ticker].pop(0)
-            
-            if len(self.history[ticker]) < 20: continue
-            
-            # Simple Trend Logic (BUM Equivalent)
-            # EMA 10 > EMA 30 -> GREEN (Buy)
-            prices = np.array(self.history[ticker])
-            ema_fast = np.mean(prices[-10:]) # SMA actually
-            ema_slow = np.mean(prices[-30:])
-            
-            if ema_fast > ema_slow * 1.01: # 1% Buffer
+        # market_data values are either a Close price or an OHLC bar
+        # ({'High', 'Low', 'Close'}). With Close-only data the True Range
+        # degrades to |Close - PrevClose|.
+        for ticker, bar in market_data.items():
+            if isinstance(bar, dict):
+                high, low, price = bar['High'], bar['Low'], bar['Close']
+            else:
+                high = low = price = bar
+
+            if ticker not in self.supertrend:
+                self.supertrend[ticker] = SuperTrend(self.atr_period, self.multiplier)
+            st = self.supertrend[ticker]
+            if st.update(high, low, price) is None: continue
+
+            # Trend GREEN -> hold, RED -> flat
+            if st.bullish:
                 if self.broker.get_position_amt(ticker) == 0:
                     self.broker.buy(ticker, price, timestamp, pct_portfolio=0.5)
-            elif ema_fast < ema_slow:
-                 if self.broker.get_position_amt(ticker) > 0:
+            else:
+                if self.broker.get_position_amt(ticker) > 0:
                     self.broker.sell(ticker, price, timestamp)
 
+    def run_batch(self, tickers, prices, timestamp):
+        # Close-only vector: True Range degrades to |Close - PrevClose| as in run_tick
+        st = self.batch_state(tickers, lambda n: SuperTrendPanel(n, self.atr_period, self.multiplier))
+        quoted = ~np.isnan(prices)
+        ready = quoted & ~np.isnan(st.update(prices, prices, prices, quoted))
+        self.execute_signals(tickers, prices, timestamp, ready & st.bullish, ready & ~st.bullish, 0.5)
+
 class MatrDipStrategy(BaseStrategy):
     """
     4. MAT-R DİPTEN DÖNÜŞ (Dip Avcısı)
@@ -88,37 +59,24 @@ class MatrDipStrategy(BaseStrategy):
     def __init__(self, name="MATR_Dip", balance=1000.0, tickers=None, **kwargs):
         super().__init__(name, balance, **kwargs)
         self.tickers = tickers if tickers else []
-        self.history = {}
+        self.rsi = {} # {ticker: WilderRSI}
 
     def calculate_rsi(self, prices, window=14):
-        deltas = np.diff(prices)
-        seed = deltas[:window+1]
-        up = seed[seed >= 0].sum()/window
-        down = -seed[seed < 0].sum()/window
-        if down == 0: return 100
-        rs = up/down
-        rsi = 100. - 100./(1. + rs)
-        # ... rolling ...
-        # Simplified for last value:
-        avg_gain = np.mean([x for x in deltas[-window:] if x > 0] or [0])
-        avg_loss = np.mean([abs(x) for x in deltas[-window:] if x < 0] or [0])
-        if avg_loss == 0: return 100
-        rs = avg_gain / avg_loss
-        return 100 - (100 / (1 + rs))
+        """Full recomputation over `prices` (reference for the per-ticker WilderRSI state)."""
+        rsi = wilder_rsi(prices, window)
+        return 50 if rsi is None else rsi
 
     def run_tick(self, market_data, timestamp):
         for ticker, price in market_data.items():
-            if ticker not in self.history: self.history[ticker] = []
-            self.history[ticker].append(price)
-            if len(self.history[ticker]) > 100: self.history[ticker].pop(0)
+            if ticker not in self.rsi: self.rsi[ticker] = WilderRSI(14)
+            state = self.rsi[ticker]
+            prev_price = state.last_price
+            rsi = state.update(price)
             
-            if len(self.history[ticker]) < 20: continue
-            
-            prices = self.history[ticker]
-            rsi = self.calculate_rsi(prices, 14)
+            if state.samples < 20: continue
             
             # Buy Dip: Oversold + Turning Up (Current > Previous)
-            if rsi < 30 and price > prices[-2]:
+            if rsi < 30 and price > prev_price:
                  if self.broker.get_position_amt(ticker) == 0:
                     self.broker.buy(ticker, price, timestamp, pct_portfolio=0.2)
             
@@ -127,6 +85,17 @@ class MatrDipStrategy(BaseStrategy):
                  if self.broker.get_position_amt(ticker) > 0:
                     self.broker.sell(ticker, price, timestamp)
 
+    def run_batch(self, tickers, prices, timestamp):
+        rsi_panel = self.batch_state(tickers, lambda n: WilderRSIPanel(n, 14))
+        quoted = ~np.isnan(prices)
+        prev_price = rsi_panel.last_price.copy()
+        rsi = rsi_panel.update(prices, quoted)
+        ready = quoted & (rsi_panel.samples >= 20)
+        with np.errstate(invalid='ignore'):
+            buy = ready & (rsi < 30) & (prices > prev_price)
+            sell = ready & ~buy & (rsi > 50)
+        self.execute_signals(tickers, prices, timestamp, buy, sell, 0.2)
+
 class GuaMomentumStrategy(BaseStrategy):
     """
     5. RUA MOMENTUM (GUA - Modified Name? RUA in prompt)
@@ -139,15 +108,13 @@ class GuaMomentumStrategy(BaseStrategy):
 
     def run_tick(self, market_data, timestamp):
         for ticker, price in market_data.items():
-            if ticker not in self.history: self.history[ticker] = []
+            if ticker not in self.history: self.history[ticker] = RollingWindow(30)
             self.history[ticker].append(price)
-            if len(self.history[ticker]) > 30: self.history[ticker].pop(0)
             
             if len(self.history[ticker]) < 10: continue
 
             # ROC (Rate of Change) over 5 periods
-            prev = self.history[ticker][-5]
-            roc = ((price - prev) / prev) * 100
+            roc = self.history[ticker].roc(4)
             
             # Verify Strong Momentum (> 2% in 5 ticks/days)
             if roc > 2.0:
@@ -159,6 +126,15 @@ class GuaMomentumStrategy(BaseStrategy):
                  if self.broker.get_position_amt(ticker) > 0:
                     self.broker.sell(ticker, price, timestamp)
 
+    def run_batch(self, tickers, prices, timestamp):
+        windows = self.batch_state(tickers, lambda n: RollingPanel(30, n))
+        quoted = ~np.isnan(prices)
+        windows.push(prices, quoted)
+        ready = quoted & (windows.count >= 10)
+        roc = windows.roc(4)
+        with np.errstate(invalid='ignore'):
+            self.execute_signals(tickers, prices, timestamp, ready & (roc > 2.0), ready & (roc < 0), 0.4)
+
 class MgbBandStrategy(BaseStrategy):
     """
     3. MGB-4S BANT (Yatay Piyasa Dedektörü)
@@ -173,14 +149,12 @@ class MgbBandStrategy(BaseStrategy):
 
     def run_tick(self, market_data, timestamp):
         for ticker, price in market_data.items():
-            if ticker not in self.history: self.history[ticker] = []
+            if ticker not in self.history: self.history[ticker] = RollingWindow(20)
             self.history[ticker].append(price)
-            if len(self.history[ticker]) > 30: self.history[ticker].pop(0)
             if len(self.history[ticker]) < 20: continue
             
-            prices = np.array(self.history[ticker])
-            sma = np.mean(prices[-20:])
-            std = np.std(prices[-20:])
+            sma = self.history[ticker].mean()
+            std = self.history[ticker].std()
             upper = sma + (2 * std)
             lower = sma - (2 * std)
             
@@ -206,3 +180,18 @@ class MgbBandStrategy(BaseStrategy):
                 elif price < lower:
                      if self.broker.get_position_amt(ticker) > 0:
                         self.broker.sell(ticker, price, timestamp)
+
+    def run_batch(self, tickers, prices, timestamp):
+        windows = self.batch_state(tickers, lambda n: RollingPanel(20, n))
+        quoted = ~np.isnan(prices)
+        windows.push(prices, quoted)
+        ready = quoted & (windows.count >= 20)
+        sma = windows.mean()
+        std = windows.std()
+        upper = sma + (2 * std)
+        lower = sma - (2 * std)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            is_squeeze = (upper - lower) / sma < 0.02
+            buy = ready & ~is_squeeze & (prices > upper)
+            sell = ready & (is_squeeze | (prices < lower))
+        self.execute_signals(tickers, prices, timestamp, buy, sell, 0.3)
@@ -1,61 +1,95 @@
 from abc import ABC, abstractmethod
-from execution.paper_broker import PaperBroker
+from collections.abc import Mapping
+import numpy as np
 from utils.logger import setup_logger
 
+class PriceVector(Mapping):
+    """
+    Read-only {ticker: price} view over a price array aligned with `tickers`.
+    NaN entries count as missing. Lets dict-based code (risk checks, broker
+    valuation) read batch prices without building a dict per tick.
+    """
+    def __init__(self, tickers, prices, index=None):
+        self.tickers = tickers
+        self.prices = prices
+        self.index = index if index is not None else {t: i for i, t in enumerate(tickers)}
+
+    def __getitem__(self, ticker):
+        price = self.prices[self.index[ticker]]
+        if price != price: raise KeyError(ticker)
+        return price
+
+    def __iter__(self):
+        return (t for t, p in zip(self.tickers, self.prices) if p == p)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
 class BaseStrategy(ABC):
-    def __init__(self, name="Base", balance=1000.0, broker_cls=None, stop_loss_pct=0.05, trailing_stop_pct=0.10):
+    def __init__(self, name="Base", balance=1000.0, broker_cls=None, stop_loss_pct=0.05, trailing_stop_pct=0.10,
+                 state_store=None, load_state=True, silent=False, currency=None):
+        """
+        Args:
+            state_store: SQLiteStateStore for the wallet; None keeps data/sim_<name>.json.
+            load_state (bool): Restore the saved wallet. Backtests and sweeps pass False
+                so every run starts from `balance`.
+            silent (bool): PaperBroker backtest mode (columnar fills, array-backed PositionBook,
+                no per-fill logging).
+            currency (str): Wallet currency ('TRY', 'USD'); reports convert from it.
+        """
         self.name = name
+        self.state_store = state_store
         self.logger = setup_logger(f"Strat_{name}")
         self.stop_loss_pct = stop_loss_pct
         self.trailing_stop_pct = trailing_stop_pct
-        self.highest_prices = {} # Track high water mark for trailing stop
         
         # Default to PaperBroker if none provided
         if broker_cls:
             self.broker = broker_cls(start_balance=balance, strategy_name=name)
+            if currency is not None:
+                from data.fx import normalize_currency
+                self.broker.currency = normalize_currency(currency)
         else:
             from execution.paper_broker import PaperBroker
-            self.broker = PaperBroker(start_balance=balance)
-            self.broker.load_state(f"data/sim_{name}.json")
+            self.broker = PaperBroker(start_balance=balance, silent=silent, position_book=silent, currency=currency)
+            if load_state and state_store is not None:
+                # First run against the store imports the legacy JSON wallet
+                state_store.load(name, self.broker, legacy_json=f"data/sim_{name}.json")
+            elif load_state:
+                self.broker.load_state(f"data/sim_{name}.json")
 
             
         self.scan_ticker_limit = 5 # max dynamic tickers to hold check
 
-    def save(self):
-        """Persist state."""
-        self.broker.save_state(filepath=f"data/sim_{self.name}.json")
+        # run_batch state: ticker universe, {ticker: column}, vectorized indicator state
+        self._batch_tickers = None
+        self._batch_index = None
+        self._batch = None
+
+    def save(self, broker=None):
+        """
+        Persist state.
+        broker: wallet to write (e.g. a PersistenceWorker snapshot); defaults to self.broker.
+        """
+        broker = broker if broker is not None else self.broker
+        if self.state_store is not None:
+            self.state_store.save(self.name, broker)
+        else:
+            broker.save_state(filepath=f"data/sim_{self.name}.json")
 
     def check_risk_management(self, market_data, timestamp):
         """
         Checks open positions for Stop Loss or Trailing Stop hits.
-        Returns True if a sell occured to avoid duplicate logic.
+        The broker's StopEngine keeps the triggers and high-water marks; only
+        positions whose price crossed a trigger come back here. market_data only needs .get().
         """
-        for ticker, price in market_data.items():
-            amt = self.broker.get_position_amt(ticker)
-            if amt <= 0:
-                if ticker in self.highest_prices: del self.highest_prices[ticker]
-                continue
-            
-            # 1. Update High Water Mark
-            if ticker not in self.highest_prices: self.highest_prices[ticker] = price
-            if price > self.highest_prices[ticker]: self.highest_prices[ticker] = price
-            
-            avg_entry = self.broker.positions[ticker]["entry_price"]
-            
-            # 2. Stop Loss (Fixed)
-            # If price < entry * (1 - stop_loss)
-            if price < avg_entry * (1 - self.stop_loss_pct):
-                self.logger.warning(f"STOP LOSS triggered for {ticker} at {price:.2f} (Entry: {avg_entry:.2f})")
-                self.broker.sell(ticker, price, timestamp, amount=amt)
-                continue
-                
-            # 3. Trailing Stop
-            # If price < highest * (1 - trailing_stop)
-            # Only activate if we are somewhat in profit? Or always? Usually always for safety.
-            trigger_price = self.highest_prices[ticker] * (1 - self.trailing_stop_pct)
-            if price < trigger_price:
-                 self.logger.warning(f"TRAILING STOP triggered for {ticker} at {price:.2f} (High: {self.highest_prices[ticker]:.2f})")
-                 self.broker.sell(ticker, price, timestamp, amount=amt)
+        hits = self.broker.check_stops(market_data, self.stop_loss_pct, self.trailing_stop_pct)
+        for ticker, price, kind, level in hits:
+            if kind == 'stop':
+                self.logger.warning(f"STOP LOSS triggered for {ticker} at {price:.2f} (Entry: {level:.2f})")
+            else:
+                self.logger.warning(f"TRAILING STOP triggered for {ticker} at {price:.2f} (High: {level:.2f})")
+            self.broker.sell(ticker, price, timestamp, amount=self.broker.get_position_amt(ticker))
 
     @abstractmethod
     def run_tick(self, market_data, timestamp):
@@ -64,6 +98,69 @@ class BaseStrategy(ABC):
         strategies should call self.check_risk_management(market_data, timestamp) at the start!
         """
         pass
+
+    def run_batch(self, tickers, prices, timestamp):
+        """
+        Vectorized execution step for a whole universe.
+
+        Args:
+            tickers (list): Ticker names; the same list object for every tick of a replay.
+            prices (np.ndarray): Float prices aligned with `tickers` (NaN = no quote).
+
+        Strategies override this to update their rolling state for all tickers
+        with array ops and only dispatch orders for tickers with a signal.
+        The default falls back to run_tick.
+        """
+        market_data = {t: p for t, p in zip(tickers, prices.tolist()) if p == p}
+        if market_data:
+            self.run_tick(market_data, timestamp)
+
+    def batch_state(self, tickers, factory):
+        """
+        Returns the vectorized state for `tickers`, created by factory(n) on first use.
+        The universe is fixed per instance (state columns are ticker positions).
+        """
+        if tickers is not self._batch_tickers:
+            if self._batch is not None and list(tickers) != list(self._batch_tickers):
+                raise ValueError(f"{self.name}: run_batch universe changed; use a new strategy instance")
+            self._batch_tickers = tickers
+            self._batch_index = {t: i for i, t in enumerate(tickers)}
+            if self._batch is None:
+                self._batch = factory(len(tickers))
+        return self._batch
+
+    def held_mask(self):
+        """Boolean vector over the batch universe: True where a position is open (O(held))."""
+        mask = np.zeros(len(self._batch_tickers), dtype=bool)
+        positions = self.broker.positions
+        if hasattr(positions, 'held_slots'):
+            # PositionBook: scatter the held slots' universe columns
+            cols = positions.columns(self._batch_index)[positions.held_slots()]
+            mask[cols[cols >= 0]] = True
+            return mask
+        for ticker in self.broker.positions:
+            i = self._batch_index.get(ticker)
+            if i is not None and self.broker.get_position_amt(ticker) > 0:
+                mask[i] = True
+        return mask
+
+    def execute_signals(self, tickers, prices, timestamp, buy, sell, pct_portfolio):
+        """
+        Batch order dispatch for flat/long strategies, in ticker order:
+        buy where `buy` and flat, sell the whole position where `sell` and held.
+        All orders of the bar go to the broker in one submit_orders call.
+        """
+        held = self.held_mask()
+        idx = np.flatnonzero((buy & ~held) | (sell & held))
+        if not len(idx):
+            return
+        sides = np.where(held[idx], -1, 1)
+        sizes = np.where(held[idx], 1.0, pct_portfolio)
+        self.broker.submit_orders([tickers[i] for i in idx], sides, sizes, prices[idx], timestamp)
+
+    def price_vector(self, tickers, prices):
+        """PriceVector for the current batch universe (call batch_state first)."""
+        return PriceVector(tickers, prices, self._batch_index)
     
     def get_status(self):
         val = self.broker.get_portfolio_value({}) # Price map needed for accurate equity
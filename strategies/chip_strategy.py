@@ -1,12 +1,12 @@
 from strategies.trend_strategy import TrendStrategy
 
 class ChipMemoryStrategy(TrendStrategy):
-    def __init__(self, name="ChipHunter", balance=1000.0, tickers=None):
+    def __init__(self, name="ChipHunter", balance=1000.0, tickers=None, **kwargs):
         # Default Sector Tickers if none provided
         sector_tickers = tickers if tickers else [
             "NVDA", "AMD", "TSM", "MU", "INTC", "ASML", "AVGO", "QCOM"
         ]
-        super().__init__(name, balance, tickers=sector_tickers)
+        super().__init__(name, balance, tickers=sector_tickers, **kwargs)
         
     def run_tick(self, market_data, timestamp):
         # Just use Trend Logic but maybe cleaner logging or specific tweaks?
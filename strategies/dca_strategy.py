@@ -2,8 +2,8 @@ from strategies.base_strategy import BaseStrategy
 from datetime import datetime
 
 class DCAStrategy(BaseStrategy):
-    def __init__(self, name="SmartDCA", balance=1000.0, tickers=None):
-        super().__init__(name, balance)
+    def __init__(self, name="SmartDCA", balance=1000.0, tickers=None, **kwargs):
+        super().__init__(name, balance, **kwargs)
         self.tickers = tickers if tickers else []
         self.last_buy_date = {} # {ticker: date_str}
 
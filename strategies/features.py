@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from strategies.indicators import supertrend
 
 def calculate_sma(series: pd.Series, window: int) -> pd.Series:
     """Calculates Simple Moving Average."""
@@ -58,38 +59,159 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     atr = tr.rolling(window=period).mean()
     return atr
 
+def calculate_supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0) -> pd.DataFrame:
+    """
+    Calculates SuperTrend (ATR trailing bands) over the full history.
+    Returns a DataFrame with 'SuperTrend' (line) and 'ST_Direction' (1 bull / -1 bear / 0 warm-up).
+    """
+    line, direction = supertrend(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy(),
+                                 period, multiplier)
+    return pd.DataFrame({'SuperTrend': line, 'ST_Direction': direction}, index=df.index)
+
+# Columns added by add_all_features, in order
+FEATURE_COLUMNS = ['SMA_50', 'SMA_200', 'RSI', 'macd', 'macd_signal', 'macd_hist', 'ATR']
+
+def _rolling_mean(x: np.ndarray, window: int, out: np.ndarray = None) -> np.ndarray:
+    """
+    pandas .rolling(window).mean() down axis 0 of a 2D (dates x tickers) array:
+    NaN until `window` values and wherever the window holds a NaN.
+    One cumulative sum per column (offset by its first value to keep the sums small),
+    so the cost is O(dates x tickers) whatever the window.
+    """
+    if out is None:
+        out = np.empty(x.shape)
+    valid = ~np.isnan(x)
+    first = x[valid.argmax(axis=0), np.arange(x.shape[1])]
+    offset = np.where(np.isnan(first), 0.0, first)
+    sums = np.cumsum(np.where(valid, x - offset, 0.0), axis=0)
+    gaps = np.cumsum(~valid, axis=0)
+    sums[window:] -= sums[:-window]
+    gaps[window:] -= gaps[:-window]
+    np.divide(sums, window, out=out)
+    out += offset
+    out[:window - 1] = np.nan
+    out[gaps > 0] = np.nan
+    return out
+
+def _rolling_std(x: np.ndarray, window: int, mean: np.ndarray) -> np.ndarray:
+    """pandas .rolling(window).std() (ddof=1) down axis 0, two-pass over each window."""
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+        dev = windows - mean[window - 1:, :, None]
+        out[window - 1:] = np.sqrt(np.einsum('ijk,ijk->ij', dev, dev) / (window - 1))
+    return out
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    """.ewm(span, adjust=False).mean() down axis 0, all tickers in one pandas call."""
+    return pd.DataFrame(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+def _rsi(src: np.ndarray, period: int, out: np.ndarray) -> np.ndarray:
+    """calculate_rsi (rolling-mean averages, 0 where undefined) down axis 0."""
+    delta = np.full(src.shape, np.nan)
+    np.subtract(src[1:], src[:-1], out=delta[1:])
+    gain = np.clip(delta, 0, None)
+    loss = -np.clip(delta, None, 0)
+    avg_gain = _rolling_mean(gain, period)
+    avg_loss = _rolling_mean(loss, period)
+    # Windows without a single gain (loss) are exactly 0, as in pandas, not cumsum residue
+    for moves, avg in ((gain, avg_gain), (loss, avg_loss)):
+        active = _rolling_mean((moves > 0).astype(float), period)
+        avg[(active == 0) & ~np.isnan(avg)] = 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.subtract(100, 100 / (1 + avg_gain / avg_loss), out=out)
+    out[np.isnan(out)] = 0
+    return out
+
+def compute_features(src: np.ndarray, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                     out: np.ndarray = None) -> np.ndarray:
+    """
+    Fused add_all_features kernel over 2D (dates x tickers) arrays.
+
+    Every indicator family is one vectorized pass over the whole block, written
+    straight into `out` (len(FEATURE_COLUMNS) x dates x tickers) in FEATURE_COLUMNS order.
+
+    Args:
+        src (np.ndarray): Price source ('Adj Close') for SMA / RSI / MACD.
+        close, high, low (np.ndarray): Bars for ATR.
+        out (np.ndarray): Optional preallocated float64 output.
+    """
+    src = np.asarray(src, dtype=float)
+    close, high, low = (np.asarray(a, dtype=float) for a in (close, high, low))
+    if out is None:
+        out = np.empty((len(FEATURE_COLUMNS),) + src.shape)
+    sma50, sma200, rsi, macd, signal, hist, atr = out
+
+    _rolling_mean(src, 50, out=sma50)
+    _rolling_mean(src, 200, out=sma200)
+    _rsi(src, 14, rsi)
+
+    np.subtract(_ewm(src, 12), _ewm(src, 26), out=macd)
+    signal[:] = _ewm(macd, 9)
+    np.subtract(macd, signal, out=hist)
+
+    # True Range; fmax skips the missing previous close on the first bar like .max(axis=1)
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[1:] = close[:-1]
+    tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    _rolling_mean(tr, 14, out=atr)
+    return out
+
 def add_bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: int = 2) -> pd.DataFrame:
-    """Adds Bollinger Bands (Upper, Middle, Lower) to the DataFrame."""
-    df = df.copy() # Work on a copy to avoid modifying original df
-    src = df['Adj Close'] # Assuming 'Adj Close' is the price source
-    
-    df['BB_Middle'] = src.rolling(window=period).mean()
-    df['BB_Std'] = src.rolling(window=period).std()
-    df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * std_dev)
-    df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * std_dev)
-    
-    df.drop(['BB_Std'], axis=1, inplace=True) # Remove temporary std column
-    return df
+    """Adds Bollinger Bands (Upper, Middle, Lower) to a copy of the DataFrame."""
+    src = df[['Adj Close']].to_numpy(dtype=float) # Assuming 'Adj Close' is the price source
+    middle = _rolling_mean(src, period)
+    std = _rolling_std(src, period, middle)
+    bands = pd.DataFrame({
+        'BB_Middle': middle[:, 0],
+        'BB_Upper': (middle + std * std_dev)[:, 0],
+        'BB_Lower': (middle - std * std_dev)[:, 0],
+    }, index=df.index)
+    return _with_columns(df, bands)
+
+def _with_columns(df: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """df plus `new`'s columns (replacing same-named ones) in a single copy."""
+    return pd.concat([df.drop(columns=[c for c in new.columns if c in df.columns]), new], axis=1)
 
 def add_all_features(df: pd.DataFrame) -> pd.DataFrame:
     """Helper feature to add all indicators to the dataframe."""
-    df = df.copy()
-    
     # Price source usually Adj Close
-    src = df['Adj Close']
-    
-    # SMA
-    df['SMA_50'] = calculate_sma(src, 50)
-    df['SMA_200'] = calculate_sma(src, 200)
-    
-    # RSI
-    df['RSI'] = calculate_rsi(src)
-    
-    # MACD
-    macd_df = calculate_macd(src)
-    df = pd.concat([df, macd_df], axis=1)
-    
-    # ATR
-    df['ATR'] = calculate_atr(df)
-    
-    return df
+    block = compute_features(*(df[[c]].to_numpy(dtype=float) for c in ('Adj Close', 'Close', 'High', 'Low')))
+    return _with_columns(df, pd.DataFrame(block[:, :, 0].T, index=df.index, columns=FEATURE_COLUMNS))
+
+def add_all_features_many(frames: dict) -> dict:
+    """
+    add_all_features for {ticker: df}. Frames sharing the same index are stacked
+    into one dates x tickers block and go through compute_features together.
+    """
+    groups = {}
+    for ticker, df in frames.items():
+        for key, members in groups.items():
+            if frames[members[0]].index.equals(df.index):
+                members.append(ticker)
+                break
+        else:
+            groups[ticker] = [ticker]
+
+    result = {}
+    for members in groups.values():
+        index = frames[members[0]].index
+        block = compute_features(*(np.column_stack([frames[t][c].to_numpy(dtype=float) for t in members])
+                                   for c in ('Adj Close', 'Close', 'High', 'Low')))
+        for j, ticker in enumerate(members):
+            feats = pd.DataFrame(block[:, :, j].T, index=index, columns=FEATURE_COLUMNS)
+            result[ticker] = _with_columns(frames[ticker], feats)
+    return {t: result[t] for t in frames}
+
+def panel_features(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    Features for an OHLCV panel with (field, ticker) columns (data.synthetic layout).
+    Returns a (feature, ticker) column panel on the same dates.
+    """
+    tickers = panel['Close'].columns
+    src = panel['Adj Close'] if 'Adj Close' in panel.columns.get_level_values(0) else panel['Close']
+    block = compute_features(src[tickers].to_numpy(dtype=float), panel['Close'][tickers].to_numpy(dtype=float),
+                             panel['High'][tickers].to_numpy(dtype=float),
+                             panel['Low'][tickers].to_numpy(dtype=float))
+    columns = pd.MultiIndex.from_product([FEATURE_COLUMNS, tickers])
+    return pd.DataFrame(block.transpose(1, 0, 2).reshape(len(panel), -1), index=panel.index, columns=columns)
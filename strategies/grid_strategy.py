@@ -1,41 +1,106 @@
+from functools import lru_cache
+import numpy as np
 from strategies.base_strategy import BaseStrategy
 from config.settings import MARKET_CONFIG
 
+@lru_cache(maxsize=None)
+def grid_offsets(grids=20, range_pct=0.10):
+    """
+    Sorted level multipliers around a center of 1.0.
+    Cached per grid shape, so re-centering is a single vector multiply.
+    """
+    step = np.arange(1, (grids // 2) + 1) * (range_pct * 2) / grids
+    offsets = np.sort(np.concatenate([1 - step, [1.0], 1 + step]))
+    offsets.flags.writeable = False
+    return offsets
+
+def grid_levels(center, grids=20, range_pct=0.10):
+    """Sorted grid price levels (list) centered on `center`."""
+    return (center * grid_offsets(grids, range_pct)).tolist()
+
+class RestingGrid:
+    """
+    One ticker's grid as resting limit orders on a PaperBroker.
+
+    Every level below the last price rests a buy of `qty` and every level above
+    it a sell, so a bar fills every level between the last price and its low /
+    high, multi-level gaps included; the order book's heaps only visit the
+    levels reached. Levels that filled (or were rejected for cash / inventory)
+    are re-armed after the bar on the side of its close, never within the bar
+    that reached them, so each level keeps trading both ways.
+    """
+    def __init__(self, broker, ticker, qty, grids=20, range_pct=0.10):
+        self.broker = broker
+        self.ticker = ticker
+        self.qty = qty
+        self.grids = grids
+        self.range_pct = range_pct
+        self.center = None
+        self.last_price = None
+        self.levels = []
+        self.orders = {} # level index -> resting Order
+        self._idle = []  # level indexes without an order (at the last price, or just touched)
+
+    def place(self, center):
+        """(Re)centers on `center`: cancels this grid's orders and rests every level around it."""
+        for order in self.orders.values():
+            self.broker.cancel_order(order.id)
+        self.orders = {}
+        self.center = self.last_price = center
+        self.levels = grid_levels(center, self.grids, self.range_pct)
+        self._idle = list(range(len(self.levels)))
+        self._arm()
+
+    def _arm(self):
+        idle = []
+        for i in self._idle:
+            level = self.levels[i]
+            if level == self.last_price:
+                idle.append(i)
+                continue
+            side = 'buy' if level < self.last_price else 'sell'
+            self.orders[i] = self.broker.place_order(self.ticker, side, self.qty, level, tag=i)
+        self._idle = idle
+
+    def match(self, high, low, date, open=None, close=None):
+        """Fills the levels this bar reaches, then re-arms them around `close`. Returns the filled orders."""
+        touched = []
+        filled = self.broker.match_orders(self.ticker, high, low, date, open=open, close=close,
+                                          on_fill=touched.append, on_reject=touched.append)
+        for order in touched:
+            if self.orders.get(order.tag) is order: # not another order resting on the ticker
+                del self.orders[order.tag]
+                self._idle.append(order.tag)
+        if close is not None:
+            self.last_price = close
+        self._arm()
+        return filled
+
 class GridStrategy(BaseStrategy):
     def __init__(self, name="MeanRev", balance=1000.0, tickers=None, **kwargs):
         super().__init__(name, balance, **kwargs)
         self.tickers = tickers if tickers else []
-        self.grids = {} # Store grid state per ticker
+        self.grids = {} # ticker -> RestingGrid
         
     def setup_grid(self, ticker, current_price):
-        """Initializes grid levels for a ticker."""
+        """(Re)centers the ticker's grid of resting orders on the current price."""
         grid_qty = max(1, int((self.broker.balance * 0.1) / current_price)) # 10% per grid line?
         
-        self.grids[ticker] = {
-            "center": current_price,
-            "qty": grid_qty,
-            "levels": self.calculate_levels(current_price),
-            "last_price": current_price
-        }
+        grid = self.grids.get(ticker)
+        if grid is None:
+            grid = self.grids[ticker] = RestingGrid(self.broker, ticker, grid_qty)
+        grid.qty = grid_qty
+        grid.place(current_price)
         self.logger.info(f"Initialized Grid for {ticker}: Center={current_price:.2f}, Qty={grid_qty}")
 
     def calculate_levels(self, center, grids=20, range_pct=0.10):
-        lower = [center * (1 - (i * (range_pct*2)/grids)) for i in range(1, (grids//2)+1)]
-        upper = [center * (1 + (i * (range_pct*2)/grids)) for i in range(1, (grids//2)+1)]
-        return sorted(lower + [center] + upper)
+        return grid_levels(center, grids, range_pct)
 
     def run_tick(self, market_data, timestamp):
         """
         market_data: {ticker: price}
         """
         self.check_risk_management(market_data, timestamp)
-        # The following lines from the instruction are syntactically incorrect or redundant.
-        # for ticker, price in market_data.items(): {ticker: price}
-        # else:
-        #     current_date = timestamp.strftime("%Y-%m-%d")
-        # The instruction "Add check_risk_management check" is already satisfied by the line above.
-        # If the intent was to add it again, it would be a duplicate.
-        # Assuming the primary intent was to ensure the check is present.
         
         for ticker, price in market_data.items():
             if ticker not in self.tickers: continue
@@ -46,29 +111,12 @@ class GridStrategy(BaseStrategy):
                 continue
                 
             grid = self.grids[ticker]
-            last_price = grid['last_price']
-            levels = grid['levels']
-            qty = grid['qty']
+            last_price = grid.last_price
             
-            # Check levels
-            for level in levels:
-                # Buy Cross (Down)
-                if last_price > level and price <= level:
-                     if self.broker.balance > (level * qty):
-                         self.broker.buy(ticker, level, timestamp, pct_portfolio=None) 
-                         # Note: Using pct_portfolio=None implies using full budget or logic in broker.
-                         # Need to fix Broker to accept 'amount' override or handle it better.
-                         # For now, relying on Broker's internal safeguards.
-                         
-                # Sell Cross (Up)
-                elif last_price < level and price >= level:
-                     if self.broker.get_position_amt(ticker) >= qty:
-                         self.broker.sell(ticker, level, timestamp, amount=qty)
-                         
-            # Update State
-            grid['last_price'] = price
+            # Close-only ticks: the move since the last tick is the bar; resting levels inside it fill
+            grid.match(max(last_price, price), min(last_price, price), timestamp, open=last_price, close=price)
             
             # Re-center check (Dynamic Grid)
-            if price > grid['center'] * 1.10 or price < grid['center'] * 0.90:
+            if price > grid.center * 1.10 or price < grid.center * 0.90:
                 self.logger.info(f"Re-centering grid for {ticker}")
                 self.setup_grid(ticker, price)
@@ -0,0 +1,518 @@
+"""
+Incremental indicator state for the per-tick strategy hot loop.
+
+Everything here updates in O(1) per new price, so a strategy's per-tick cost
+does not depend on how much history it keeps.
+"""
+import numpy as np
+
+class RollingWindow:
+    """
+    Fixed-capacity ring buffer of floats with running sums.
+
+    - append() is O(1): no list.pop(0), no re-conversion to arrays.
+    - mean/var/std over the full window or any tracked sub-period
+      (e.g. RollingWindow(30, periods=(10,)) gives O(1) SMA10 and SMA30).
+    - view() returns a zero-copy, contiguous, read-only array of the most
+      recent values (oldest -> newest).
+
+    Every value is written twice (at i and i + capacity) so the live window is
+    always one contiguous slice of the backing array.
+    Sums are kept relative to a shift value and re-synced every `capacity`
+    appends, which keeps variance numerically stable at any price level.
+    """
+    def __init__(self, capacity, periods=None):
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        periods = set(int(p) for p in (periods or ()))
+        if any(p < 1 or p > self.capacity for p in periods):
+            raise ValueError(f"periods must be within 1..{self.capacity}")
+        self.periods = sorted(periods | {self.capacity})
+
+        self._buf = np.zeros(2 * self.capacity)
+        self._head = 0 # next write slot in [0, capacity)
+        self._count = 0
+        self._shift = 0.0
+        self._sums = {p: 0.0 for p in self.periods}
+        self._sumsqs = {p: 0.0 for p in self.periods}
+        self._since_resync = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def full(self):
+        return self._count == self.capacity
+
+    def append(self, value):
+        value = float(value)
+        cap = self.capacity
+        buf = self._buf
+        head = self._head
+        if self._count == 0:
+            self._shift = value
+
+        # Remove values leaving each tracked sub-window (read before overwrite)
+        shift = self._shift
+        end = head + cap
+        for p in self.periods:
+            if self._count >= p:
+                old = buf[end - p] - shift
+                self._sums[p] -= old
+                self._sumsqs[p] -= old * old
+
+        buf[head] = value
+        buf[head + cap] = value
+        self._head = head + 1 if head + 1 < cap else 0
+        if self._count < cap:
+            self._count += 1
+
+        dev = value - shift
+        dev_sq = dev * dev
+        for p in self.periods:
+            self._sums[p] += dev
+            self._sumsqs[p] += dev_sq
+
+        self._since_resync += 1
+        if self._since_resync >= cap:
+            self._resync()
+
+    def _resync(self):
+        """Recomputes running sums around the current mean (bounded float drift)."""
+        self._since_resync = 0
+        window = self.view()
+        self._shift = float(window.mean())
+        for p in self.periods:
+            dev = window[-p:] - self._shift
+            self._sums[p] = float(dev.sum())
+            self._sumsqs[p] = float((dev * dev).sum())
+
+    def view(self, n=None):
+        """Zero-copy read-only view of the last n values (default: whole window)."""
+        n = self._count if n is None else min(int(n), self._count)
+        end = self._head + self.capacity
+        v = self._buf[end - n:end]
+        v.flags.writeable = False
+        return v
+
+    def __getitem__(self, i):
+        """Logical indexing: 0 is the oldest value, -1 the newest."""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("RollingWindow index out of range")
+        return float(self._buf[self._head + self.capacity - self._count + i])
+
+    @property
+    def last(self):
+        return self[-1]
+
+    def _stats_period(self, period):
+        p = self.capacity if period is None else int(period)
+        if p not in self._sums:
+            raise ValueError(f"period {p} is not tracked (tracked: {self.periods})")
+        return p, min(p, self._count)
+
+    def sum(self, period=None):
+        p, n = self._stats_period(period)
+        return self._sums[p] + n * self._shift
+
+    def mean(self, period=None):
+        """Mean of the last `period` values (or all available if fewer)."""
+        p, n = self._stats_period(period)
+        if n == 0:
+            return float('nan')
+        return self._shift + self._sums[p] / n
+
+    def var(self, period=None, ddof=0):
+        p, n = self._stats_period(period)
+        if n - ddof <= 0:
+            return float('nan')
+        s = self._sums[p]
+        ss = self._sumsqs[p] - s * s / n
+        return max(ss, 0.0) / (n - ddof)
+
+    def std(self, period=None, ddof=0):
+        return self.var(period, ddof) ** 0.5
+
+    def roc(self, lag):
+        """Rate of change (%) of the newest value vs. the value `lag` steps earlier."""
+        prev = self[-1 - lag]
+        return (self[-1] - prev) / prev * 100
+
+def _rsi_from_averages(avg_gain, avg_loss):
+    if avg_loss == 0:
+        return 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+def wilder_rsi(prices, window=14):
+    """
+    Full recomputation of Wilder's RSI over the whole price history.
+    Reference for WilderRSI; returns None until `window` deltas are available.
+    """
+    deltas = np.diff(np.asarray(prices, dtype=float))
+    if len(deltas) < window:
+        return None
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    avg_gain = gains[:window].sum() / window
+    avg_loss = losses[:window].sum() / window
+    for g, l in zip(gains[window:], losses[window:]):
+        avg_gain = (avg_gain * (window - 1) + g) / window
+        avg_loss = (avg_loss * (window - 1) + l) / window
+    return _rsi_from_averages(avg_gain, avg_loss)
+
+class WilderRSI:
+    """
+    Incremental Wilder RSI: holds the smoothed average gain/loss and updates
+    in O(1) per price. Matches wilder_rsi() over the same price series.
+    """
+    def __init__(self, window=14):
+        self.window = int(window)
+        self.samples = 0 # prices seen
+        self.last_price = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.samples > self.window
+
+    def update(self, price):
+        """Feeds one price; returns the current RSI (None during warm-up)."""
+        price = float(price)
+        prev = self.last_price
+        self.last_price = price
+        self.samples += 1
+        if prev is None:
+            return None
+
+        delta = price - prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        w = self.window
+        n_deltas = self.samples - 1
+        if n_deltas < w:
+            # Seed phase: accumulate sums, averaged once the window is full
+            self.avg_gain += gain
+            self.avg_loss += loss
+            return None
+        if n_deltas == w:
+            self.avg_gain = (self.avg_gain + gain) / w
+            self.avg_loss = (self.avg_loss + loss) / w
+        else:
+            self.avg_gain = (self.avg_gain * (w - 1) + gain) / w
+            self.avg_loss = (self.avg_loss * (w - 1) + loss) / w
+        self.value = _rsi_from_averages(self.avg_gain, self.avg_loss)
+        return self.value
+
+class SuperTrend:
+    """
+    Incremental SuperTrend (ATR trailing bands), O(1) per bar.
+
+    ATR is the simple moving average of True Range (same as features.calculate_atr).
+    The final bands only ratchet in the trend's favour; the trend flips when the
+    close crosses the opposite band. Matches supertrend() bar for bar.
+    """
+    def __init__(self, period=10, multiplier=3.0):
+        self.period = int(period)
+        self.multiplier = float(multiplier)
+        self._tr = RollingWindow(self.period)
+        self.prev_close = None
+        self.upper = None
+        self.lower = None
+        self.bullish = True
+        self.value = None
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def update(self, high, low, close):
+        """Feeds one bar; returns the SuperTrend line (None during ATR warm-up)."""
+        high, low, close = float(high), float(low), float(close)
+        prev_close = self.prev_close
+        self.prev_close = close
+        if prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self._tr.append(tr)
+        if not self._tr.full:
+            return None
+
+        band = self.multiplier * self._tr.mean()
+        hl2 = (high + low) / 2
+        basic_upper = hl2 + band
+        basic_lower = hl2 - band
+        if self.upper is None:
+            upper, lower = basic_upper, basic_lower
+        else:
+            upper = basic_upper if (basic_upper < self.upper or prev_close > self.upper) else self.upper
+            lower = basic_lower if (basic_lower > self.lower or prev_close < self.lower) else self.lower
+        self.upper, self.lower = upper, lower
+
+        self.bullish = close >= lower if self.bullish else close > upper
+        self.value = lower if self.bullish else upper
+        return self.value
+
+def supertrend(high, low, close, period=10, multiplier=3.0):
+    """
+    Vectorized full-history SuperTrend for the precompute path.
+
+    Accepts 1-D arrays or 2-D (dates x tickers) arrays. The band recursion is a
+    loop over time only; every step is vectorized across tickers. Tickers that
+    start late (leading NaNs) warm up from their own first bar.
+
+    Returns:
+        (line, direction): float array (NaN during warm-up) and int8 array
+        (1 bullish, -1 bearish, 0 during warm-up).
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    squeeze = close.ndim == 1
+    if squeeze:
+        high, low, close = high[:, None], low[:, None], close[:, None]
+    n = close.shape[0]
+
+    prev_close = np.full_like(close, np.nan)
+    prev_close[1:] = close[:-1]
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.full_like(tr, np.nan)
+    if n >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(tr, period, axis=0)
+        atr[period - 1:] = windows.mean(axis=-1)
+    band = multiplier * atr
+    hl2 = (high + low) / 2
+    basic_upper = hl2 + band
+    basic_lower = hl2 - band
+
+    line = np.full_like(close, np.nan)
+    direction = np.zeros(close.shape, dtype=np.int8)
+    upper = np.full(close.shape[1], np.nan)
+    lower = np.full(close.shape[1], np.nan)
+    bullish = np.ones(close.shape[1], dtype=bool)
+    with np.errstate(invalid='ignore'):
+        for t in range(n):
+            bu, bl, c = basic_upper[t], basic_lower[t], close[t]
+            pc = prev_close[t]
+            fresh = np.isnan(upper)
+            upper = np.where(fresh | (bu < upper) | (pc > upper), bu, upper)
+            lower = np.where(fresh | (bl > lower) | (pc < lower), bl, lower)
+            bullish = np.where(fresh | bullish, c >= lower, c > upper)
+            valid = ~np.isnan(bu)
+            line[t] = np.where(valid, np.where(bullish, lower, upper), np.nan)
+            direction[t] = np.where(valid, np.where(bullish, 1, -1), 0)
+
+    if squeeze:
+        return line[:, 0], direction[:, 0]
+    return line, direction
+
+# --- Cross-ticker panels (run_batch path) -----------------------------------
+# Same state as the scalar classes above, one column per ticker, updated with
+# array ops. A NaN price (or False in `mask`) leaves that ticker's state
+# untouched, exactly like a ticker missing from run_tick's market_data.
+
+def _push_mask(values, mask):
+    return ~np.isnan(values) if mask is None else mask
+
+class RollingPanel:
+    """RollingWindow for n tickers at once: O(n) vector work per push, no per-ticker Python."""
+    def __init__(self, capacity, n, periods=None):
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        periods = set(int(p) for p in (periods or ()))
+        if any(p < 1 or p > self.capacity for p in periods):
+            raise ValueError(f"periods must be within 1..{self.capacity}")
+        self.periods = sorted(periods | {self.capacity})
+        self.n = int(n)
+
+        self._buf = np.zeros((self.capacity, self.n))
+        self._head = np.zeros(self.n, dtype=np.int64)
+        self.count = np.zeros(self.n, dtype=np.int64)
+        self._shift = np.zeros(self.n)
+        self._sums = {p: np.zeros(self.n) for p in self.periods}
+        self._sumsqs = {p: np.zeros(self.n) for p in self.periods}
+        self._since_resync = np.zeros(self.n, dtype=np.int64)
+        self._cols = np.arange(self.n)
+
+    def push(self, values, mask=None):
+        """Appends values[i] for every ticker where mask[i] (default: not NaN)."""
+        idx = np.flatnonzero(_push_mask(values, mask))
+        if len(idx):
+            self._push_idx(idx, values[idx])
+
+    def _push_idx(self, idx, v):
+        cap = self.capacity
+        head = self._head[idx]
+        count = self.count[idx]
+        first = count == 0
+        if first.any():
+            self._shift[idx[first]] = v[first]
+        shift = self._shift[idx]
+
+        for p in self.periods:
+            leaving = count >= p
+            if leaving.any():
+                old = np.where(leaving, self._buf[(head - p) % cap, idx] - shift, 0.0)
+                self._sums[p][idx] -= old
+                self._sumsqs[p][idx] -= old * old
+
+        self._buf[head, idx] = v
+        self._head[idx] = (head + 1) % cap
+        self.count[idx] = np.minimum(count + 1, cap)
+
+        dev = v - shift
+        dev_sq = dev * dev
+        for p in self.periods:
+            self._sums[p][idx] += dev
+            self._sumsqs[p][idx] += dev_sq
+
+        self._since_resync[idx] += 1
+        due = idx[self._since_resync[idx] >= cap]
+        if len(due):
+            self._resync(due)
+
+    def _resync(self, cols):
+        """Recomputes running sums around the window mean for `cols` (full windows)."""
+        self._since_resync[cols] = 0
+        rows = (self._head[cols] + np.arange(self.capacity)[:, None]) % self.capacity
+        window = self._buf[rows, cols] # oldest -> newest
+        shift = window.mean(axis=0)
+        self._shift[cols] = shift
+        for p in self.periods:
+            dev = window[-p:] - shift
+            self._sums[p][cols] = dev.sum(axis=0)
+            self._sumsqs[p][cols] = (dev * dev).sum(axis=0)
+
+    def _stats_period(self, period):
+        p = self.capacity if period is None else int(period)
+        if p not in self._sums:
+            raise ValueError(f"period {p} is not tracked (tracked: {self.periods})")
+        return p, np.minimum(p, self.count)
+
+    def mean(self, period=None):
+        p, n = self._stats_period(period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n > 0, self._shift + self._sums[p] / n, np.nan)
+
+    def var(self, period=None, ddof=0):
+        p, n = self._stats_period(period)
+        s = self._sums[p]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ss = np.maximum(self._sumsqs[p] - s * s / n, 0.0)
+            return np.where(n - ddof > 0, ss / (n - ddof), np.nan)
+
+    def std(self, period=None, ddof=0):
+        return np.sqrt(self.var(period, ddof))
+
+    def lagged(self, lag):
+        """Value `lag` steps before the newest one, per ticker (NaN if not available)."""
+        vals = self._buf[(self._head - 1 - lag) % self.capacity, self._cols]
+        return np.where(self.count > lag, vals, np.nan)
+
+    def last(self):
+        return self.lagged(0)
+
+    def roc(self, lag):
+        """Rate of change (%) of the newest value vs. `lag` steps earlier, per ticker."""
+        prev = self.lagged(lag)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.last() - prev) / prev * 100
+
+class WilderRSIPanel:
+    """WilderRSI for n tickers at once."""
+    def __init__(self, n, window=14):
+        self.window = int(window)
+        self.n = int(n)
+        self.samples = np.zeros(self.n, dtype=np.int64)
+        self.last_price = np.full(self.n, np.nan)
+        self.avg_gain = np.zeros(self.n)
+        self.avg_loss = np.zeros(self.n)
+        self.value = np.full(self.n, np.nan)
+
+    def update(self, prices, mask=None):
+        """Feeds one price per ticker; returns the RSI vector (NaN during warm-up)."""
+        idx = np.flatnonzero(_push_mask(prices, mask))
+        if not len(idx):
+            return self.value
+        p = prices[idx]
+        prev = self.last_price[idx]
+        self.last_price[idx] = p
+        self.samples[idx] += 1
+
+        w = self.window
+        has_prev = ~np.isnan(prev)
+        delta = np.where(has_prev, p - prev, 0.0)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        n_deltas = self.samples[idx] - 1
+        ag = self.avg_gain[idx]
+        al = self.avg_loss[idx]
+        seed = has_prev & (n_deltas < w)
+        at_w = n_deltas == w
+        smooth = n_deltas > w
+        ag = np.where(seed, ag + gain,
+                      np.where(at_w, (ag + gain) / w, np.where(smooth, (ag * (w - 1) + gain) / w, ag)))
+        al = np.where(seed, al + loss,
+                      np.where(at_w, (al + loss) / w, np.where(smooth, (al * (w - 1) + loss) / w, al)))
+        self.avg_gain[idx] = ag
+        self.avg_loss[idx] = al
+
+        ready = n_deltas >= w
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = np.where(al == 0, 100.0, 100.0 - 100.0 / (1.0 + ag / al))
+        self.value[idx] = np.where(ready, rsi, np.nan)
+        return self.value
+
+class SuperTrendPanel:
+    """SuperTrend for n tickers at once."""
+    def __init__(self, n, period=10, multiplier=3.0):
+        self.period = int(period)
+        self.multiplier = float(multiplier)
+        self.n = int(n)
+        self._tr = RollingPanel(self.period, self.n)
+        self.prev_close = np.full(self.n, np.nan)
+        self.upper = np.full(self.n, np.nan)
+        self.lower = np.full(self.n, np.nan)
+        self.bullish = np.ones(self.n, dtype=bool)
+        self.value = np.full(self.n, np.nan)
+
+    def update(self, high, low, close, mask=None):
+        """Feeds one bar per ticker; returns the SuperTrend line vector (NaN during warm-up)."""
+        idx = np.flatnonzero(_push_mask(close, mask))
+        if not len(idx):
+            return self.value
+        h, l, c = high[idx], low[idx], close[idx]
+        pc = self.prev_close[idx]
+        self.prev_close[idx] = c
+        with np.errstate(invalid='ignore'):
+            tr = np.where(np.isnan(pc), h - l,
+                          np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc))))
+        self._tr._push_idx(idx, tr)
+
+        ready = self._tr.count[idx] == self.period
+        idx, h, l, c, pc = idx[ready], h[ready], l[ready], c[ready], pc[ready]
+        if not len(idx):
+            return self.value
+        band = self.multiplier * self._tr.mean()[idx]
+        hl2 = (h + l) / 2
+        basic_upper = hl2 + band
+        basic_lower = hl2 - band
+        up = self.upper[idx]
+        lo = self.lower[idx]
+        fresh = np.isnan(up)
+        with np.errstate(invalid='ignore'):
+            up = np.where(fresh | (basic_upper < up) | (pc > up), basic_upper, up)
+            lo = np.where(fresh | (basic_lower > lo) | (pc < lo), basic_lower, lo)
+            bull = np.where(fresh | self.bullish[idx], c >= lo, c > up)
+        self.upper[idx] = up
+        self.lower[idx] = lo
+        self.bullish[idx] = bull
+        self.value[idx] = np.where(bull, lo, up)
+        return self.value
@@ -0,0 +1,163 @@
+"""
+Incremental add_all_features for live inference.
+
+LiveFeatures keeps one ticker's indicator state (rolling sums, EMA states,
+gap counters) and advances it one bar at a time, so the per-cycle cost does
+not depend on how much history was used to warm it up.
+"""
+import copy
+import math
+import numpy as np
+import pandas as pd
+from strategies.indicators import RollingWindow
+from strategies.features import FEATURE_COLUMNS
+
+class EMA:
+    """
+    .ewm(span, adjust=False).mean() one value at a time.
+    A missing value keeps the last average; the next observation then weighs
+    the stale average by (1 - alpha) ** gap, as pandas does (ignore_na=False).
+    value / gap resume a series whose last average and trailing missing count are known.
+    """
+    def __init__(self, span, value=math.nan, gap=0):
+        self.alpha = 2.0 / (span + 1)
+        self.value = float(value)
+        self._gap = int(gap)
+
+    def update(self, x):
+        if math.isnan(x):
+            if not math.isnan(self.value):
+                self._gap += 1
+            return self.value
+        if math.isnan(self.value):
+            self.value = x
+        else:
+            old = (1 - self.alpha) ** (self._gap + 1)
+            self.value = (old * self.value + self.alpha * x) / (old + self.alpha)
+        self._gap = 0
+        return self.value
+
+class _Rolling:
+    """
+    pandas .rolling(window) over a series with gaps: a RollingWindow plus a run
+    length, so a statistic is only defined once `window` consecutive values are in.
+    Missing values are stored as the previous value to keep the running sums finite.
+    """
+    def __init__(self, window, periods=None):
+        self.values = RollingWindow(window, periods=periods)
+        self.run = 0
+
+    def append(self, x):
+        if math.isnan(x):
+            self.run = 0
+            x = self.values.last if len(self.values) else 0.0
+        else:
+            self.run += 1
+        self.values.append(x)
+
+    def ready(self, period):
+        return self.run >= period
+
+class LiveFeatures:
+    """
+    One ticker's add_all_features state, advanced one bar at a time in O(1).
+
+    values() matches the latest row of add_all_features over the same bars:
+    - SMA_50 / SMA_200 / Bollinger: running sums of one 200-bar RollingWindow.
+    - RSI: 14-bar rolling means of gains and losses (features.calculate_rsi
+      uses simple averages, not Wilder smoothing), 0 where undefined.
+    - macd / macd_signal / macd_hist: EMA states (12, 26, 9).
+    - ATR: 14-bar rolling mean of True Range.
+
+    Args:
+        bb_period (int): Bollinger window tracked for bollinger() (<= 200).
+    """
+    def __init__(self, bb_period=20):
+        self.bb_period = int(bb_period)
+        self.src = _Rolling(200, periods=(50, self.bb_period))
+        self.gains = _Rolling(14)
+        self.losses = _Rolling(14)
+        self.tr = _Rolling(14)
+        self.ema_fast = EMA(12)
+        self.ema_slow = EMA(26)
+        self.ema_signal = EMA(9)
+        self.macd = math.nan
+        self.last_src = math.nan
+        self.last_close = math.nan
+        self.timestamp = None
+        self.bars = 0
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **kwargs):
+        """Warms up on a history frame with 'Adj Close', 'Close', 'High', 'Low' columns."""
+        feats = cls(**kwargs)
+        cols = df[['Adj Close', 'Close', 'High', 'Low']].to_numpy(dtype=float)
+        for ts, (src, close, high, low) in zip(df.index, cols.tolist()):
+            feats.update(src, close, high, low, timestamp=ts)
+        return feats
+
+    def update(self, adj_close, close, high, low, timestamp=None):
+        """Appends one bar and returns values()."""
+        src, close, high, low = (float(v) for v in (adj_close, close, high, low))
+        self.src.append(src)
+
+        delta = src - self.last_src
+        self.gains.append(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        self.losses.append(max(-delta, 0.0) if not math.isnan(delta) else math.nan)
+
+        # NaN-skipping max, like pd.concat([...], axis=1).max(axis=1)
+        ranges = [r for r in (high - low, abs(high - self.last_close), abs(low - self.last_close))
+                  if not math.isnan(r)]
+        self.tr.append(max(ranges) if ranges else math.nan)
+
+        self.macd = self.ema_fast.update(src) - self.ema_slow.update(src)
+        self.ema_signal.update(self.macd)
+
+        self.last_src, self.last_close = src, close
+        self.timestamp = timestamp
+        self.bars += 1
+        return self.values()
+
+    def peek(self, adj_close, close, high, low):
+        """values() as if this bar were appended, without committing it (e.g. an unfinished daily bar)."""
+        ahead = copy.deepcopy(self)
+        return ahead.update(adj_close, close, high, low)
+
+    def _sma(self, period):
+        return self.src.values.mean(period) if self.src.ready(period) else math.nan
+
+    def rsi(self):
+        if not self.gains.ready(14):
+            return 0.0
+        # Exact window sums, so a window without losses gives RS = inf (RSI 100), 0/0 gives 0
+        gain = float(self.gains.values.view().sum()) / 14
+        loss = float(self.losses.values.view().sum()) / 14
+        if loss == 0:
+            return 0.0 if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def bollinger(self, std_dev=2):
+        """(BB_Middle, BB_Upper, BB_Lower) as add_bollinger_bands(df, bb_period, std_dev)."""
+        if not self.src.ready(self.bb_period):
+            return math.nan, math.nan, math.nan
+        middle = self.src.values.mean(self.bb_period)
+        std = self.src.values.std(self.bb_period, ddof=1)
+        return middle, middle + std * std_dev, middle - std * std_dev
+
+    def values(self):
+        """Latest feature row as {column: value} in FEATURE_COLUMNS order."""
+        signal = self.ema_signal.value
+        return {
+            'SMA_50': self._sma(50),
+            'SMA_200': self._sma(200),
+            'RSI': self.rsi(),
+            'macd': self.macd,
+            'macd_signal': signal,
+            'macd_hist': self.macd - signal,
+            'ATR': self.tr.values.mean() if self.tr.ready(14) else math.nan,
+        }
+
+    def vector(self, columns=FEATURE_COLUMNS):
+        """Latest features as an array in `columns` order (e.g. a model's feature list)."""
+        row = self.values()
+        return np.array([row[c] for c in columns])
@@ -1,65 +1,52 @@
 from strategies.base_strategy import BaseStrategy
-import pandas as pd
+from strategies.indicators import WilderRSI, WilderRSIPanel, wilder_rsi
 import numpy as np
 
 class MeanReversionStrategy(BaseStrategy):
-    def __init__(self, name="MeanRev", balance=1000.0, tickers=None):
-        super().__init__(name, balance)
+    def __init__(self, name="MeanRev", balance=1000.0, tickers=None, **kwargs):
+        super().__init__(name, balance, **kwargs)
         self.tickers = tickers if tickers else []
-        self.history = {} # Store recent prices for RSI calc: {ticker: [prices]}
+        self.rsi = {} # Incremental RSI state: {ticker: WilderRSI}
 
     def calculate_rsi(self, prices, window=14):
-        if len(prices) < window + 1: return 50 # Default neutral
-        
-        deltas = np.diff(prices)
-        seed = deltas[:window+1]
-        up = seed[seed >= 0].sum()/window
-        down = -seed[seed < 0].sum()/window
-        rs = up/down
-        rsi = np.zeros_like(prices)
-        rsi[:window] = 100. - 100./(1. + rs)
-
-        for i in range(window, len(prices)):
-            delta = deltas[i-1]
-            if delta > 0:
-                upval = delta
-                downval = 0.
-            else:
-                upval = 0.
-                downval = -delta
-
-            up = (up*(window-1) + upval)/window
-            down = (down*(window-1) + downval)/window
-            rs = up/down
-            rsi[i] = 100. - 100./(1. + rs)
-            
-        return rsi[-1]
+        """Full recomputation over `prices` (reference for the per-ticker WilderRSI state)."""
+        rsi = wilder_rsi(prices, window)
+        return 50 if rsi is None else rsi # Default neutral
 
     def run_tick(self, market_data, timestamp):
         for ticker, price in market_data.items():
-            # Add to history
-            if ticker not in self.history: self.history[ticker] = []
-            self.history[ticker].append(price)
-            if len(self.history[ticker]) > 30: self.history[ticker].pop(0)
+            # Update RSI state (O(1) per tick)
+            if ticker not in self.rsi: self.rsi[ticker] = WilderRSI(14)
+            rsi = self.rsi[ticker].update(price)
             
             # Need enough data for RSI
-            if len(self.history[ticker]) < 15: continue
-            # Calculate RSI
-            rsi = self.calculate_rsi(history)
-            
-            # Context for AI
-            context = {"rsi": rsi, "strategy": "MeanReversion"}
-            
-            # Logic
-            if rsi < 30:
-                # Buy
-                # Only if we have cash
-                if self.broker.balance > price:
-                    # check if we already hold? (Simple logic: Buy more if really low?)
-                    # For now just buy if not full.
-                   self.broker.buy(ticker, price, timestamp, pct_portfolio=0.20, context=context)
-            
-            elif rsi > 70:
-                # Sell
-                self.broker.sell(ticker, price, timestamp, pct_portfolio=1.0, context=context)
-                self.logger.info(f"RSI Overbought ({rsi:.2f}) for {ticker}. SELLING.")
+            if rsi is None: continue
+            self.on_signal(ticker, price, rsi, timestamp)
+
+    def run_batch(self, tickers, prices, timestamp):
+        rsi_panel = self.batch_state(tickers, lambda n: WilderRSIPanel(n, 14))
+        quoted = ~np.isnan(prices)
+        rsi = rsi_panel.update(prices, quoted)
+        # Oversold -> buy candidate; overbought only matters where we hold
+        with np.errstate(invalid='ignore'):
+            act = quoted & ((rsi < 30) | ((rsi > 70) & self.held_mask()))
+        for i in np.flatnonzero(act):
+            self.on_signal(tickers[i], prices[i], rsi[i], timestamp)
+
+    def on_signal(self, ticker, price, rsi, timestamp):
+        # Context for AI
+        context = {"rsi": rsi, "strategy": "MeanReversion"}
+        
+        # Logic
+        if rsi < 30:
+            # Buy
+            # Only if we have cash
+            if self.broker.balance > price:
+                # check if we already hold? (Simple logic: Buy more if really low?)
+                # For now just buy if not full.
+               self.broker.buy(ticker, price, timestamp, pct_portfolio=0.20, context=context)
+        
+        elif rsi > 70:
+            # Sell
+            self.broker.sell(ticker, price, timestamp, pct_portfolio=1.0, context=context)
+            self.logger.info(f"RSI Overbought ({rsi:.2f}) for {ticker}. SELLING.")
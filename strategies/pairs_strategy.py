@@ -0,0 +1,236 @@
+import numpy as np
+from strategies.base_strategy import BaseStrategy
+from strategies.indicators import RollingPanel
+
+class KalmanHedgeRatio:
+    """
+    Online hedge ratio per pair for log(p1) = alpha + beta * log(p2).
+
+    Each pair holds a 2-state [alpha, beta] Kalman filter (random-walk
+    coefficients) and its 2x2 covariance as flat arrays, so one update is O(1)
+    per pair and vectorized across all pairs. With `forgetting` set, the
+    predict step becomes exponentially-weighted recursive least squares instead.
+    The filter starts at the 1:1 log ratio (alpha = first spread, beta = 1)
+    with prior variance `init_var` on both coefficients.
+
+    Args:
+        n (int): Number of pairs.
+        delta (float): Coefficient drift per step (Kalman process noise = delta / (1 - delta)).
+        obs_var (float): Observation noise variance of log(p1).
+        forgetting (float): RLS forgetting factor in (0, 1]; None = Kalman.
+        init_var (float): Prior variance of alpha and beta at the first observation.
+    """
+    def __init__(self, n, delta=1e-4, obs_var=1e-3, forgetting=None, init_var=1.0):
+        if forgetting is not None and not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.n = int(n)
+        self.q = delta / (1 - delta)
+        self.obs_var = float(obs_var)
+        self.forgetting = forgetting
+        self.init_var = float(init_var)
+        self.alpha = np.zeros(self.n)
+        self.beta = np.ones(self.n)
+        # Symmetric covariance [[p00, p01], [p01, p11]]
+        self.p00 = np.zeros(self.n)
+        self.p01 = np.zeros(self.n)
+        self.p11 = np.zeros(self.n)
+        self.initialized = np.zeros(self.n, dtype=bool)
+        self.error = np.full(self.n, np.nan)     # last prediction error (prior residual)
+        self.error_var = np.full(self.n, np.nan) # its predicted variance
+
+    def predict(self, x):
+        """Prior fitted log(p1) for log(p2) = x (before this bar's update)."""
+        return self.alpha + self.beta * x
+
+    def update(self, x, y, mask=None):
+        """
+        Feeds one (x = log p2, y = log p1) observation per pair where `mask`.
+        Returns the prior residual y - (alpha + beta * x) per pair (NaN where not updated).
+        """
+        if mask is None:
+            mask = np.isfinite(x) & np.isfinite(y)
+        idx = np.flatnonzero(mask)
+        self.error = np.full(self.n, np.nan)
+        if not len(idx):
+            return self.error
+        x, y = x[idx], y[idx]
+
+        new = ~self.initialized[idx]
+        if new.any():
+            first = idx[new]
+            self.alpha[first] = y[new] - x[new]
+            self.beta[first] = 1.0
+            self.p00[first] = self.init_var
+            self.p01[first] = 0.0
+            self.p11[first] = self.init_var
+            self.initialized[first] = True
+
+        # Predict
+        p00, p01, p11 = self.p00[idx], self.p01[idx], self.p11[idx]
+        if self.forgetting is None:
+            p00 = p00 + self.q
+            p11 = p11 + self.q
+        else:
+            p00, p01, p11 = p00 / self.forgetting, p01 / self.forgetting, p11 / self.forgetting
+
+        # Update with H = [1, x]
+        e = y - (self.alpha[idx] + self.beta[idx] * x)
+        ph0 = p00 + x * p01 # (P H')_0
+        ph1 = p01 + x * p11 # (P H')_1
+        s = ph0 + x * ph1 + self.obs_var
+        k0, k1 = ph0 / s, ph1 / s
+        self.alpha[idx] += k0 * e
+        self.beta[idx] += k1 * e
+        self.p00[idx] = p00 - k0 * ph0
+        self.p01[idx] = p01 - k0 * ph1
+        self.p11[idx] = p11 - k1 * ph1
+
+        self.error[idx] = e
+        self.error_var[idx] = s
+        return self.error
+
+class PairSpreadTracker:
+    """
+    Online rolling z-score of the log price spread for many pairs at once.
+
+    Each update pushes one spread per pair into a RollingPanel, so the cost per
+    tick is a handful of vector ops regardless of the window length.
+    z = (spread - rolling mean) / rolling std (ddof=1, like pandas .rolling().std()),
+    with the current spread included in the window.
+
+    hedge=None uses the 1:1 log ratio log(p1) - log(p2). hedge="kalman" / "rls"
+    uses log(p1) - (alpha + beta * log(p2)) with alpha/beta from the previous bar
+    of a KalmanHedgeRatio (no look-ahead); hedge_kwargs go to its constructor.
+    """
+    def __init__(self, pairs, window=20, hedge=None, **hedge_kwargs):
+        # Accept get_best_pairs() tuples: (t1, t2, score) / (leader, follower, lag, score)
+        self.pairs = [(p[0], p[1]) for p in pairs]
+        if not self.pairs:
+            raise ValueError("PairSpreadTracker needs at least one pair")
+        self.tickers = list(dict.fromkeys(t for pair in self.pairs for t in pair))
+        self.index = {t: i for i, t in enumerate(self.tickers)}
+        self.leg1 = np.array([self.index[t1] for t1, _ in self.pairs])
+        self.leg2 = np.array([self.index[t2] for _, t2 in self.pairs])
+        self.window = int(window)
+
+        if hedge not in (None, "kalman", "rls"):
+            raise ValueError(f"Unknown hedge '{hedge}' (use None, 'kalman' or 'rls')")
+        if hedge == "rls":
+            hedge_kwargs.setdefault("forgetting", 0.99)
+        self.hedge = KalmanHedgeRatio(len(self.pairs), **hedge_kwargs) if hedge else None
+
+        self._stats = RollingPanel(self.window, len(self.pairs))
+        self.spread = np.full(len(self.pairs), np.nan)
+        self.zscore = np.full(len(self.pairs), np.nan)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def update(self, prices):
+        """
+        Args:
+            prices (np.ndarray): Prices aligned with self.tickers (NaN = no quote).
+        Returns:
+            np.ndarray: z-score per pair (NaN while warming up or when a leg is missing).
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            log_p = np.log(prices)
+        if self.hedge is None:
+            spread = log_p[self.leg1] - log_p[self.leg2]
+        else:
+            spread = self.hedge.update(log_p[self.leg2], log_p[self.leg1])
+        quoted = np.isfinite(spread)
+        self._stats.push(spread, quoted)
+
+        std = self._stats.std(ddof=1)
+        ready = quoted & (self._stats.count >= self.window) & (std > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (spread - self._stats.mean()) / std
+        self.spread = np.where(quoted, spread, self.spread)
+        self.zscore = np.where(ready, z, np.nan)
+        return self.zscore
+
+    @property
+    def beta(self):
+        """Current hedge ratio per pair (1.0 without a hedge estimator)."""
+        return self.hedge.beta if self.hedge is not None else np.ones(len(self.pairs))
+
+    def price_vector(self, market_data):
+        """{ticker: price} -> vector aligned with self.tickers."""
+        return np.array([market_data.get(t, np.nan) for t in self.tickers], dtype=float)
+
+    def update_prices(self, market_data):
+        return self.update(self.price_vector(market_data))
+
+    def held_mask(self, broker):
+        """Per tracked ticker: True where the broker holds a position (O(held))."""
+        held = np.zeros(len(self.tickers), dtype=bool)
+        for ticker in broker.positions:
+            i = self.index.get(ticker)
+            if i is not None and broker.get_position_amt(ticker) > 0:
+                held[i] = True
+        return held
+
+class PairsStrategy(BaseStrategy):
+    """
+    Relative-value switch over many pairs (spot only, no shorting):
+    - z > entry_z  : leg1 rich -> sell leg1, hold leg2
+    - z < -entry_z : leg1 cheap -> sell leg2, hold leg1
+    - |z| < exit_z : reverted -> exit both legs to cash
+    Legs shared by several pairs are one position in the broker.
+    hedge="kalman" / "rls" measures the spread against an online hedge ratio
+    instead of the 1:1 ratio (position sizing stays per leg).
+    """
+    def __init__(self, name="Pairs", balance=1000.0, tickers=None, pairs=None, window=20,
+                 entry_z=1.5, exit_z=0.5, allocation=0.9, hedge=None, **kwargs):
+        super().__init__(name, balance, **kwargs)
+        if pairs is None:
+            # Without explicit pairs, consecutive tickers form the pairs (t0/t1, t2/t3, ...)
+            tickers = tickers if tickers else []
+            pairs = list(zip(tickers[::2], tickers[1::2]))
+        self.tracker = PairSpreadTracker(pairs, window, hedge=hedge)
+        self.tickers = list(self.tracker.tickers)
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.pct_per_pair = allocation / len(self.tracker)
+
+    def run_tick(self, market_data, timestamp):
+        self.on_prices(self.tracker.price_vector(market_data), timestamp)
+
+    def run_batch(self, tickers, prices, timestamp):
+        # Engine universe column for each tracked ticker (-1 = not in the universe)
+        cols = self.batch_state(tickers, lambda n: np.array(
+            [self._batch_index.get(t, -1) for t in self.tracker.tickers]))
+        self.on_prices(np.where(cols >= 0, prices[cols], np.nan), timestamp)
+
+    def on_prices(self, prices, timestamp):
+        z = self.tracker.update(prices)
+        held = self.tracker.held_mask(self.broker)
+        leg1, leg2 = self.tracker.leg1, self.tracker.leg2
+        h1, h2 = held[leg1], held[leg2]
+        with np.errstate(invalid='ignore'):
+            rich = z > self.entry_z
+            cheap = z < -self.entry_z
+            reverted = np.abs(z) < self.exit_z
+        # Only pairs whose positions would change reach Python
+        act = (rich & (h1 | ~h2)) | (cheap & (h2 | ~h1)) | (reverted & (h1 | h2))
+        for k in np.flatnonzero(act):
+            self.trade_pair(k, prices[leg1[k]], prices[leg2[k]], z[k], timestamp)
+
+    def trade_pair(self, k, p1, p2, z, timestamp):
+        t1, t2 = self.tracker.pairs[k]
+        context = {"zscore": z, "beta": self.tracker.beta[k], "pair": f"{t1}/{t2}", "strategy": "Pairs"}
+        q1 = self.broker.get_position_amt(t1)
+        q2 = self.broker.get_position_amt(t2)
+        if z > self.entry_z:
+            # T1 is Expensive (Relative to T2): Sell T1, Buy T2.
+            if q1 > 0: self.broker.sell(t1, p1, timestamp, context=context)
+            if q2 == 0: self.broker.buy(t2, p2, timestamp, pct_portfolio=self.pct_per_pair, context=context)
+        elif z < -self.entry_z:
+            # T1 is Cheap: Sell T2, Buy T1.
+            if q2 > 0: self.broker.sell(t2, p2, timestamp, context=context)
+            if q1 == 0: self.broker.buy(t1, p1, timestamp, pct_portfolio=self.pct_per_pair, context=context)
+        else:
+            # Reverted to Mean -> exit to cash to lock profit.
+            if q1 > 0: self.broker.sell(t1, p1, timestamp, context=context)
+            if q2 > 0: self.broker.sell(t2, p2, timestamp, context=context)
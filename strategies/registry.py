@@ -0,0 +1,63 @@
+"""
+Strategy registry with lazy module loading.
+
+Strategies are looked up by name and their module is only imported on first
+use, so entrypoints (run_cloud.py, simulation_manager.py, backtest_2025.py)
+don't pay for strategy modules - and their dependencies - they never run.
+"""
+import importlib
+
+# name -> (module path, class name)
+# Keys are the default strategy names used across the runners; class names
+# are accepted as aliases.
+STRATEGY_REGISTRY = {
+    "GridBot": ("strategies.grid_strategy", "GridStrategy"),
+    "MeanRev": ("strategies.mean_reversion_strategy", "MeanReversionStrategy"),
+    "TrendHunter": ("strategies.trend_strategy", "TrendStrategy"),
+    "SmartDCA": ("strategies.dca_strategy", "DCAStrategy"),
+    "ChipHunter": ("strategies.chip_strategy", "ChipMemoryStrategy"),
+    "BUM_Trend": ("strategies.advanced_strategies", "BumTrendStrategy"),
+    "MATR_Dip": ("strategies.advanced_strategies", "MatrDipStrategy"),
+    "RUA_Mom": ("strategies.advanced_strategies", "GuaMomentumStrategy"),
+    "MGB_Band": ("strategies.advanced_strategies", "MgbBandStrategy"),
+    "Pairs": ("strategies.pairs_strategy", "PairsStrategy"),
+}
+
+_class_cache = {}
+
+def register_strategy(name, module_path, class_name):
+    """Adds (or replaces) a strategy entry without importing it."""
+    STRATEGY_REGISTRY[name] = (module_path, class_name)
+    _class_cache.pop(name, None)
+
+def available_strategies():
+    return list(STRATEGY_REGISTRY)
+
+def _resolve_key(name):
+    if name in STRATEGY_REGISTRY:
+        return name
+    for key, (_, class_name) in STRATEGY_REGISTRY.items():
+        if class_name == name:
+            return key
+    raise KeyError(f"Unknown strategy '{name}'. Available: {', '.join(STRATEGY_REGISTRY)}")
+
+def get_strategy_class(name):
+    """Returns the strategy class, importing its module on first access."""
+    key = _resolve_key(name)
+    if key not in _class_cache:
+        module_path, class_name = STRATEGY_REGISTRY[key]
+        module = importlib.import_module(module_path)
+        _class_cache[key] = getattr(module, class_name)
+    return _class_cache[key]
+
+def create_strategy(key, name=None, **kwargs):
+    """
+    Instantiates a registered strategy.
+
+    Args:
+        key (str): Registry name (e.g. "TrendHunter") or class name (e.g. "TrendStrategy").
+        name (str): Instance name (wallet/document id). Defaults to the registry key.
+        **kwargs: Passed to the strategy constructor (balance, tickers, broker_cls, ...).
+    """
+    cls = get_strategy_class(key)
+    return cls(name=name or _resolve_key(key), **kwargs)
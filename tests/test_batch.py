@@ -0,0 +1,22 @@
+import numpy as np
+from data.synthetic import generate_panel
+from strategies.registry import create_strategy
+
+def _trades(key, mode, panel):
+    tickers = list(panel.columns)
+    s = create_strategy(key, name=f"test_batch_{key}", balance=10000.0, tickers=tickers)
+    for ts, row in zip(panel.index, panel.to_numpy()):
+        if mode == "tick":
+            s.run_tick({t: float(p) for t, p in zip(tickers, row) if p == p}, ts)
+        else:
+            s.run_batch(tickers, row, ts)
+    return [(t['date'], t['action'], t['ticker'], float(t['price']), float(t['amount'])) for t in s.broker.trade_log]
+
+def test_run_batch_matches_run_tick():
+    panel = generate_panel(12, 2, seed=5)['Close'].copy()
+    panel.iloc[:30, 3] = np.nan # late listing
+    panel.iloc[100:105, 7] = np.nan # gap
+    for key in ("TrendHunter", "MeanRev", "BUM_Trend", "MATR_Dip", "RUA_Mom", "MGB_Band", "GridBot", "Pairs"):
+        tick = _trades(key, "tick", panel)
+        assert tick, key
+        assert _trades(key, "batch", panel) == tick, key
@@ -0,0 +1,36 @@
+import numpy as np
+from execution.paper_broker import PaperBroker
+
+def test_submit_orders_matches_sequential_calls():
+    rng = np.random.default_rng(1)
+    tickers = [f"T{i}" for i in range(12)]
+    prices = rng.uniform(5, 200, 12)
+    seq, batch = PaperBroker(start_balance=3000.0), PaperBroker(start_balance=3000.0)
+    for t, p in zip(tickers[:6], prices[:6]):
+        seq.buy(t, p, "d0", pct_portfolio=0.1)
+        batch.buy(t, p, "d0", pct_portfolio=0.1)
+
+    # Sells of held names and buys that run out of cash, mixed
+    order = rng.permutation(12)
+    sides = np.where([seq.get_position_amt(tickers[i]) > 0 for i in order], -1, 1)
+    sizes = np.where(sides < 0, 0.5, 0.35)
+    for k, i in enumerate(order):
+        if sides[k] > 0: seq.buy(tickers[i], prices[i], "d1", pct_portfolio=sizes[k])
+        else: seq.sell(tickers[i], prices[i], "d1", pct_portfolio=sizes[k])
+    filled = batch.submit_orders([tickers[i] for i in order], sides, sizes, prices[order], "d1")
+
+    assert (filled > 0).sum() == len(seq.trade_log) - 6
+    assert batch.balance == seq.balance
+    assert [dict(t) for t in batch.trade_log] == [dict(t) for t in seq.trade_log]
+    assert batch.positions_state() == seq.positions_state()
+
+def test_rebalance_hits_target_weights():
+    broker = PaperBroker(start_balance=100000.0)
+    prices = {f"T{i}": 10.0 + i for i in range(100)}
+    broker.rebalance({t: 0.009 for t in prices}, prices, "d0")
+    equity = broker.get_portfolio_value(prices)
+    weights = [broker.get_position_amt(t) * p / equity for t, p in prices.items()]
+    assert len(broker.trade_log) == 100 and max(abs(w - 0.009) for w in weights) < 0.001
+
+    broker.rebalance({"T0": 0.0, "T1": 0.02}, prices, "d1")
+    assert broker.get_position_amt("T0") == 0 and broker.trade_log[-1]['ticker'] == "T1"
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+from data.feature_store import FeatureStore
+from data.synthetic import generate_panel
+from strategies.features import add_all_features
+
+def test_store_extends_and_invalidates(tmp_path):
+    panel = generate_panel(3, 3, seed=8)
+    frames = {t: panel.xs(t, axis=1, level=1).copy() for t in panel['Close'].columns}
+    gappy = next(iter(frames))
+    frames[gappy].iloc[500:503] = np.nan
+
+    store = FeatureStore(str(tmp_path))
+    store.add_all_features_many({t: df.iloc[:480] for t, df in frames.items()})
+    extended = store.add_all_features_many(frames)
+    assert store.stats == {"hit": 0, "extend": 3, "miss": 3}
+    for t, df in frames.items():
+        pd.testing.assert_frame_equal(extended[t], add_all_features(df), rtol=1e-9)
+
+    # Fresh process: shorter range is a pure slice of the cache
+    again = FeatureStore(str(tmp_path))
+    out = again.add_all_features(gappy, frames[gappy].iloc[:300])
+    pd.testing.assert_frame_equal(out, add_all_features(frames[gappy].iloc[:300]), rtol=1e-9)
+    assert again.stats["hit"] == 1
+
+    # Re-adjusted history or new definitions are recomputed
+    changed = frames[gappy].copy()
+    changed.iloc[10, changed.columns.get_loc('Adj Close')] *= 1.01
+    again.add_all_features(gappy, changed)
+    FeatureStore(str(tmp_path), version="other").add_all_features(gappy, frames[gappy])
+    assert again.stats["miss"] == 1
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from data.synthetic import generate_panel
+from strategies.features import (calculate_sma, calculate_rsi, calculate_macd, calculate_atr,
+                                 add_all_features, add_all_features_many, add_bollinger_bands,
+                                 panel_features)
+
+def _legacy_features(df):
+    df = df.copy()
+    src = df['Adj Close']
+    df['SMA_50'] = calculate_sma(src, 50)
+    df['SMA_200'] = calculate_sma(src, 200)
+    df['RSI'] = calculate_rsi(src)
+    df = pd.concat([df, calculate_macd(src)], axis=1)
+    df['ATR'] = calculate_atr(df)
+    return df
+
+def _frames():
+    panel = generate_panel(6, 2, seed=4)
+    frames = {t: panel.xs(t, axis=1, level=1).copy() for t in panel['Close'].columns}
+    gappy = frames[panel['Close'].columns[0]]
+    gappy.iloc[250:256] = np.nan
+    gappy.iloc[320:340, gappy.columns.get_loc('Adj Close')] = 50.0 # flat: RSI 0/0
+    return panel, frames
+
+def test_fused_features_match_pandas_formulas():
+    panel, frames = _frames()
+    many = add_all_features_many(frames)
+    for ticker, df in frames.items():
+        expected = _legacy_features(df)
+        pd.testing.assert_frame_equal(add_all_features(df), expected, rtol=1e-9)
+        pd.testing.assert_frame_equal(many[ticker], expected, rtol=1e-9)
+
+    ticker = panel['Close'].columns[1]
+    expected = _legacy_features(panel.xs(ticker, axis=1, level=1))
+    feats = panel_features(panel)
+    for col in ['SMA_200', 'RSI', 'macd_hist', 'ATR']:
+        assert np.allclose(feats[col][ticker], expected[col], equal_nan=True)
+
+def test_bollinger_bands_match_pandas():
+    _, frames = _frames()
+    df = next(iter(frames.values())).iloc[:300]
+    src = df['Adj Close']
+    bands = add_bollinger_bands(df)
+    assert list(bands.columns) == list(df.columns) + ['BB_Middle', 'BB_Upper', 'BB_Lower']
+    std = src.rolling(20).std()
+    assert np.allclose(bands['BB_Upper'], src.rolling(20).mean() + 2 * std, equal_nan=True)
+    assert np.allclose(bands['BB_Lower'], src.rolling(20).mean() - 2 * std, equal_nan=True)
+
+def test_live_features_match_latest_rows():
+    from strategies.features import FEATURE_COLUMNS
+    from strategies.live_features import LiveFeatures
+
+    _, frames = _frames()
+    df = next(iter(frames.values()))
+    expected = add_all_features(df)[FEATURE_COLUMNS].to_numpy()
+
+    live = LiveFeatures.from_frame(df.iloc[:400])
+    rows = [live.peek(*df[['Adj Close', 'Close', 'High', 'Low']].iloc[400])]
+    for _, bar in df.iloc[400:].iterrows():
+        rows.append(live.update(bar['Adj Close'], bar['Close'], bar['High'], bar['Low']))
+    got = np.array([[r[c] for c in FEATURE_COLUMNS] for r in rows])
+    assert np.allclose(got[0], expected[400], equal_nan=True)
+    assert np.allclose(got[1:], expected[400:], equal_nan=True)
+
+    full = LiveFeatures.from_frame(df.iloc[:300])
+    assert np.allclose(full.vector(), expected[299], equal_nan=True)
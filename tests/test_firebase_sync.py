@@ -0,0 +1,39 @@
+from execution.firebase_broker import FirebaseBroker
+from execution.state_backend import MemoryBackend, SQLiteBackend
+
+def test_save_state_writes_unsynced_trades_in_one_batch():
+    backend = MemoryBackend()
+    broker = FirebaseBroker(strategy_name="Bot", backend=backend)
+    broker.buy("A", 10.0, "2024-01-01 10:00:00", pct_portfolio=0.2)
+    broker.buy("B", 10.0, "2024-01-01 10:00:00", pct_portfolio=0.2)
+    backend.reset_stats()
+    broker.save_state()
+    broker.save_state() # unchanged: no write
+    broker.sell("A", 11.0, "2024-01-02 10:00:00")
+    broker.save_state()
+
+    trades = [p for p in backend.docs if "/trades/" in p]
+    assert backend.stats == {"round_trips": 2, "reads": 0, "writes": 5}
+    assert len(trades) == 3 and backend.docs["trader_strategies/Bot"]["synced_trades"] == 3
+    assert backend.docs["trader_strategies/Bot/trades/2024-01-02T10-00-00_A_SELL_000003"]["seq"] == 3
+
+def test_restarted_broker_resumes_watermark(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cloud.db"))
+    broker = FirebaseBroker(strategy_name="Bot", backend=backend)
+    broker.buy("A", 10.0, "2024-01-01", pct_portfolio=0.2)
+    broker.save_state()
+
+    restarted = FirebaseBroker(strategy_name="Bot", backend=backend)
+    assert restarted.balance == broker.balance and restarted.positions_state() == broker.positions_state()
+    restarted.save_state() # nothing new
+    restarted.sell("A", 12.0, "2024-01-02")
+    restarted.save_state()
+    assert [d["seq"] for _, d in backend.stream("trader_strategies/Bot/trades")] == [1, 2]
+    backend.close()
+
+def test_batched_cloud_cycle_makes_fewer_round_trips():
+    from benchmarks.cloud_cycle import run_cycles
+    per_write = run_cycles("per_write", cycles=2, latency=0.0)
+    batched = run_cycles("batched", cycles=2, latency=0.0)
+    assert sum(s["round_trips"] for s in batched) < sum(s["round_trips"] for s in per_write)
+    assert sum(s["writes"] for s in batched) < sum(s["writes"] for s in per_write)
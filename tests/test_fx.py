@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+from backtest_engine import BacktestEngine
+from data.fx import FXRates, currency_of
+from strategies.dca_strategy import DCAStrategy
+
+def test_fx_alignment_and_currency_codes():
+    quotes = pd.DataFrame({"TRY": [30.0, np.nan, 32.0]}, index=pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-05"]))
+    fx = FXRates(quotes).aligned(pd.date_range("2024-01-01", "2024-01-06"))
+    assert fx.factor("TRY", "USD").tolist() == [1 / 30, 1 / 30, 1 / 30, 1 / 30, 1 / 32, 1 / 32]
+    assert fx.rate("USD", "TL", 0) == 30.0 and fx.rate("TRY", "TRY") == 1.0
+    assert [currency_of(t) for t in ["THYAO.IS", "BTC-USD", "BRK-B", "TRY=X", "NVDA"]] == ["TRY", "USD", "USD", "TRY", "USD"]
+
+def test_backtest_reports_in_another_currency():
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    prices = pd.DataFrame({"A.IS": np.linspace(100, 130, 60)}, index=dates)
+    fx = FXRates(pd.DataFrame({"TRY": np.linspace(30, 36, 60)}, index=dates))
+    strat = DCAStrategy(name="FX", balance=1000.0, tickers=["A.IS"], load_state=False, silent=True)
+    res = BacktestEngine("2024-01-01", "2024-12-31", [strat], preloaded_data=prices, fx=fx, report_currency="USD").run()["FX"]
+    assert res["currency"] == "TRY" and res["report_currency"] == "USD"
+    assert np.isclose(res["report_equity"], res["equity"] / 36)
+    assert np.isclose(res["report_roi"], (res["equity"] / 36 / (1000 / 30) - 1) * 100)
+    assert np.isclose(res["history"][-1]["report_equity"], res["history"][-1]["equity"] / 36)
+    strat.broker.currency = "TRY"
+    assert np.isclose(strat.broker.get_portfolio_value({"A.IS": 130.0}, "USD", fx, at=0),
+                      strat.broker.get_portfolio_value({"A.IS": 130.0}) / 30)
+
+def test_stale_cache_is_extended_for_live_callers(tmp_path, monkeypatch):
+    import pickle, sys, types
+    cached = pd.Series([30.0, 31.0], index=pd.to_datetime(["2024-03-01", "2024-03-04"]))
+    with open(tmp_path / "TRY.pkl", "wb") as f:
+        pickle.dump(cached, f)
+    calls = []
+    def download(symbol, start, end, **kwargs):
+        calls.append(symbol)
+        return pd.DataFrame({"Close": [32.0]}, index=pd.to_datetime(["2024-03-08"]))
+    monkeypatch.setitem(sys.modules, "yfinance", types.SimpleNamespace(download=download))
+
+    end = pd.Timestamp("2024-03-08")
+    fx = FXRates.load(["TRY"], "2024-03-01", end, cache_dir=str(tmp_path)) # 4 days old: within the default
+    assert not calls and fx.rate("USD", "TRY") == 31.0 and fx.as_of("TRY") == pd.Timestamp("2024-03-04")
+    fx = FXRates.load(["TRY"], "2024-03-01", end, cache_dir=str(tmp_path), max_stale_days=0)
+    assert calls == ["TRY=X"] and fx.rate("USD", "TRY") == 32.0
+    assert fx.aligned(pd.date_range("2024-03-01", "2024-03-10")).as_of("TRY") == end
+    assert fx.as_of("USD") is None
@@ -0,0 +1,43 @@
+from strategies.grid_strategy import grid_levels
+
+def test_grid_levels_match_legacy_construction():
+    center, grids, range_pct = 123.45, 20, 0.10
+    lower = [center * (1 - (i * (range_pct*2)/grids)) for i in range(1, (grids//2)+1)]
+    upper = [center * (1 + (i * (range_pct*2)/grids)) for i in range(1, (grids//2)+1)]
+    assert grid_levels(center, grids, range_pct) == sorted(lower + [center] + upper)
+
+def test_grid_strategy_trades_levels_both_ways_through_resting_orders():
+    from strategies.grid_strategy import GridStrategy
+    strat = GridStrategy(name="GridTest", balance=10000.0, tickers=["X"], load_state=False, silent=True,
+                         stop_loss_pct=None, trailing_stop_pct=None)
+    for i, price in enumerate([100.0, 97.5, 101.5, 98.5]): # grid: 1% steps around 100, 10 units per level
+        strat.run_tick({"X": price}, f"d{i}")
+
+    trades = [(t['date'], t['action'], round(t['price'], 6)) for t in strat.broker.trade_log]
+    # 99/98 bought on the way down, sold back on the way up (100/101 rejected: no inventory left),
+    # then 101/100/99 bought again on the next dip
+    assert trades == [("d1", "BUY", 99.0), ("d1", "BUY", 98.0),
+                      ("d2", "SELL", 98.0), ("d2", "SELL", 99.0),
+                      ("d3", "BUY", 101.0), ("d3", "BUY", 100.0), ("d3", "BUY", 99.0)]
+    assert strat.broker.get_position_amt("X") == 30
+    assert len(strat.broker.orders) == 21 # 98.5 is between levels: every level rests an order
+
+def test_grid_bot_fill_sequence_across_recenter():
+    import pandas as pd
+    from main_grid_bot import simulate_grid
+    # Grid of 1% steps around 100, 50 units of inventory, 2 units per level
+    bars = pd.DataFrame({
+        "Open":      [100.0, 98.2, 99.2, 111.0],
+        "High":      [100.5, 99.5, 111.5, 111.2],
+        "Low":       [97.5, 98.1, 99.0, 109.5],
+        "Adj Close": [98.2, 99.2, 111.0, 110.0], # bar 2 closes > 10% above center: re-center
+    }, index=pd.date_range("2024-01-01", periods=4))
+    broker = simulate_grid(bars, "X", grids=20, range_pct=0.10)
+
+    trades = [(t['date'].day, t['action'], round(t['price'], 2), t['amount']) for t in broker.trade_log]
+    assert trades == [
+        (1, "BUY", 100.0, 50), (1, "BUY", 99.0, 2), (1, "BUY", 98.0, 2), # inventory, then the dip
+        (2, "SELL", 99.0, 2),   # 99 re-armed as a sell after bar 1, 98 stays a buy below 98.2
+        # bar 3 re-centers on 111 and does not trade, though its range spans 100..110
+        (4, "BUY", 109.89, 2),  # first level of the new grid
+    ]
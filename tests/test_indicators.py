@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from strategies.indicators import RollingWindow, SuperTrend, WilderRSI, supertrend, wilder_rsi
+from data.synthetic import generate_panel
+
+def test_rolling_window_matches_numpy():
+    rng = np.random.default_rng(0)
+    prices = 50_000 + np.cumsum(rng.normal(0, 5, 1000))
+    win = RollingWindow(30, periods=(10, 20))
+    for i, p in enumerate(prices):
+        win.append(p)
+        hist = prices[max(0, i - 29):i + 1]
+        assert np.array_equal(win.view(), hist)
+        assert win[-1] == p and win[0] == hist[0]
+        for n in (10, 20, 30):
+            assert win.mean(n) == pytest.approx(np.mean(hist[-n:]), rel=1e-12)
+            assert win.std(n) == pytest.approx(np.std(hist[-n:]), rel=1e-6, abs=1e-9)
+        if len(win) >= 5:
+            assert win.roc(4) == pytest.approx((p - hist[-5]) / hist[-5] * 100)
+
+def test_rolling_window_rejects_untracked_period():
+    win = RollingWindow(20)
+    with pytest.raises(ValueError):
+        win.mean(10)
+    with pytest.raises(ValueError):
+        RollingWindow(10, periods=(20,))
+
+def test_wilder_rsi_incremental_matches_full_recompute():
+    rng = np.random.default_rng(1)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 400)))
+    prices[50:60] = prices[49] # flat stretch (zero deltas)
+    state = WilderRSI(14)
+    for i, p in enumerate(prices):
+        value = state.update(p)
+        expected = wilder_rsi(prices[:i + 1], 14)
+        if expected is None:
+            assert value is None
+        else:
+            assert value == pytest.approx(expected, rel=1e-12)
+
+def test_supertrend_incremental_matches_vectorized():
+    panel = generate_panel(6, 2, seed=4)
+    high, low, close = (panel[f].to_numpy(copy=True) for f in ("High", "Low", "Close"))
+    high[:40, 0] = low[:40, 0] = close[:40, 0] = np.nan # late listing
+    line, direction = supertrend(high, low, close, period=10, multiplier=3.0)
+    for j in range(close.shape[1]):
+        st = SuperTrend(10, 3.0)
+        for t in range(close.shape[0]):
+            if np.isnan(close[t, j]):
+                continue
+            value = st.update(high[t, j], low[t, j], close[t, j])
+            if value is None:
+                assert direction[t, j] == 0
+            else:
+                assert value == pytest.approx(line[t, j], rel=1e-9)
+                assert direction[t, j] == (1 if st.bullish else -1)
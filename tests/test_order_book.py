@@ -0,0 +1,44 @@
+from execution.paper_broker import PaperBroker
+
+def test_resting_orders_fill_in_bar_path_order():
+    broker = PaperBroker(start_balance=10000.0)
+    gap = broker.place_order("X", "buy", 10, 105.0)    # open gaps below it
+    deep = broker.place_order("X", "buy", 10, 90.0)    # below the low: stays
+    low = broker.place_order("X", "buy", 10, 96.0)
+    stop = broker.place_order("X", "buy", 5, 110.0, kind="stop")
+    broker.cancel_order(broker.place_order("X", "buy", 10, 99.0).id)
+    # Up bar: open 100 -> low 95 -> high 112
+    filled = broker.match_orders("X", 112.0, 95.0, "d0", open=100.0, close=111.0)
+
+    assert [o.id for o in filled] == [gap.id, low.id, stop.id]
+    assert (gap.fill_price, low.fill_price) == (100.0, 96.0)
+    assert stop.fill_price == 110.0 * (1 + broker.risk_manager.slippage_rate)
+    assert deep.status == "open" and len(broker.orders) == 1
+    assert broker.get_position_amt("X") == 25
+
+def test_orders_respect_cash_and_position():
+    broker = PaperBroker(start_balance=500.0)
+    big = broker.place_order("X", "buy", 10, 100.0)
+    naked = broker.place_order("Y", "sell", 5, 10.0)
+    broker.match_orders("X", 101.0, 99.0, "d0")
+    broker.match_orders("Y", 11.0, 9.0, "d0")
+    assert big.status == "rejected" and naked.status == "rejected"
+    assert broker.balance == 500.0 and broker.trade_count == 0
+
+    # A fill can re-arm the next grid level, reachable in the same bar
+    broker.place_order("X", "buy", 2, 100.0)
+    def on_fill(order):
+        if order.side == "buy": broker.place_order("X", "sell", 2, 104.0)
+    filled = broker.match_orders("X", 105.0, 99.0, "d1", open=101.0, close=104.0, on_fill=on_fill)
+    assert [o.side for o in filled] == ["buy", "sell"]
+    assert broker.get_position_amt("X") == 0
+
+def test_recentering_grid_keeps_heaps_bounded():
+    from strategies.grid_strategy import RestingGrid
+    broker = PaperBroker(start_balance=10000.0)
+    grid = RestingGrid(broker, "X", 1)
+    for i in range(500): # steady uptrend: old buys below and sells above never reach a heap top
+        grid.place(100.0 * 1.12 ** i)
+    book = broker.orders.books["X"]
+    assert len(broker.orders) == 20
+    assert len(book.falling) + len(book.rising) <= 2 * 21
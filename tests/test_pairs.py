@@ -0,0 +1,30 @@
+import numpy as np
+from data.synthetic import generate_panel
+from strategies.pairs_strategy import KalmanHedgeRatio, PairSpreadTracker
+
+def test_tracker_matches_pandas_rolling_zscore():
+    closes = generate_panel(6, 2, seed=9, correlation=0.8)['Close']
+    tickers = list(closes.columns)
+    pairs = [(tickers[0], tickers[1], 0.9), (tickers[2], tickers[3], 0.9), (tickers[1], tickers[4], 0.9)]
+    tracker = PairSpreadTracker(pairs, window=20)
+    z = np.array([tracker.update_prices(row.to_dict()) for _, row in closes.iterrows()])
+
+    for k, (t1, t2, _) in enumerate(pairs):
+        spread = np.log(closes[t1] / closes[t2])
+        expected = (spread - spread.rolling(20).mean()) / spread.rolling(20).std()
+        assert np.allclose(z[:, k], expected.to_numpy(), equal_nan=True, atol=1e-8)
+
+def test_kalman_hedge_ratio_recovers_beta_vectorized():
+    rng = np.random.default_rng(0)
+    x = np.log(50) + np.cumsum(rng.normal(0, 0.02, (2000, 3)), axis=0)
+    betas = np.array([0.6, 1.0, 1.7])
+    y = 0.2 + betas * x + rng.normal(0, 0.01, x.shape)
+
+    batch = KalmanHedgeRatio(3)
+    singles = [KalmanHedgeRatio(1) for _ in range(3)]
+    for t in range(len(x)):
+        batch.update(x[t], y[t])
+        for j, f in enumerate(singles):
+            f.update(x[t, j:j + 1], y[t, j:j + 1])
+    assert np.allclose(batch.beta, betas, atol=0.05)
+    assert np.allclose(batch.beta, [f.beta[0] for f in singles])
@@ -0,0 +1,31 @@
+import numpy as np
+from backtest_engine import BacktestEngine
+from data.panel import FeaturePanel
+from data.synthetic import generate_panel
+from strategies.features import FEATURE_COLUMNS, panel_features
+from strategies.registry import create_strategy
+
+def test_panel_features_and_roundtrip():
+    ohlcv = generate_panel(5, 2, seed=9)
+    panel = FeaturePanel.from_pandas(ohlcv).with_features()
+    assert panel.values.dtype == np.float32
+    assert panel.fields[-len(FEATURE_COLUMNS):] == FEATURE_COLUMNS
+
+    expected = panel_features(ohlcv)
+    for f in FEATURE_COLUMNS:
+        assert np.allclose(panel[f], expected[f].to_numpy(), rtol=1e-4, atol=1e-4, equal_nan=True), f
+
+    back = panel.sel(fields=['Close', 'RSI']).to_pandas(dtype=float)
+    assert np.allclose(back['Close'].to_numpy(), ohlcv['Close'].to_numpy(), rtol=1e-6)
+    frames = panel.to_frames()
+    again = FeaturePanel.from_frames(frames)
+    assert np.array_equal(again.values, panel.values, equal_nan=True)
+
+def test_engine_replays_feature_panel():
+    panel = FeaturePanel.from_pandas(generate_panel(6, 1, seed=2), fields=['Close'])
+    results = []
+    for data in (panel, panel.frame('Close', dtype=float)):
+        s = create_strategy("TrendHunter", name="test_panel_trend", balance=10000.0, tickers=panel.tickers)
+        results.append(BacktestEngine(panel.dates[0], panel.dates[-1], [s], preloaded_data=data).run())
+    a, b = (r["test_panel_trend"] for r in results)
+    assert a["trades"] > 0 and (a["equity"], a["trades"]) == (b["equity"], b["trades"])
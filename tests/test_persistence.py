@@ -0,0 +1,48 @@
+from execution.paper_broker import PaperBroker
+from execution.persistence import PersistenceWorker
+from execution.state_store import SQLiteStateStore
+
+class _Strategy:
+    def __init__(self, name, state_store):
+        self.name = name
+        self.broker = PaperBroker()
+        self.state_store = state_store
+
+def test_worker_coalesces_and_skips_unchanged(tmp_path):
+    store = SQLiteStateStore(str(tmp_path / "state.db"))
+    a, b = _Strategy("A", store), _Strategy("B", store)
+    worker = PersistenceWorker(flush_interval=60)
+
+    a.broker.buy("X", 10.0, "2024-01-02", pct_portfolio=0.5)
+    assert worker.mark_dirty(a)
+    assert worker.mark_dirty(b) # first sight of a wallet always queues it
+    a.broker.sell("X", 11.0, "2024-01-03")
+    assert worker.mark_dirty(a)
+    a.broker.buy("X", 9.0, "2024-01-04", pct_portfolio=0.5) # after the snapshot: next flush
+    assert worker.flush() == 2 # A coalesced to its latest snapshot, B new
+    assert len(store.snapshot("A")["trade_log"]) == 2 and store.snapshot("A")["positions"] == {}
+
+    assert not worker.mark_dirty(b) # unchanged since last snapshot
+    worker.start()
+    worker.mark_dirty(a)
+    worker.close()
+    assert len(store.snapshot("A")["trade_log"]) == 3
+    assert store.snapshot("A")["positions"]["X"]["amount"] == a.broker.get_position_amt("X")
+
+def test_worker_restarts_after_close():
+    import threading, time
+    saves = []
+    class _Saving(_Strategy):
+        def save(self, broker=None):
+            saves.append(threading.current_thread().name)
+    strat = _Saving("C", None)
+    worker = PersistenceWorker(flush_interval=0.01)
+
+    for cycle in (1, 2): # like CloudBot.run_all_markets on a reused bot
+        worker.start()
+        worker.mark_dirty(strat, force=True)
+        deadline = time.monotonic() + 5
+        while len(saves) < cycle and time.monotonic() < deadline:
+            time.sleep(0.005)
+        worker.close()
+        assert saves == ["persistence"] * cycle # flushed by the background thread, not close()
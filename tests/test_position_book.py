@@ -0,0 +1,82 @@
+import json
+import numpy as np
+from data.synthetic import generate_panel
+from execution.paper_broker import PaperBroker
+from execution.position_book import PositionBook, PositionDict
+from strategies.registry import create_strategy
+
+def _run(key, panel, book):
+    tickers = list(panel.columns)
+    s = create_strategy(key, name=f"test_book_{key}", balance=10000.0, tickers=tickers)
+    if book:
+        s.broker.positions = PositionBook()
+    equity = []
+    for ts, row in zip(panel.index, panel.to_numpy()):
+        s.run_batch(tickers, row, ts)
+        equity.append(s.broker.get_portfolio_value(dict(zip(tickers, row))))
+    return [dict(t) for t in s.broker.trade_log], equity, s.broker.positions_state()
+
+def test_position_book_matches_dict_positions():
+    panel = generate_panel(10, 2, seed=3)['Close']
+    for key in ("TrendHunter", "MeanRev", "GridBot"):
+        (trades, equity, positions), ref = _run(key, panel, book=True), _run(key, panel, book=False)
+        assert (trades, positions) == (ref[0], ref[2]), key
+        assert np.allclose(equity, ref[1], rtol=1e-12), key # dot product vs running sum
+
+def test_position_book_gathers_price_vector_and_held_mask():
+    from strategies.base_strategy import PriceVector
+    panel = generate_panel(8, 1, seed=5)['Close']
+    tickers = list(panel.columns)
+    s = create_strategy("TrendHunter", name="test_book_gather", balance=10000.0, tickers=tickers,
+                        load_state=False, silent=True)
+    assert isinstance(s.broker.positions, PositionBook) # backtest brokers are array-backed
+    for ts, row in zip(panel.index, panel.to_numpy()):
+        s.run_batch(tickers, row, ts)
+    positions = s.broker.positions
+    assert len(positions) > 0
+    row = panel.to_numpy()[-1].copy()
+    row[tickers.index(next(iter(positions)))] = np.nan # unquoted held ticker counts as 0
+    prices = PriceVector(tickers, row)
+    assert np.isclose(positions.value(prices, 5.0), positions.value(dict(prices), 5.0))
+    assert np.isclose(positions.value(dict(prices), 5.0),
+                      PositionDict(positions.to_dict()).value(dict(prices), 5.0))
+    assert s.held_mask().tolist() == [t in positions for t in tickers]
+
+def test_state_format_is_unchanged(tmp_path):
+    path = str(tmp_path / "wallet.json")
+    legacy = {"balance": 500.0, "positions": {"A": {"amount": 3, "entry_price": 10.0}, "B": 2}, "trade_log": []}
+    with open(path, "w") as f:
+        json.dump(legacy, f)
+
+    book = PaperBroker(position_book=True)
+    book.load_state(path)
+    assert book.get_position_amt("B") == 2 and book.positions["A"]["entry_price"] == 10.0
+    book.buy("A", 10.0, "2024-01-02", pct_portfolio=0.5)
+    book.sell("B", 12.0, "2024-01-03")
+    assert book.check_portfolio_safety({"A": 1.0}) == ["A"]
+    book.save_state(path)
+
+    plain = PaperBroker()
+    plain.load_state(path)
+    with open(path) as f:
+        saved = json.load(f)
+    assert list(saved["positions"]) == ["A"]
+    assert saved["positions"] == plain.positions_state() == book.positions_state()
+    assert [t["action"] for t in saved["trade_log"]] == ["BUY", "SELL"]
+    assert np.isclose(plain.get_portfolio_value({"A": 11.0}), book.get_portfolio_value({"A": 11.0}))
+
+def test_silent_broker_materializes_same_trade_log():
+    panel = generate_panel(10, 2, seed=4)['Close']
+    tickers = list(panel.columns)
+    runs = {}
+    for silent in (False, True):
+        s = create_strategy("BUM_Trend", name="test_silent", balance=10000.0, tickers=tickers,
+                            load_state=False, silent=silent)
+        for ts, row in zip(panel.index, panel.to_numpy()):
+            s.run_batch(tickers, row, ts)
+        runs[silent] = s.broker
+    loud, silent = runs[False], runs[True]
+    assert silent.trade_count == len(loud.trade_log) > 0 and not silent._materialized
+    assert silent.get_report().equals(loud.get_report().astype({'amount': float}))
+    assert [dict(t) for t in silent.trade_log] == [dict(t) for t in loud.trade_log]
+    assert silent.trade_count == len(silent.trade_log)
@@ -0,0 +1,63 @@
+import json
+from execution.paper_broker import PaperBroker
+from execution.state_store import SQLiteStateStore
+
+def _state(broker):
+    return {"balance": broker.balance, "positions": broker.positions_state(),
+            "trade_log": broker.trades_state()}
+
+def test_store_round_trip_and_incremental_trades(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SQLiteStateStore(path)
+    a, b = PaperBroker(currency="TRY"), PaperBroker()
+    a.buy("X", 10.0, "2024-01-02", pct_portfolio=0.5, context={"rsi": 25.0})
+    b.buy("Y", 5.0, "2024-01-02", pct_portfolio=0.2)
+    store.save_many([("A", a), ("B", b)])
+
+    a.sell("X", 11.0, "2024-01-03")
+    store.save_many([("A", a), ("B", b)])
+    rows = store.conn.execute("SELECT name, seq FROM trades ORDER BY name, seq").fetchall()
+    assert rows == [("A", 0), ("A", 1), ("B", 0)]
+    store.close()
+
+    # Fresh process: state and watermark come from the database
+    store = SQLiteStateStore(path)
+    assert sorted(store.names()) == ["A", "B"]
+    restored = PaperBroker()
+    assert store.load("A", restored)
+    assert _state(restored) == json.loads(json.dumps(_state(a), default=str))
+    assert restored.currency == "TRY" and "currency" not in store.snapshot("B")
+    restored.buy("X", 9.0, "2024-01-04", pct_portfolio=0.1)
+    store.save("A", restored)
+    assert len(store.snapshot("A")["trade_log"]) == 3
+    store.close()
+
+def test_store_json_import_export(tmp_path):
+    legacy = {"balance": 500.0, "positions": {"A": {"amount": 3, "entry_price": 10.0}},
+              "trade_log": [{"date": "2024-01-02", "action": "BUY", "ticker": "A", "price": 10.0,
+                             "amount": 3, "cost": 30.0, "balance": 500.0}]}
+    src, out = tmp_path / "sim_S.json", tmp_path / "out.json"
+    src.write_text(json.dumps(legacy))
+
+    store = SQLiteStateStore(str(tmp_path / "state.db"))
+    broker = PaperBroker()
+    assert store.load("S", broker, legacy_json=str(src)) # unknown wallet -> imported
+    assert broker.balance == 500.0 and broker.get_position_amt("A") == 3
+    assert store.export_json("S", str(out))
+    assert json.loads(out.read_text()) == legacy
+    assert not store.load("missing", PaperBroker())
+
+def test_store_adds_currency_to_existing_database(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "state.db")
+    conn = sqlite3.connect(path) # wallets table from before the currency column
+    conn.execute("CREATE TABLE wallets (name TEXT PRIMARY KEY, balance REAL NOT NULL, updated_at TEXT)")
+    conn.execute("INSERT INTO wallets VALUES ('Old', 750.0, NULL)")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteStateStore(path)
+    assert store.snapshot("Old") == {"balance": 750.0, "positions": {}, "trade_log": []}
+    store.save("New", PaperBroker(currency="usd"))
+    restored = PaperBroker()
+    assert store.load("New", restored) and restored.currency == "USD"
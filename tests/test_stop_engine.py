@@ -0,0 +1,42 @@
+import numpy as np
+from execution.paper_broker import PaperBroker
+
+def _walk(broker, highs, prices, stop_loss_pct, trailing_stop_pct):
+    """The per-position scan the stop engine replaces."""
+    for t in [t for t in highs if broker.get_position_amt(t) <= 0]:
+        del highs[t]
+    hits = []
+    for t in list(broker.positions):
+        price = prices.get(t)
+        if price is None: continue
+        highs[t] = max(highs.get(t, price), price)
+        entry = broker.positions[t]['entry_price']
+        if price < entry * (1 - stop_loss_pct): hits.append((t, 'stop'))
+        elif price < highs[t] * (1 - trailing_stop_pct): hits.append((t, 'trailing'))
+    return hits
+
+def test_stop_engine_matches_position_walk():
+    rng = np.random.default_rng(3)
+    tickers = [f"T{i}" for i in range(8)]
+    paths = 50 * np.exp(np.cumsum(rng.normal(0, 0.03, (300, 8)), axis=0))
+    engine_broker, walk_broker = PaperBroker(start_balance=1e5), PaperBroker(start_balance=1e5)
+    highs = {}
+    for day, row in enumerate(paths):
+        prices = {t: float(p) for t, p in zip(tickers, row) if rng.random() > 0.1}
+        hits = engine_broker.check_stops(prices, 0.05, 0.10)
+        assert [(h.ticker, h.kind) for h in hits] == _walk(walk_broker, highs, prices, 0.05, 0.10)
+        buys = [t for t in tickers if t in prices and rng.random() < 0.05]
+        for broker in (engine_broker, walk_broker):
+            for h in hits:
+                broker.sell(h.ticker, h.price, day)
+                highs.pop(h.ticker, None) # a re-opened position starts a new high-water mark
+            for t in buys:
+                broker.buy(t, prices[t], day, pct_portfolio=0.05) # opens and adds
+    assert engine_broker.trade_count == walk_broker.trade_count > 40
+
+def test_portfolio_safety_resyncs_loaded_positions():
+    broker = PaperBroker()
+    broker.positions['A'] = {'amount': 10, 'entry_price': 100.0}
+    assert broker.check_portfolio_safety({'A': 98.0}, stop_loss_pct=0.03) == []
+    broker.positions = broker._restore_positions({'B': {'amount': 5, 'entry_price': 10.0}})
+    assert broker.check_portfolio_safety({'A': 90.0, 'B': 9.0}, stop_loss_pct=0.03) == ['B']
@@ -0,0 +1,38 @@
+import numpy as np
+from backtest_engine import BacktestEngine
+from data.synthetic import generate_panel
+from execution.vector_broker import VectorBroker
+from strategies.advanced_strategies import BumTrendStrategy
+from strategies.dca_strategy import DCAStrategy
+from strategies.indicators import SuperTrendPanel
+
+def test_vector_broker_rows_match_paper_brokers():
+    prices = generate_panel(8, 1, seed=11)['Close'] / 4 # < 50 so the 50 TL DCA buys fill
+    tickers = list(prices.columns)
+    universes = np.zeros((3, 8), dtype=bool)
+    universes[0, [0, 2, 3, 5, 7]] = universes[1, [1, 2, 4, 5, 6]] = universes[2, :5] = True
+
+    dca, bum = VectorBroker(3, tickers), VectorBroker(3, tickers)
+    st = SuperTrendPanel(8, 10, 3.0)
+    for row in prices.to_numpy():
+        quoted = ~np.isnan(row)
+        live = universes & quoted
+        for j in np.flatnonzero(live.any(axis=0)):
+            dca.buy_value(j, live[:, j] & (dca.balance >= 50), row[j], 50.0)
+        ready = quoted & ~np.isnan(st.update(row, row, row, quoted))
+        bum.execute_signals(row, live & ready & st.bullish, live & ready & ~st.bullish, 0.5)
+    last = prices.to_numpy()[-1]
+
+    for i, universe in enumerate(universes):
+        picked = [t for t, u in zip(tickers, universe) if u]
+        strats = [DCAStrategy(name="SmartDCA_vb", balance=1000.0, tickers=picked, load_state=False),
+                  BumTrendStrategy(name="BUM_vb", balance=1000.0, tickers=picked, load_state=False)]
+        BacktestEngine(prices.index[0], prices.index[-1], strats, preloaded_data=prices).run()
+        for s, vb in zip(strats, (dca, bum)):
+            assert np.isclose(vb.balance[i], s.broker.balance, rtol=1e-12)
+            for j, t in enumerate(tickers):
+                assert vb.amount[i, j] == s.broker.get_position_amt(t)
+        assert bum.trades[i] == len(strats[1].broker.trade_log) > 0
+        assert dca.amount[i].sum() > 0
+        held = dict(zip(tickers, last))
+        assert np.isclose(bum.equity(last)[i], strats[1].broker.get_portfolio_value(held))
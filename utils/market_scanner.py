@@ -1,5 +1,3 @@
-import yfinance as yf
-import pandas as pd
 from config.settings import MARKET_CONFIG
 
 class MarketScanner:
@@ -23,6 +21,9 @@ class MarketScanner:
         
         # Optimize: Batch fetch
         try:
+            import yfinance as yf
+            import pandas as pd
+
             # period="5d" to get some history for MA/RSI calculations if needed
             data = yf.download(self.universe, period="5d", interval="1d", progress=False)['Close']
             
@@ -1,4 +1,3 @@
-import requests
 from utils.logger import setup_logger
 import os
 
@@ -19,6 +18,7 @@ def send_notification(title, message, priority='default'):
     url = f"https://ntfy.sh/{topic}"
     
     try:
+        import requests # Deferred: only needed when a notification is actually sent
         response = requests.post(
             url,
             data=message.encode('utf-8'),
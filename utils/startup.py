@@ -0,0 +1,17 @@
+import time
+
+# Captured when the entrypoint first imports this module (keep that import at the top).
+_T0 = time.perf_counter()
+
+def startup_ms():
+    """Milliseconds since the entrypoint started importing."""
+    return (time.perf_counter() - _T0) * 1000
+
+def report_startup(label="Startup"):
+    """
+    Prints cold-start time for the current process.
+    Cloud Run / cron invocations pay this on every scheduled run.
+    """
+    msg = f"{label}: {startup_ms():.0f} ms"
+    print(msg)
+    return msg